@@ -3,8 +3,13 @@
 # ─────────────────────────────────────────────
 
 import streamlit as st
-from config.settings import APP_TITLE, APP_ICON
+import modules.api   # noqa: F401 — registers the /api/* sidecar routes
+import modules.ical  # noqa: F401 — registers the /calendar/*.ics sidecar routes
+from config.settings import APP_TITLE, APP_ICON, PUBLIC_SITE_DIR
 from modules.auth import init_session_state
+from modules.metrics import observe_session, start_exporters, timed_render
+from modules.telemetry import set_labels, set_tenant
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 st.set_page_config(
     page_title=APP_TITLE,
@@ -15,14 +20,28 @@ st.set_page_config(
 
 init_session_state()
 
+# ── Metrics: /metrics endpoint and/or textfile (once per process), session count
+start_exporters()
+if (run_ctx := get_script_run_ctx()) is not None:
+    observe_session(run_ctx.session_id)
+
 # ── Not authenticated → show login ─────────────────────────────────────────
 if not st.session_state.authenticated:
+    set_labels("Login", None)
+    set_tenant(None)
     from pages.login import show_login
-    show_login()
+    from modules.ui import render_degraded_banner
+    render_degraded_banner()
+    with timed_render("Login"):
+        show_login()
     st.stop()
 
 # ── Build page list based on roles ─────────────────────────────────────────
 from modules.auth import has_role
+import modules.ratings    # noqa: F401 — rates new results whenever matches are written
+import modules.standings  # noqa: F401 — and updates the league tables
+if PUBLIC_SITE_DIR:
+    import modules.public_site  # noqa: F401 — and the static public site
 
 pages: dict[str, list[st.Page]] = {}
 
@@ -54,8 +73,29 @@ if has_role("admin"):
 # Run navigation
 pg = st.navigation(pages)
 
-# Sidebar footer (logout, refresh, user info) — shown on every page
-from modules.ui import render_sidebar_footer
-render_sidebar_footer()
+# Before the page: usage labels, sidebar footer, session memory, other sessions'
+# changes (modules/ui.py). The load test runs the same preamble.
+from modules.breaker import SheetsUnavailable
+from modules.ui import render_unavailable, start_page_run
+try:
+    start_page_run(run_ctx.session_id if run_ctx is not None else None, pg.title)
+
+    # ── Run the page (profiled for admins with ?profile=1 or the Site Settings toggle)
+    if has_role("admin") and (st.query_params.get("profile") == "1" or st.session_state.profile_pages):
+        from modules.profiler import StackSampler
+        from modules.ui import render_profile_report
 
-pg.run()
+        # Runs ending in st.stop()/st.rerun() (most saves) are profiled too: the
+        # report is written whatever the exit, and shown when the page returned
+        sampler = StackSampler()
+        try:
+            with timed_render(pg.title), sampler:
+                pg.run()
+        finally:
+            report = sampler.write_report(pg.title, st.session_state.pseudo)
+        render_profile_report(sampler, report)
+    else:
+        with timed_render(pg.title):
+            pg.run()
+except SheetsUnavailable as e:   # a write, an uncached read or a restore during a Google outage
+    render_unavailable(e)
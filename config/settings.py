@@ -2,6 +2,8 @@
 # config/settings.py — App-wide constants
 # ─────────────────────────────────────────────
 
+import os
+
 APP_TITLE = "Tennis Club"
 APP_ICON  = "🎾"
 
@@ -40,11 +42,138 @@ SHEET_SCHEMAS: dict[str, list[str]] = {
         "match_id",
         "pseudo",
     ],
+    "rubbers": [    # the individual rubbers of a tie
+        "match_id",
+        "rubber",   # 1, 2, … within the tie
+        "type",     # Singles | Doubles
+        "players",  # comma-separated pseudos
+        "score",    # our side first, e.g. "6-3, 7-6(4)"
+        "winner",   # Us | Them
+    ],
+    "ratings": [    # rating log, one row per rated entity per match (modules/ratings.py)
+        "match_id",
+        "date",
+        "kind",     # team | player | opponent
+        "name",     # team name, pseudo or opponent club
+        "result",   # result the update was computed from
+        "before",
+        "after",
+    ],
+}
+
+# Stable row key of each tab — writes locate their target rows by these
+# columns instead of trusting positions from a possibly stale DataFrame
+SHEET_KEYS: dict[str, list[str]] = {
+    "users":        ["pseudo"],
+    "matches":      ["match_id"],
+    "availability": ["match_id", "pseudo"],
+    "selections":   ["match_id", "pseudo"],
+    "rubbers":      ["match_id", "rubber"],
+    "ratings":      ["match_id", "kind", "name"],
 }
 
+# Seasons run from SEASON_START_MONTH to the month before, e.g. "2024-25" is
+# Sept 2024 – Aug 2025. Closed seasons of these tabs can be moved to archive
+# tabs named "<tab>_<season>" (Site Settings → Seasons), keeping the tabs
+# every page loads down to the current season.
+SEASON_START_MONTH = 9
+SEASON_TABS        = ["matches", "availability", "selections", "rubbers", "ratings"]
+
+# Elo ratings: everyone (teams, players, opponent clubs) starts at RATING_START
+# and moves by at most RATING_K points per match
+RATING_START = 1500
+RATING_K     = 32
+
+# Players per line-up, by competition type (default of the line-up suggestions)
+LINEUP_SIZES = {"Interclubs": 4, "Team Championship": 4}
+
+# League table points per tie result
+STANDINGS_POINTS = {"Win": 3, "Draw": 2, "Loss": 1}
+
+# Longest list of values pushed into a visualization-API query; longer IN
+# filters are applied after the read (URLs have a length limit)
+GVIZ_MAX_IN = 40
+
+# Derived views (modules/views.py) kept in the process-wide LRU
+VIEW_CACHE_SIZE = 256
+
+# How many times a keyed write is re-resolved when it races a concurrent edit
+WRITE_MAX_RETRIES = 3
+
+# Optional cache shared by several server processes (path to a SQLite file).
+# Unset → each session keeps its own copy of the data, as before.
+SHARED_CACHE_PATH    = os.environ.get("TC_SHARED_CACHE", "")
+SHARED_CACHE_TTL_S   = 300   # refetch a tab from Google after this many seconds
+SHARED_CACHE_LEASE_S = 30    # how long one process may hold a tab's fetch lease
+
+# Google API accounting (Site Settings → API usage)
+GSHEETS_QUOTA_PER_MIN = 60    # Sheets API read requests per minute per user
+GSHEETS_TENANT_RESERVE = 10   # several clubs: calls per minute a busy club always leaves to each other one
+TELEMETRY_WINDOW_S    = 900   # how far back the live panel looks
+
+# Google outages (modules/breaker.py)
+GSHEETS_TIMEOUT_S = 20   # give up on one Google request after this many seconds
+BREAKER_FAILURES  = 5    # timeouts / 5xx in a row before calls fail fast
+BREAKER_OPEN_S    = 30   # how long they fail fast before one probe is let through
+
+# Page profiler (admins: ?profile=1 or Site Settings → Profiler)
+PROFILE_DIR        = os.environ.get("TC_PROFILE_DIR", "profiles")   # reports are written here
+PROFILE_INTERVAL_S = 0.005   # stack sampling period
+
+# Side HTTP endpoint next to Streamlit (/metrics). 0 → off. Each server
+# process needs its own port.
+SIDECAR_HOST = os.environ.get("TC_SIDECAR_HOST", "127.0.0.1")
+SIDECAR_PORT = int(os.environ.get("TC_SIDECAR_PORT", "0"))
+
+# Address calendar apps and other clients use to reach the sidecar (e.g. behind
+# a reverse proxy); defaults to http://SIDECAR_HOST:SIDECAR_PORT
+PUBLIC_URL = os.environ.get("TC_PUBLIC_URL", "")
+
+# Sidecar endpoints (calendar feeds…) read one shared copy of the data per
+# process, re-read from Google at most this often
+SERVED_REFRESH_S = 60
+
+# iCalendar feeds: signed with FEED_SECRET (default: derived from the
+# spreadsheet id), played matches kept this many days, client cache time
+FEED_SECRET    = os.environ.get("TC_FEED_SECRET", "")
+FEED_PAST_DAYS = 30
+FEED_MAX_AGE_S = 300
+
+# Read-only JSON API on the sidecar (/api/…): bearer token required when set
+# (for clubs without their own api_token, modules/tenants.py), client cache
+# time, default number of results returned
+API_TOKEN         = os.environ.get("TC_API_TOKEN", "")
+API_MAX_AGE_S     = 60
+API_RESULTS_LIMIT = 20
+
+# Static public site (python cli.py export-site): output folder, also kept
+# current by the app on every result saved when set; matches on the home page
+PUBLIC_SITE_DIR      = os.environ.get("TC_PUBLIC_SITE_DIR", "")
+PUBLIC_RESULTS_COUNT = 5
+
+# Metrics (Prometheus text format), also written to this file if set
+METRICS_FILE            = os.environ.get("TC_METRICS_FILE", "")
+METRICS_FILE_INTERVAL_S = 15
+SESSION_ACTIVE_S        = 600   # a session counts as active this long after its last run
+
+# Memory held by sessions' data (modules/sessions.py, Site Settings → Session memory)
+SESSION_MEMORY_BUDGET_MB = int(os.environ.get("TC_SESSION_MEMORY_MB", "256"))   # all sessions together
+SESSION_IDLE_S           = 900   # a session's data is released after this long without a run
+SESSION_EVICT_MIN_IDLE_S = 60    # over budget: also release sessions idle this long, longest idle first
+SESSION_EVICT_INTERVAL_S = 30    # how often the budget is checked
+
+# Cold-start budget (python cli.py import-budget): what app.py imports before
+# the login screen draws, on top of streamlit itself, and the heavy
+# dependencies that must not be loaded by then (see modules/lazy.py)
+LOGIN_PATH_MODULES = ["modules.auth", "modules.ui", "modules.metrics", "modules.telemetry", "modules.api", "modules.ical", "pages.login"]
+LAZY_DEPENDENCIES  = ["pandas", "gspread", "google.oauth2.service_account", "plotly.express"]
+IMPORT_BUDGET_S    = 0.10
+
 # All possible roles (order matters for display)
 ALL_ROLES    = ["admin", "captain", "player"]
 AVAIL_OPTIONS = ["✅ Available", "❌ Unavailable", "❓ Maybe"]
 
 COMPETITION_TYPES = ["Interclubs", "Team Championship"]
 MATCH_STATUSES    = ["Upcoming", "Played", "Cancelled"]
+RUBBER_TYPES      = ["Singles", "Doubles"]
+RUBBER_WINNERS    = ["Us", "Them"]
@@ -0,0 +1,134 @@
+# ─────────────────────────────────────────────
+# modules/api.py — Read-only JSON API on the sidecar (/api/…)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import hmac
+import json
+from typing import Callable
+
+from config.settings import API_MAX_AGE_S, API_RESULTS_LIMIT
+from modules import sidecar
+from modules.context import DataContext
+from modules.lazy import lazy_import
+from modules.public_site import FIXTURE_COLUMNS, RESULT_COLUMNS, public_frame
+from modules.served import served_context
+from modules.tenants import Tenant, resolve
+from modules.views import played_matches, upcoming_matches, view
+
+pd = lazy_import("pandas")
+
+# For the club website, the clubhouse screen and other scripts:
+#
+#   GET /api/upcoming[?team=]             upcoming matches, soonest first
+#   GET /api/results[?team=&limit=]       latest results, newest first
+#   GET /api/selections[?team=&match_id=] line-ups of the upcoming matches
+#
+# With several clubs on the server (modules/tenants.py), add ?club=<key>.
+#
+# Every endpoint reads served_context() (never Google per request) and
+# declares the tabs it depends on. A response body is built once per
+# (endpoint, parameters, tab versions) in the views LRU, and its ETag is
+# derived from the same key, so a client polling with If-None-Match gets a
+# 304 until one of those tabs changes. When the club has an API token (its
+# api_token in secrets.toml, else TC_API_TOKEN), clients send
+# "Authorization: Bearer <token>" (or ?token=); one club's token never opens
+# another club's data.
+
+CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+def _json_error(status: int, message: str) -> tuple[int, dict[str, str], bytes]:
+    return status, {"Content-Type": CONTENT_TYPE}, json.dumps({"error": message}).encode()
+
+
+def _authorized(tenant: Tenant, query: dict[str, str], headers) -> bool:
+    if not tenant.api_token:
+        return True
+    auth  = headers.get("Authorization") or ""
+    given = auth[7:].strip() if auth.startswith("Bearer ") else query.get("token", "")
+    return hmac.compare_digest(given.encode(), tenant.api_token.encode())
+
+
+def endpoint(path: str, tabs: tuple[str, ...], params: dict[str, Callable[[str], object]] | None = None) -> Callable:
+    """
+    Register `fn(ctx, *params) -> JSON-able` at /api/<path>. `params` maps each
+    accepted query parameter to its parser (a ValueError answers 400).
+    """
+    params = params or {}
+
+    def register(fn: Callable) -> Callable:
+        @view(*tabs)
+        @functools.wraps(fn)
+        def body(ctx: DataContext, *args) -> bytes:
+            return json.dumps(fn(ctx, *args), ensure_ascii=False, default=int).encode()
+
+        @sidecar.route(f"/api/{path}")
+        def handle(query, headers):
+            try:
+                tenant = resolve(query.get("club") or None)
+            except ValueError as e:
+                return _json_error(404, str(e))
+            if not _authorized(tenant, query, headers):
+                return _json_error(401, "missing or invalid token")
+            try:
+                args = tuple(parse(query.get(name, "")) for name, parse in params.items())
+            except ValueError as e:
+                return _json_error(400, str(e))
+            ctx = served_context(tenant.key)
+            key  = f"{path}|{args}|{ctx.sh.id if ctx.sh is not None else ''}|{[ctx.versions.get(t) for t in tabs]}"
+            etag = f'"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+            modified = max(ctx.versions.get(t, 0) for t in tabs) / 1e9
+            return sidecar.conditional(headers, body(ctx, *args), CONTENT_TYPE, etag, modified, API_MAX_AGE_S)
+
+        return fn
+    return register
+
+
+def _limit(value: str) -> int:
+    if not value:
+        return API_RESULTS_LIMIT
+    if not value.isdigit() or not 0 < int(value) <= 500:
+        raise ValueError("limit must be a number from 1 to 500")
+    return int(value)
+
+
+def _of_team(df: pd.DataFrame, team: str) -> pd.DataFrame:
+    return df[df["team"].astype(str) == team] if team else df
+
+
+# ── Endpoints ─────────────────────────────────────────────────────────────────
+
+@endpoint("upcoming", ("matches",), {"team": str})
+def upcoming(ctx: DataContext, team: str) -> dict:
+    return {"matches": public_frame(_of_team(upcoming_matches(ctx), team), FIXTURE_COLUMNS).to_dict("records")}
+
+
+@endpoint("results", ("matches",), {"team": str, "limit": _limit})
+def results(ctx: DataContext, team: str, limit: int) -> dict:
+    played = _of_team(played_matches(ctx), team).head(limit)
+    return {"matches": public_frame(played, RESULT_COLUMNS).to_dict("records")}
+
+
+@endpoint("selections", ("matches", "selections", "users"), {"team": str, "match_id": str})
+def selections(ctx: DataContext, team: str, match_id: str) -> dict:
+    """Upcoming matches with the players selected so far (display names)."""
+    matches = _of_team(upcoming_matches(ctx), team)
+    if match_id:
+        matches = matches[matches["match_id"].astype(str) == match_id]
+    df_u  = ctx.dfs["users"]
+    names = {
+        str(p): str(d) if str(d).strip() else str(p)
+        for p, d in df_u.reindex(columns=["pseudo", "display_name"]).fillna("").itertuples(index=False)
+    }
+    df_s    = ctx.dfs["selections"]
+    lineups: dict[str, list[str]] = {}
+    for mid, pseudo in df_s[["match_id", "pseudo"]].astype(str).itertuples(index=False):
+        lineups.setdefault(mid, []).append(names.get(pseudo, pseudo))
+    out = public_frame(matches, FIXTURE_COLUMNS).to_dict("records")
+    for m in out:
+        m["players"] = sorted(lineups.get(str(m["match_id"]), []))
+    return {"matches": out}
@@ -4,10 +4,10 @@
 
 from __future__ import annotations
 
-import hashlib
 import streamlit as st
 
-from config.settings import ALL_ROLES
+from modules.context import DataContext
+from modules.services import hash_password, verify_password  # noqa: F401 — re-exported for pages
 
 
 # ── Session state defaults ────────────────────────────────────────────────────
@@ -17,9 +17,9 @@ SESSION_DEFAULTS: dict = {
     "pseudo":        None,   # logged-in username
     "roles":         [],     # list of active roles  e.g. ["admin","captain"]
     "display_name":  None,
-    "sh":            None,   # gspread Spreadsheet object
-    "worksheets":    {},     # dict[str, gspread.Worksheet]
-    "dfs":           {},     # dict[str, pd.DataFrame]
+    "ctx":           None,   # modules.context.DataContext — spreadsheet, worksheets, DataFrames
+    "tenant":        None,   # club key (modules/tenants.py), None for an ad-hoc admin connection
+    "profile_pages": False,  # admins: profile every page run (Site Settings → Profiler)
 }
 
 
@@ -37,62 +37,46 @@ def logout() -> None:
     st.rerun()
 
 
-# ── Password helpers ──────────────────────────────────────────────────────────
-
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.strip().encode()).hexdigest()
-
-
-def verify_password(password: str, stored_hash: str) -> bool:
-    return hash_password(password) == stored_hash
+def session_context() -> DataContext:
+    """Return the logged-in session's data context."""
+    return st.session_state.ctx
 
 
 # ── Login helpers ─────────────────────────────────────────────────────────────
 
-def login_user(pseudo: str, roles: list[str], display_name: str, sh, worksheets: dict, dfs: dict) -> None:
+def login_user(user: dict, ctx: DataContext) -> None:
     """Set session state for an authenticated user."""
     st.session_state.update({
         "authenticated": True,
-        "pseudo":        pseudo,
-        "roles":         roles,
-        "display_name":  display_name or pseudo,
-        "sh":            sh,
-        "worksheets":    worksheets,
-        "dfs":           dfs,
+        "pseudo":        user["pseudo"],
+        "roles":         user["roles"],
+        "display_name":  user["display_name"] or user["pseudo"],
+        "ctx":           ctx,
+        "tenant":        ctx.tenant,
     })
 
 
-def try_login_with_password(pseudo: str, password: str) -> tuple[bool, str]:
+def try_login_with_password(pseudo: str, password: str, club: str | None = None) -> tuple[bool, str]:
     """
-    Attempt to log in using pseudo + password against the users sheet.
+    Attempt to log in using pseudo + password against the users sheet of
+    `club` (the only club when not given, see modules/tenants.py).
     Returns (success, error_message).
     Assumes GSheets is already connected (via secrets.toml).
     """
-    from modules.gsheets import build_connection_from_secrets, open_all_worksheets, load_all
+    from modules.services import authenticate, connect_from_secrets
 
     try:
-        _, sh = build_connection_from_secrets()
+        ctx = connect_from_secrets(club=club)
+    except ValueError as e:
+        return False, str(e)
     except Exception as e:
         return False, f"Could not connect to Google Sheets: {e}"
 
-    worksheets = open_all_worksheets(sh)
-    dfs        = load_all(sh)
-    users_df   = dfs.get("users")
-
-    if users_df is None or users_df.empty:
-        return False, "No users registered yet. Ask your admin to create your account."
-
-    match = users_df[users_df["pseudo"] == pseudo]
-    if match.empty:
-        return False, "Unknown username."
-
-    row = match.iloc[0]
-    if not verify_password(password, str(row["password_hash"])):
-        return False, "Incorrect password."
+    user, err = authenticate(ctx, pseudo, password)
+    if user is None:
+        return False, err
 
-    roles        = [r.strip() for r in str(row.get("roles", "player")).split(",") if r.strip()]
-    display_name = str(row.get("display_name", pseudo))
-    login_user(pseudo, roles, display_name, sh, worksheets, dfs)
+    login_user(user, ctx)
     return True, ""
 
 
@@ -101,44 +85,18 @@ def try_login_as_admin(creds_raw: str, sheet_url: str) -> tuple[bool, str]:
     Log in as site admin using raw GSheets JSON credentials.
     Creates/upserts an admin account in the users sheet if needed.
     Returns (success, error_message).
-    NOTE: deliberately avoids session_state during the login flow.
     """
     import json
-    import pandas as pd
-    from modules.gsheets import build_connection, open_all_worksheets, load_all
-    from config.settings import SHEET_SCHEMAS
+    from modules.services import connect, ensure_admin_account
 
     try:
-        _, sh = build_connection(creds_raw, sheet_url)
+        ctx = connect(creds_raw, sheet_url)
     except json.JSONDecodeError:
         return False, "Invalid JSON credentials."
     except Exception as e:
         return False, f"Connection error: {e}"
 
-    worksheets = open_all_worksheets(sh)
-    dfs        = load_all(sh)
-
-    # Seed admin account on first connection ──────────────────────────────
-    users_df     = dfs["users"]
-    admin_pseudo = "admin"
-
-    if users_df.empty or admin_pseudo not in users_df["pseudo"].values:
-        # Write directly to the worksheet — session_state not yet available
-        users_ws = worksheets["users"]
-        users_ws.append_row([
-            admin_pseudo,
-            hash_password("changeme"),
-            "admin,captain,player",
-            "Admin",
-        ])
-        # Reload locally without touching session_state
-        records  = users_ws.get_all_records()
-        dfs["users"] = pd.DataFrame(records) if records else pd.DataFrame(columns=SHEET_SCHEMAS["users"])
-
-    row          = dfs["users"][dfs["users"]["pseudo"] == admin_pseudo].iloc[0]
-    roles        = [r.strip() for r in str(row.get("roles", "admin")).split(",") if r.strip()]
-    display_name = str(row.get("display_name", "Admin"))
-    login_user(admin_pseudo, roles, display_name, sh, worksheets, dfs)
+    login_user(ensure_admin_account(ctx), ctx)
     return True, ""
 
 
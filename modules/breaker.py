@@ -0,0 +1,80 @@
+# ─────────────────────────────────────────────
+# modules/breaker.py — Circuit breaker for Google Sheets calls (no Streamlit)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import threading
+import time
+
+from config.settings import BREAKER_FAILURES, BREAKER_OPEN_S
+
+# When Google is down or very slow, every call would hold a script thread for
+# the whole request timeout, and the threads pile up until the server stops
+# answering. The breaker counts consecutive outage-type failures (timeouts,
+# unreachable, 5xx — not 404s or 429s) in gsheets._gcall:
+#
+#   closed     calls go through; BREAKER_FAILURES failures in a row open it;
+#   open       calls fail at once with SheetsUnavailable, for BREAKER_OPEN_S;
+#   half-open  then a single call goes through as a probe (the rest still
+#              fail fast): success closes the breaker, failure reopens it.
+#
+# Meanwhile reads are answered from data already in memory (gsheets.load_tab)
+# and pages show a banner (ui.render_degraded_banner).
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+
+class SheetsUnavailable(RuntimeError):
+    """Google Sheets is not answering: the call timed out, or was refused by the open breaker."""
+
+
+class CircuitBreaker:
+    def __init__(self, failures: int, open_s: float):
+        self.failures  = failures
+        self.open_s    = open_s
+        self._lock     = threading.Lock()
+        self.state     = CLOSED
+        self._streak   = 0
+        self._opened   = 0.0     # monotonic time it last opened
+        self._probing  = False
+        self.rejected  = 0       # calls refused since start
+        self.trips     = 0       # times it opened since start
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe may go through (0 when closed)."""
+        if self.state == CLOSED:
+            return 0.0
+        return max(0.0, self._opened + self.open_s - time.monotonic())
+
+    def before_call(self) -> None:
+        """Let a call through, or raise SheetsUnavailable."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.monotonic() - self._opened >= self.open_s:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self.rejected += 1
+            wait = self.retry_in()
+        raise SheetsUnavailable(
+            "Google Sheets is not responding"
+            + (f"; retrying in {wait:.0f} s." if wait else "; checking whether it is back.")
+        )
+
+    def record(self, outage: bool) -> None:
+        """Report how a call that went through ended."""
+        with self._lock:
+            if not outage:
+                self._streak, self._probing, self.state = 0, False, CLOSED
+                return
+            self._streak += 1
+            if self.state == HALF_OPEN or self._streak >= self.failures:
+                if self.state != OPEN:
+                    self.trips += 1
+                self.state, self._opened, self._probing = OPEN, time.monotonic(), False
+
+
+sheets_breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_OPEN_S)
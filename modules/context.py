@@ -0,0 +1,29 @@
+# ─────────────────────────────────────────────
+# modules/context.py — Data context (no Streamlit)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import gspread
+    import pandas as pd
+
+
+@dataclass
+class DataContext:
+    """
+    Everything the data layer works on, passed explicitly to every helper.
+
+    A Streamlit session keeps one in st.session_state.ctx; a CLI job or a
+    benchmark builds its own and never touches the Streamlit runtime.
+    """
+    sh:           gspread.Spreadsheet | None      = None
+    worksheets:   dict[str, gspread.Worksheet]    = field(default_factory=dict)
+    dfs:          dict[str, pd.DataFrame]         = field(default_factory=dict)
+    versions:     dict[str, int]                  = field(default_factory=dict)  # bumped on every change
+    cache_cursor: int | None                      = None  # last shared-cache event seen
+    tenant:       str | None                      = None  # club key (modules/tenants.py); None → ad-hoc connection
+    released:     bool                            = False # dfs dropped while idle (modules/sessions.py)
@@ -4,35 +4,98 @@
 
 from __future__ import annotations
 
+import csv
+import functools
+import io
 import json
-import streamlit as st
-import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
-
-from config.settings import GSHEETS_SCOPES, SHEET_SCHEMAS
+import numbers
+import random
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Mapping
+
+from config.settings import GSHEETS_SCOPES, GSHEETS_TIMEOUT_S, SEASON_TABS, SHEET_KEYS, SHEET_SCHEMAS, WRITE_MAX_RETRIES
+from modules.breaker import SheetsUnavailable, sheets_breaker
+from modules.context import DataContext
+from modules.lazy import lazy_import
+from modules.shared_cache import get_shared_cache
+from modules.metrics import observe_cache, observe_load, track_frame
+from modules.query import Query, apply, to_gviz, to_sql
+from modules.seasons import archive_title, current_season, parse_archive_title, season_match_ids, season_series
+from modules.telemetry import record_call, throttle
+
+pd              = lazy_import("pandas")
+gspread         = lazy_import("gspread")
+service_account = lazy_import("google.oauth2.service_account")
+requests        = lazy_import("requests")
+google_auth     = lazy_import("google.auth.exceptions")
+
+
+# ── Instrumented calls ────────────────────────────────────────────────────────
+
+def _gcall(op: str, tab: str, fn, *args, **kwargs):
+    """
+    Run one gspread call (= one Google API request), recording its latency and
+    outcome. Raises SheetsUnavailable at once while the breaker is open, when
+    Google does not answer within GSHEETS_TIMEOUT_S, and when it answers 5xx.
+    """
+    throttle()   # the club's share of the quota (modules/tenants.py); before the breaker, so a probe never waits
+    sheets_breaker.before_call()
+    t0     = time.perf_counter()
+    status = "ok"
+    try:
+        return fn(*args, **kwargs)
+    except gspread.exceptions.APIError as e:
+        status = str(e.code)
+        if status.startswith("5"):
+            raise SheetsUnavailable(f"Google Sheets failed ({op} {tab}): {e}") from e
+        raise
+    except gspread.exceptions.WorksheetNotFound:
+        status = "not_found"   # expected on first run, see open_or_create_ws
+        raise
+    except (requests.exceptions.RequestException, google_auth.TransportError) as e:
+        status = "timeout" if isinstance(e, requests.exceptions.Timeout) else "unreachable"
+        raise SheetsUnavailable(f"Google Sheets did not answer ({op} {tab}): {e}") from e
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        record_call(op, tab, time.perf_counter() - t0, status)
+        sheets_breaker.record(outage=status in ("timeout", "unreachable") or status.startswith("5"))
+
+
+def _is_outage(e: BaseException) -> bool:
+    """Google is down or unreachable (as opposed to refusing this request)."""
+    if isinstance(e, SheetsUnavailable):
+        return True
+    return isinstance(e, gspread.exceptions.APIError) and str(e.code).startswith("5")
 
 
 # ── Client factory ────────────────────────────────────────────────────────────
 
-@st.cache_resource(show_spinner=False)
+@functools.lru_cache(maxsize=None)
 def _make_client(creds_json_str: str) -> gspread.Client:
     """Create and cache a gspread client from a JSON credentials string."""
     info  = json.loads(creds_json_str)
-    creds = Credentials.from_service_account_info(info, scopes=GSHEETS_SCOPES)
-    return gspread.authorize(creds)
+    creds = service_account.Credentials.from_service_account_info(info, scopes=GSHEETS_SCOPES)
+    client = gspread.authorize(creds)
+    client.set_timeout(GSHEETS_TIMEOUT_S)
+    return client
 
 
 def build_connection(creds_raw: str, sheet_url: str) -> tuple[gspread.Client, gspread.Spreadsheet]:
     """Return (client, spreadsheet) from raw JSON credentials and URL."""
     client = _make_client(creds_raw)
-    sh     = client.open_by_url(sheet_url)
+    sh     = _gcall("open_by_url", "-", client.open_by_url, sheet_url)
     return client, sh
 
 
-def build_connection_from_secrets() -> tuple[gspread.Client, gspread.Spreadsheet]:
+def build_connection_from_secrets(secrets: Mapping | None = None) -> tuple[gspread.Client, gspread.Spreadsheet]:
     """
-    Return (client, spreadsheet) using credentials stored in st.secrets.
+    Return (client, spreadsheet) using credentials stored in st.secrets, or in
+    `secrets` (any mapping with the same layout, e.g. a parsed secrets.toml).
 
     Supports two formats in secrets.toml:
 
@@ -51,37 +114,58 @@ def build_connection_from_secrets() -> tuple[gspread.Client, gspread.Spreadsheet
         url   = "https://docs.google.com/..."
         creds = '{"type":"service_account",...}'
     """
-    url = st.secrets["gsheets"]["url"]
+    if secrets is None:
+        import streamlit as st
+        secrets = st.secrets
+    return build_connection(secrets_creds(secrets), secrets["gsheets"]["url"])
+
 
+def secrets_creds(secrets: Mapping) -> str:
+    """
+    Service-account JSON string from a secrets section laid out as above
+    (Format A or B). Both go through _make_client, so each set of
+    credentials gets one client (and HTTP connection pool) per process.
+    """
     # Format A: dedicated [gsheets_creds] TOML section (preferred)
-    if "gsheets_creds" in st.secrets:
-        creds_info = dict(st.secrets["gsheets_creds"])
+    if "gsheets_creds" in secrets:
+        creds_info = dict(secrets["gsheets_creds"])
         # Streamlit may escape \n in private_key — normalize it
         if "private_key" in creds_info:
             creds_info["private_key"] = creds_info["private_key"].replace("\\n", "\n")
-        creds  = Credentials.from_service_account_info(creds_info, scopes=GSHEETS_SCOPES)
-        client = gspread.authorize(creds)
-        sh     = client.open_by_url(url)
-        return client, sh
+        return json.dumps(creds_info, sort_keys=True)
 
     # Format B: JSON string under gsheets.creds (legacy fallback)
-    creds_raw = st.secrets["gsheets"]["creds"]
+    creds_raw = secrets["gsheets"]["creds"]
     if not isinstance(creds_raw, str):
         creds_raw = json.dumps(dict(creds_raw))
-    return build_connection(creds_raw, url)
+    return creds_raw
 
 
 # ── Worksheet helpers ─────────────────────────────────────────────────────────
 
 def open_or_create_ws(sh: gspread.Spreadsheet, name: str) -> gspread.Worksheet:
-    """Return worksheet by name, creating it with header row if absent."""
+    """
+    Return worksheet by name, creating it with header row if absent. Once
+    opened, a handle (only an id and a title) is shared by every session of
+    the process, so later logins and Google outages don't need to open it.
+    """
+    if (sh.id, name) in _handles:
+        return _handles[(sh.id, name)]
     try:
-        return sh.worksheet(name)
+        ws = _gcall("worksheet", name, sh.worksheet, name)
     except gspread.WorksheetNotFound:
         cols = SHEET_SCHEMAS[name]
-        ws   = sh.add_worksheet(title=name, rows=1000, cols=len(cols))
-        ws.append_row(cols)
-        return ws
+        ws   = _gcall("add_worksheet", name, sh.add_worksheet, title=name, rows=1000, cols=len(cols))
+        _gcall("append_row", name, ws.append_row, cols)
+    except Exception as e:
+        if not _is_outage(e) or (sh.id, name) not in _handles:
+            raise
+        return _handles[(sh.id, name)]
+    _handles[(sh.id, name)] = ws
+    return ws
+
+
+_handles: dict[tuple[str, str], gspread.Worksheet] = {}   # (spreadsheet id, tab) → last handle opened
 
 
 def open_all_worksheets(sh: gspread.Spreadsheet) -> dict[str, gspread.Worksheet]:
@@ -91,82 +175,755 @@ def open_all_worksheets(sh: gspread.Spreadsheet) -> dict[str, gspread.Worksheet]
 
 # ── Data loading ──────────────────────────────────────────────────────────────
 
+_version_lock = threading.Lock()
+_last_version = 0
+
+
+def new_version() -> int:
+    """Return a fresh data version token (strictly increasing nanosecond clock)."""
+    global _last_version
+    with _version_lock:
+        _last_version = max(time.time_ns(), _last_version + 1)
+        return _last_version
+
+
 def _parse_df(name: str, records: list[dict]) -> pd.DataFrame:
     cols = SHEET_SCHEMAS[name]
     df   = pd.DataFrame(records) if records else pd.DataFrame(columns=cols)
-    if name == "matches" and not df.empty:
+    if name == "matches" and not df.empty and "date" in df:
         df["date"] = pd.to_datetime(df["date"], errors="coerce")
     return df
 
 
-def load_all(sh: gspread.Spreadsheet) -> dict[str, pd.DataFrame]:
-    """Load every worksheet into a dict of DataFrames."""
-    dfs = {}
+def _set_df(ctx: DataContext, name: str, df: pd.DataFrame, version: int | None = None) -> None:
+    """Store a tab's DataFrame in the context and bump its version."""
+    ctx.dfs[name]      = df
+    ctx.versions[name] = version or new_version()
+    track_frame(name, df)
+    if ctx.sh is not None:
+        _remember(ctx.sh.id, name, df, ctx.versions[name])
+
+
+# Newest copy of every tab this process has seen. Sessions loading the same
+# version share it instead of parsing their own (_frame), sessions released
+# while idle come back to it (restore_frames), and reads keep being answered
+# from it while Google is unreachable (load_tab).
+_last_good_lock = threading.Lock()
+_last_good: dict[tuple[str, str], tuple[pd.DataFrame, int]] = {}   # (spreadsheet id, tab) → (df, version)
+
+
+def _remember(ns: str, name: str, df: pd.DataFrame, version: int) -> None:
+    with _last_good_lock:
+        known = _last_good.get((ns, name))
+        if known is None or known[1] <= version:
+            _last_good[(ns, name)] = (df, version)
+
+
+def _frame(ns: str, name: str, records: list[dict], version: int) -> pd.DataFrame:
+    """Parse a tab's records, or share the frame already parsed from the same version."""
+    known = _last_good.get((ns, name))
+    if known is not None and known[1] == version:
+        return known[0]
+    df = _parse_df(name, records)
+    _remember(ns, name, df, version)
+    return df
+
+
+def _last_known(ns: str, name: str) -> tuple[pd.DataFrame, int] | None:
+    """The newest copy of a tab held by this process or the shared cache, however old."""
+    found = [hit] if (hit := _last_good.get((ns, name))) is not None else []
+    cache = get_shared_cache()
+    if cache is not None and (snap := cache.get(ns, name, allow_stale=True)) is not None:
+        if not found or snap[1] > found[0][1]:
+            found = [(_parse_df(name, snap[0]), snap[1])]
+    return found[0] if found else None
+
+
+def _fetch_records(ws: gspread.Worksheet, name: str, force: bool = False) -> tuple[list[dict], int]:
+    """
+    Return (records, version) for a tab. With a shared cache configured, a
+    snapshot already fetched by any process is reused; `force` always goes to
+    Google and republishes the result.
+    """
+    fetched = False
+
+    def fetch() -> list[dict]:
+        nonlocal fetched
+        fetched = True
+        return _gcall("get_all_records", name, ws.get_all_records)
+
+    cache = get_shared_cache()
+    if cache is None:
+        observe_cache(name, "refresh" if force else "miss")
+        return fetch(), new_version()
+    ns = ws.spreadsheet.id
+    if force:
+        observe_cache(name, "refresh")
+        since = cache.last_event_id()
+        records, version = fetch(), new_version()
+        cache.put(ns, name, records, version, since)
+        return records, version
+    records, version = cache.get_or_fetch(ns, name, fetch, new_version)
+    observe_cache(name, "miss" if fetched else "hit")
+    return records, version
+
+
+def load_tab(ws: gspread.Worksheet, name: str, force: bool = False) -> tuple[pd.DataFrame, int]:
+    """
+    Return (DataFrame, version) for one worksheet. If Google is unreachable,
+    the last copy this process (or the shared cache) has is returned instead.
+    """
+    t0 = time.perf_counter()
+    try:
+        records, version = _fetch_records(ws, name, force)
+    except Exception as e:
+        if not _is_outage(e) or (known := _last_known(ws.spreadsheet.id, name)) is None:
+            raise
+        observe_cache(name, "degraded")
+        return known
+    df = _frame(ws.spreadsheet.id, name, records, version)
+    observe_load(name, time.perf_counter() - t0)
+    track_frame(name, df)
+    return df, version
+
+
+def load_all(sh: gspread.Spreadsheet) -> tuple[dict[str, pd.DataFrame], dict[str, int]]:
+    """Load every worksheet into a dict of DataFrames, plus their versions."""
+    dfs, versions = {}, {}
     for name in SHEET_SCHEMAS:
-        ws      = open_or_create_ws(sh, name)
-        records = ws.get_all_records()
-        dfs[name] = _parse_df(name, records)
-    return dfs
+        dfs[name], versions[name] = load_tab(open_or_create_ws(sh, name), name)
+    return dfs, versions
+
+
+def open_context(sh: gspread.Spreadsheet, load: bool = True) -> DataContext:
+    """
+    Open (or create) every worksheet and load all tabs into a new context.
+    With load=False nothing is read up front; use query() for what you need.
+    """
+    if not load:
+        return DataContext(sh=sh, worksheets={}, dfs={}, versions={})
+    worksheets    = open_all_worksheets(sh)
+    dfs, versions = load_all(sh)
+    return DataContext(sh=sh, worksheets=worksheets, dfs=dfs, versions=versions)
+
+
+def reload_sheet(ctx: DataContext, name: str, force: bool = False) -> None:
+    """Reload a single sheet into ctx.dfs[name]."""
+    df, version = load_tab(ctx.worksheets[name], name, force)
+    _set_df(ctx, name, df, version)
+
+
+def sync_shared_cache(ctx: DataContext) -> None:
+    """
+    Pick up tabs changed by other sessions or processes since this context
+    last looked. Costs one SQLite query when nothing changed.
+    """
+    cache = get_shared_cache()
+    if cache is None or ctx.sh is None:
+        return
+    if ctx.cache_cursor is None:
+        ctx.cache_cursor = cache.last_event_id()
+        return
+    changed, newest = cache.changed_since(ctx.sh.id, ctx.cache_cursor)
+    for name in changed & set(SHEET_SCHEMAS):
+        try:
+            records, version = _fetch_records(ctx.worksheets[name], name)
+        except Exception as e:
+            if not _is_outage(e):
+                raise
+            return   # keep what we have; the cursor stays put so we retry next run
+        if version != ctx.versions.get(name):
+            _set_df(ctx, name, _frame(ctx.sh.id, name, records, version), version)
+    ctx.cache_cursor = newest
+
+
+def release_frames(ctx: DataContext) -> None:
+    """Drop a context's DataFrames (an idle session); restore_frames brings them back."""
+    ctx.dfs, ctx.released = {}, True
+
+
+def restore_frames(ctx: DataContext) -> None:
+    """
+    Bring back the tabs of a released context from the newest copy in memory
+    (at least as recent as the one it dropped), reading Google only for a
+    tab this process no longer has.
+    """
+    for name in SHEET_SCHEMAS:
+        if name in ctx.dfs:
+            continue
+        known = _last_known(ctx.sh.id, name)
+        if known is None:
+            reload_sheet(ctx, name)
+        else:
+            _set_df(ctx, name, *known)
+    ctx.released = False
+
+
+def _announce_write(ws: gspread.Worksheet, name: str) -> None:
+    """Tell other processes a tab changed so exactly one of them refetches it."""
+    cache = get_shared_cache()
+    if cache is not None:
+        cache.invalidate(ws.spreadsheet.id, name, new_version())
+
+
+# ── Filtered reads ────────────────────────────────────────────────────────────
+
+GVIZ_URL = "https://docs.google.com/spreadsheets/d/{id}/gviz/tq"
+
+
+def _gviz_records(sh: gspread.Spreadsheet, q: Query) -> list[dict]:
+    """Rows of `q` filtered and projected by Google (visualization API, CSV out)."""
+    columns  = q.fetched_columns
+    response = _gcall("gviz", q.tab, sh.client.request, "get", GVIZ_URL.format(id=sh.id), params={
+        "tq": to_gviz(q), "sheet": q.tab, "headers": 1, "tqx": "out:csv",
+    })
+    rows = list(csv.reader(io.StringIO(response.text)))
+    if not rows or rows[0] != columns:
+        raise ValueError(f"Unexpected visualization API header for '{q.tab}': {rows[:1]}")
+    return [dict(zip(columns, gspread.utils.numericise_all(row))) for row in rows[1:]]
+
+
+def query(ctx: DataContext, q: Query) -> pd.DataFrame:
+    """
+    The rows and columns of one tab that `q` asks for, from the cheapest
+    place that has them:
+
+    1. the context's own copy of the tab, if loaded (no I/O — every page);
+    2. a fresh shared-cache snapshot, filtered in SQLite;
+    3. Google, filtered server-side by the visualization API, falling back
+       to a full read of the tab if that endpoint refuses the query (which
+       itself falls back to the last copy held while Google is down).
+
+    Contexts opened with load=False (batch jobs, feeds) use 2 and 3, so they
+    only transfer what they need.
+    """
+    if q.tab in ctx.dfs:
+        return apply(ctx.dfs[q.tab], q)
+
+    cache = get_shared_cache()
+    if cache is not None:
+        where, params = to_sql(q)
+        records = cache.select(ctx.sh.id, q.tab, q.fetched_columns, where, params)
+        if records is not None:
+            observe_cache(q.tab, "hit")
+            return apply(_parse_df(q.tab, records), q)
+
+    try:
+        records = _gviz_records(ctx.sh, q)
+        observe_cache(q.tab, "pushdown")
+    except (gspread.exceptions.APIError, ValueError, SheetsUnavailable):
+        if q.tab not in ctx.worksheets:
+            ctx.worksheets[q.tab] = open_or_create_ws(ctx.sh, q.tab)
+        df, _ = load_tab(ctx.worksheets[q.tab], q.tab)
+        return apply(df, q)
+    return apply(_parse_df(q.tab, records), q)
+
+
+# ── Row keys ──────────────────────────────────────────────────────────────────
+
+class WriteConflict(RuntimeError):
+    """A keyed write kept racing concurrent edits and was given up."""
+
+
+def _col_letter(sheet: str, col_name: str) -> str:
+    return gspread.utils.rowcol_to_a1(1, SHEET_SCHEMAS[sheet].index(col_name) + 1)[:-1]
+
+
+def _live_values(ws: gspread.Worksheet, sheet: str, cols: list[str]) -> list[tuple[str, ...]]:
+    """Read only the given columns of a worksheet, below the header, in one request."""
+    ranges  = [f"{_col_letter(sheet, c)}2:{_col_letter(sheet, c)}" for c in cols]
+    columns = [[r[0] if r else "" for r in vr] for vr in _gcall("batch_get", sheet, ws.batch_get, ranges)]
+    n_rows  = max((len(c) for c in columns), default=0)
+    return [
+        tuple(str(c[i]) if i < len(c) else "" for c in columns)
+        for i in range(n_rows)
+    ]
 
 
-def reload_sheet(name: str) -> None:
-    """Reload a single sheet into st.session_state.dfs[name]."""
-    ws      = st.session_state.worksheets[name]
-    records = ws.get_all_records()
-    st.session_state.dfs[name] = _parse_df(name, records)
+def _cached_values(ctx: DataContext, sheet: str, cols: list[str]) -> list[tuple[str, ...]]:
+    df = ctx.dfs[sheet]
+    if df.empty:
+        return []
+    return [tuple(str(v) for v in t) for t in df[cols].itertuples(index=False, name=None)]
+
+
+def _keys_moved(ctx: DataContext, sheet: str) -> bool:
+    """True when the sheet's live key cells no longer match the context's copy."""
+    keys = SHEET_KEYS[sheet]
+    return _live_values(ctx.worksheets[sheet], sheet, keys) != _cached_values(ctx, sheet, keys)
+
+
+def _resolve_rows(ctx: DataContext, sheet: str, wheres: list[dict]) -> tuple[list[list[int]], bool]:
+    """
+    Return (row_numbers per where, stale) for each `where` = {col: value}.
+
+    Row numbers are resolved against the live key columns, so they are right
+    even if another session inserted or deleted rows since our last load.
+    `stale` is the optimistic version check: True when the context's cached
+    keys no longer match the sheet, i.e. someone else changed this tab.
+    """
+    keys   = SHEET_KEYS[sheet]
+    extra  = [c for where in wheres for c in where if c not in keys]
+    cols   = keys + list(dict.fromkeys(extra))
+    live   = _live_values(ctx.worksheets[sheet], sheet, cols)
+    n_keys = len(keys)
+    stale  = [v[:n_keys] for v in live] != [v[:n_keys] for v in _cached_values(ctx, sheet, cols)]
+
+    # One hash index per distinct set of filter columns
+    indexes: dict[tuple[str, ...], dict[tuple[str, ...], list[int]]] = {}
+    out = []
+    for where in wheres:
+        wcols = tuple(where)
+        if wcols not in indexes:
+            pos   = [cols.index(c) for c in wcols]
+            index = indexes[wcols] = {}
+            for i, values in enumerate(live):
+                index.setdefault(tuple(values[p] for p in pos), []).append(i + 2)  # 1-indexed + header
+        out.append(indexes[wcols].get(tuple(str(where[c]) for c in wcols), []))
+    return out, stale
+
+
+def _rows_hold(ctx: DataContext, sheet: str, wheres: list[dict], rows: list[list[int]]) -> bool:
+    """Re-read the cells each where was matched on, at its resolved rows: True if they all still match."""
+    cells = {
+        f"{_col_letter(sheet, c)}{r}": str(v)
+        for where, rs in zip(wheres, rows) for r in rs for c, v in where.items()
+    }
+    if not cells:
+        return True
+    ws   = ctx.worksheets[sheet]
+    live = _gcall("batch_get", sheet, ws.batch_get, list(cells))
+    return all(
+        str(vr[0][0] if vr and vr[0] else "") == expected
+        for vr, expected in zip(live, cells.values())
+    )
+
+
+def _keyed_write(ctx: DataContext, sheet: str, wheres: list[dict], write) -> tuple[list[list[int]], bool]:
+    """
+    Resolve the rows matching each where and call write(ws, rows_per_where).
+
+    The Sheets API has no conditional write, so right before it the cells
+    the rows were matched on are read again: if another session moved rows
+    in between, nothing is written and the rows are resolved afresh, up to
+    WRITE_MAX_RETRIES times before WriteConflict. Any other error is raised
+    as is.
+    """
+    ws = ctx.worksheets[sheet]
+    for _ in range(WRITE_MAX_RETRIES):
+        rows, stale = _resolve_rows(ctx, sheet, wheres)
+        if _rows_hold(ctx, sheet, wheres, rows):
+            write(ws, rows)
+            return rows, stale
+    raise WriteConflict(f"Could not write to '{sheet}' for {wheres}: the rows kept moving.")
+
+
+def _keyed_append(ctx: DataContext, sheet: str, rows: list[dict], append) -> bool:
+    """
+    Call append(ws) unless a row with the key of one of `rows` is already in
+    the live sheet (WriteConflict then). Returns the version check's `stale`.
+    """
+    keys    = SHEET_KEYS[sheet]
+    found, stale = _resolve_rows(ctx, sheet, [{k: row.get(k, "") for k in keys} for row in rows])
+    if taken := [tuple(row.get(k, "") for k in keys) for row, rs in zip(rows, found) if rs]:
+        raise WriteConflict(f"'{sheet}' already has rows keyed {taken}.")
+    append(ctx.worksheets[sheet])
+    return stale
+
+
+# ── Local patches (instead of a full reload after each write) ─────────────────
+
+def _patch(ctx: DataContext, sheet: str, stale: bool, edit) -> None:
+    """
+    Apply edit(records) to the cached DataFrame, or reload the tab when the
+    version check found it stale (then our copy is out of date anyway).
+    """
+    _announce_write(ctx.worksheets[sheet], sheet)
+    if stale:
+        reload_sheet(ctx, sheet)
+    else:
+        records = ctx.dfs[sheet].to_dict("records")
+        edit(records)
+        _set_df(ctx, sheet, _parse_df(sheet, records))
+    _notify_write(ctx, sheet)
+
+
+# ── Write listeners ───────────────────────────────────────────────────────────
+
+# Derived state kept in its own tab (ratings, standings…) follows the tabs it
+# is computed from: a module registers fn(ctx) with @on_write("matches") and
+# it runs after every write to that tab, with the context already patched.
+# A failing listener never fails the write that triggered it; the derived
+# state catches up on the next write or its explicit rebuild.
+_listeners: dict[str, list[Callable[[DataContext], None]]] = {}
+
+
+def on_write(*tabs: str) -> Callable:
+    def register(fn: Callable[[DataContext], None]) -> Callable[[DataContext], None]:
+        for tab in tabs:
+            if fn not in _listeners.setdefault(tab, []):
+                _listeners[tab].append(fn)
+        return fn
+    return register
+
+
+def _notify_write(ctx: DataContext, sheet: str) -> None:
+    for fn in _listeners.get(sheet, []):
+        try:
+            fn(ctx)
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+
+
+def _as_record(sheet: str, row: dict) -> dict:
+    """Mirror how get_all_records() would read back a written row."""
+    cols = SHEET_SCHEMAS[sheet]
+    return dict(zip(cols, gspread.utils.numericise_all([str(row.get(c, "")) for c in cols])))
 
 
 # ── Write operations ──────────────────────────────────────────────────────────
 
-def append_row(sheet: str, row: dict) -> None:
-    """Append a new row and refresh the cached DataFrame."""
-    ws = st.session_state.worksheets[sheet]
-    ws.append_row([row.get(c, "") for c in SHEET_SCHEMAS[sheet]])
-    reload_sheet(sheet)
+def append_row(ctx: DataContext, sheet: str, row: dict) -> None:
+    """Append a new row (WriteConflict if its key is taken) and add it to the cached DataFrame."""
+    append_rows(ctx, sheet, [row])
+
 
+def append_rows(ctx: DataContext, sheet: str, rows: list[dict]) -> None:
+    """Append many rows in a single request (WriteConflict if a key is taken) and add them to the cached DataFrame."""
+    if not rows:
+        return
+    cols = SHEET_SCHEMAS[sheet]
 
-def update_cells(sheet: str, match_col: str, match_val: str, updates: dict) -> None:
+    def append(ws: gspread.Worksheet) -> None:
+        if len(rows) == 1:
+            _gcall("append_row", sheet, ws.append_row, [rows[0].get(c, "") for c in cols])
+        else:
+            _gcall("append_rows", sheet, ws.append_rows, [[row.get(c, "") for c in cols] for row in rows])
+
+    stale = _keyed_append(ctx, sheet, rows, append)
+    _patch(ctx, sheet, stale, lambda records: records.extend(_as_record(sheet, r) for r in rows))
+
+
+def replace_rows(ctx: DataContext, sheet: str, rows: list[dict]) -> None:
+    """
+    Overwrite every data row of a tab with `rows` in a single write, for tabs
+    derived from the others and rebuilt from scratch (ratings…). Leftover old
+    rows are blanked in the same request, so readers never see a half-empty tab.
+    """
+    ws   = ctx.worksheets[sheet]
+    cols = SHEET_SCHEMAS[sheet]
+    reload_sheet(ctx, sheet, force=True)   # how many rows the tab really has now
+    values  = [[row.get(c, "") for c in cols] for row in rows]
+    values += [[""] * len(cols)] * max(0, len(ctx.dfs[sheet]) - len(rows))
+    if values:
+        last = gspread.utils.rowcol_to_a1(len(values) + 1, len(cols))
+        _gcall("batch_update", sheet, ws.batch_update, [{"range": f"A2:{last}", "values": values}])
+
+    def edit(records: list[dict]) -> None:
+        records[:] = [_as_record(sheet, r) for r in rows]
+
+    _patch(ctx, sheet, False, edit)
+
+
+def update_cells(ctx: DataContext, sheet: str, match_col: str, match_val: str, updates: dict) -> None:
     """
     Find the first row where match_col == match_val and apply updates.
     updates = {col_name: new_value, ...}
     """
-    ws   = st.session_state.worksheets[sheet]
-    df   = st.session_state.dfs[sheet]
-    cols = SHEET_SCHEMAS[sheet]
-    idxs = df.index[df[match_col].astype(str) == str(match_val)].tolist()
-    if not idxs:
+    update_rows(ctx, sheet, [({match_col: match_val}, updates)])
+
+
+def update_rows(ctx: DataContext, sheet: str, changes: list[tuple[dict, dict]]) -> None:
+    """
+    Apply many updates in a single request.
+    changes = [({key_col: key_val, ...}, {col_name: new_value, ...}), ...];
+    each applies to the first row matching its key, and is skipped if none does.
+    """
+    def write(ws: gspread.Worksheet, rows: list[list[int]]) -> None:
+        data = [
+            {"range": f"{_col_letter(sheet, c)}{r[0]}", "values": [[v]]}
+            for r, (_, updates) in zip(rows, changes) if r
+            for c, v in updates.items()
+        ]
+        if data:
+            _gcall("batch_update", sheet, ws.batch_update, data)
+
+    rows, stale = _keyed_write(ctx, sheet, [where for where, _ in changes], write)
+    if not any(rows):
         return
-    row_num = idxs[0] + 2  # 1-indexed + header
-    for col_name, value in updates.items():
-        col_num = cols.index(col_name) + 1
-        ws.update_cell(row_num, col_num, value)
-    reload_sheet(sheet)
 
+    def edit(records: list[dict]) -> None:
+        for r, (_, updates) in zip(rows, changes):
+            if r:
+                fresh = _as_record(sheet, updates)
+                records[r[0] - 2].update({c: fresh[c] for c in updates})
+
+    _patch(ctx, sheet, stale, edit)
 
-def delete_rows_where(sheet: str, match_col: str, match_val: str) -> None:
+
+def delete_rows_where(ctx: DataContext, sheet: str, match_col: str, match_val: str) -> None:
     """Delete all rows where match_col == match_val."""
-    ws   = st.session_state.worksheets[sheet]
-    df   = st.session_state.dfs[sheet]
-    idxs = df.index[df[match_col].astype(str) == str(match_val)].tolist()
-    for i in reversed(idxs):
-        ws.delete_rows(i + 2)
-    reload_sheet(sheet)
+    delete_rows(ctx, sheet, [{match_col: match_val}])
+
+
+def delete_rows(ctx: DataContext, sheet: str, wheres: list[dict]) -> None:
+    """Delete every row matching any of `wheres` (each {col: value, ...}) in a single request."""
+    def to_delete(rows: list[list[int]]) -> list[int]:
+        return sorted({r for rs in rows for r in rs}, reverse=True)
+
+    def write(ws: gspread.Worksheet, rows: list[list[int]]) -> None:
+        if any(rows):
+            # One request, bottom-up so earlier deletions don't shift later ones
+            _gcall("delete_rows", sheet, ws.spreadsheet.batch_update, {"requests": [
+                {"deleteDimension": {"range": {
+                    "sheetId":    ws.id,
+                    "dimension":  "ROWS",
+                    "startIndex": r - 1,
+                    "endIndex":   r,
+                }}}
+                for r in to_delete(rows)
+            ]})
+
+    rows, stale = _keyed_write(ctx, sheet, wheres, write)
+    if not any(rows):
+        return
 
+    def edit(records: list[dict]) -> None:
+        for r in to_delete(rows):
+            del records[r - 2]
 
-def upsert_availability(match_id: str, pseudo: str, available: str, comment: str) -> None:
+    _patch(ctx, sheet, stale, edit)
+
+
+def upsert_availability(ctx: DataContext, match_id: str, pseudo: str, available: str, comment: str) -> None:
     """Insert or update an availability row for (match_id, pseudo)."""
-    ws   = st.session_state.worksheets["availability"]
-    df   = st.session_state.dfs["availability"]
-    mask = (df["match_id"].astype(str) == str(match_id)) & (df["pseudo"] == pseudo)
-    if mask.any():
-        idx     = df.index[mask][0]
-        row_num = idx + 2
-        ws.update(f"C{row_num}:D{row_num}", [[available, comment]])
-        reload_sheet("availability")
+    sheet = "availability"
+    first = _col_letter(sheet, "available")
+    last  = _col_letter(sheet, "comment")
+
+    def write(ws: gspread.Worksheet, rows: list[list[int]]) -> None:
+        if rows[0]:
+            _gcall("batch_update", sheet, ws.batch_update, [
+                {"range": f"{first}{rows[0][0]}:{last}{rows[0][0]}", "values": [[available, comment]]},
+            ])
+        else:
+            _gcall("append_row", sheet, ws.append_row, [match_id, pseudo, available, comment])
+
+    (rows,), stale = _keyed_write(ctx, sheet, [{"match_id": match_id, "pseudo": pseudo}], write)
+    fresh = _as_record(sheet, {
+        "match_id":  match_id,
+        "pseudo":    pseudo,
+        "available": available,
+        "comment":   comment,
+    })
+
+    def edit(records: list[dict]) -> None:
+        if rows:
+            records[rows[0] - 2].update(available=fresh["available"], comment=fresh["comment"])
+        else:
+            records.append(fresh)
+
+    _patch(ctx, sheet, stale, edit)
+
+
+# ── Season archives ───────────────────────────────────────────────────────────
+
+# Archive tabs never change once written, so each is read at most once per
+# process, whichever session asks first.
+_archive_lock = threading.Lock()
+_archives: dict[tuple[str, str], pd.DataFrame] = {}   # (spreadsheet id, tab title) → DataFrame
+
+
+_ARCHIVE_INDEX_TTL_S = 600
+_archive_index: dict[str, tuple[float, dict[str, list[str]]]] = {}   # spreadsheet id → (read at, seasons)
+
+
+def list_archives(ctx: DataContext, force: bool = False) -> dict[str, list[str]]:
+    """Archived seasons, oldest first, each with the tabs archived for it."""
+    cached = _archive_index.get(ctx.sh.id)
+    if cached and not force and time.time() - cached[0] < _ARCHIVE_INDEX_TTL_S:
+        return cached[1]
+    out: dict[str, list[str]] = {}
+    for ws in _gcall("worksheets", "-", ctx.sh.worksheets):
+        parsed = parse_archive_title(ws.title)
+        if parsed:
+            out.setdefault(parsed[1], []).append(parsed[0])
+    out = dict(sorted(out.items()))
+    _archive_index[ctx.sh.id] = (time.time(), out)
+    return out
+
+
+def load_archive(ctx: DataContext, tab: str, season: str) -> pd.DataFrame:
+    """One season's archive of a tab (empty if that season has none)."""
+    title = archive_title(tab, season)
+    key   = (ctx.sh.id, title)
+    with _archive_lock:
+        if key in _archives:
+            return _archives[key]
+    try:
+        ws      = _gcall("worksheet", title, ctx.sh.worksheet, title)
+        records = _gcall("get_all_records", title, ws.get_all_records)
+    except gspread.WorksheetNotFound:
+        records = []
+    df = _parse_df(tab, records)
+    with _archive_lock:
+        _archives[key] = df
+    return df
+
+
+def load_history(ctx: DataContext, tab: str, seasons: list[str]) -> pd.DataFrame:
+    """The live tab plus the archives of `seasons`, as one DataFrame."""
+    frames = [df for df in (ctx.dfs[tab], *(load_archive(ctx, tab, s) for s in seasons)) if not df.empty]
+    if not frames:
+        return ctx.dfs[tab]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _cell(value) -> dict:
+    """A CellData for appendCells, stored the way append_row(..., RAW) would."""
+    if isinstance(value, pd.Timestamp):
+        value = value.strftime("%Y-%m-%d")
+    if isinstance(value, numbers.Number) and not isinstance(value, bool) and not pd.isna(value):
+        return {"userEnteredValue": {"numberValue": value}}
+    return {"userEnteredValue": {"stringValue": "" if pd.isna(value) else str(value)}}
+
+
+def _row_runs(rows: list[int]) -> list[tuple[int, int]]:
+    """Group row numbers into (first, last) runs of consecutive rows, bottom-most first."""
+    runs: list[tuple[int, int]] = []
+    for r in sorted(set(rows), reverse=True):
+        if runs and runs[-1][0] == r + 1:
+            runs[-1] = (r, runs[-1][1])
+        else:
+            runs.append((r, r))
+    return runs
+
+
+def _new_sheet_id(taken: set[int]) -> int:
+    while (sheet_id := random.randrange(1, 2**31)) in taken:
+        pass
+    return sheet_id
+
+
+# A tab whose live rows summarise its history (the ratings log keeps each
+# entity's latest rating) registers fn(moved, kept) with @on_archive(tab):
+# given the records being archived and those staying, it returns (indexes in
+# kept to drop, records to add), applied in the same batch as the archive.
+_archive_hooks: dict[str, Callable[[list[dict], list[dict]], tuple[list[int], list[dict]]]] = {}
+
+
+def on_archive(tab: str) -> Callable:
+    def register(fn: Callable) -> Callable:
+        _archive_hooks[tab] = fn
+        return fn
+    return register
+
+
+def archive_season(ctx: DataContext, season: str) -> dict[str, int]:
+    """
+    Move a closed season's rows of every SEASON_TABS tab out of the live tabs
+    into "<tab>_<season>" archive tabs; seasons go oldest first. Creating the archive tabs,
+    filling them and deleting the rows from the live tabs is a single
+    spreadsheets.batchUpdate, which Google applies all-or-nothing. The rows
+    archived are read from the sheet at the start of each try (not taken from
+    this session's copy, which may miss other sessions' edits), and their
+    positions are checked against the live key cells right before it is sent:
+    if another session moved rows meanwhile, nothing is written and the
+    positions are re-resolved (WriteConflict after WRITE_MAX_RETRIES tries).
+    Returns the number of rows moved per tab.
+    """
+    if season >= current_season():
+        raise ValueError(f"Season {season} is not over yet.")
+
+    for _ in range(WRITE_MAX_RETRIES):
+        for tab in SEASON_TABS:
+            reload_sheet(ctx, tab, force=True)
+        mids = season_match_ids(ctx, season)
+        if not mids:
+            return {}
+        older = sorted(s for s in set(season_series(ctx.dfs["matches"]["date"])) if s and s < season)
+        if older:   # the ratings log carries the state of archived seasons over (on_archive)
+            raise ValueError(f"Archive season {older[0]} first: seasons are archived oldest first.")
+        upcoming = ctx.dfs["matches"]["match_id"].astype(str).isin(mids) & (ctx.dfs["matches"]["status"] == "Upcoming")
+        if upcoming.any():
+            raise ValueError(f"Season {season} still has {int(upcoming.sum())} upcoming match(es).")
+
+        moved, stale = {}, []
+        for tab in SEASON_TABS:
+            rows, tab_stale = _resolve_rows(ctx, tab, [{"match_id": m} for m in mids])
+            moved[tab] = sorted({r for rs in rows for r in rs})
+            if tab_stale:
+                stale.append(tab)
+        if stale:   # changed again since the reload: positions must come from an up-to-date copy
+            continue
+
+        # Live rows that summarise the moved ones: dropped and added in the same batch
+        dropped: dict[str, list[int]]  = {}
+        added:   dict[str, list[dict]] = {}
+        for tab, fn in _archive_hooks.items():
+            records = ctx.dfs[tab].to_dict("records")
+            gone    = set(moved[tab])
+            kept    = [r for r in range(2, len(records) + 2) if r not in gone]
+            drop, added[tab] = fn([records[r - 2] for r in moved[tab]], [records[r - 2] for r in kept])
+            dropped[tab] = [kept[i] for i in drop]
+
+        existing = {ws.title: ws.id for ws in _gcall("worksheets", "-", ctx.sh.worksheets)}
+        batch    = []
+        for tab in SEASON_TABS:
+            title    = archive_title(tab, season)
+            cols     = SHEET_SCHEMAS[tab]
+            records  = ctx.dfs[tab].to_dict("records")
+            values   = [[records[r - 2].get(c, "") for c in cols] for r in moved[tab]]
+            sheet_id = existing.get(title)
+            if sheet_id is None:
+                sheet_id = _new_sheet_id(set(existing.values()))
+                batch.append({"addSheet": {"properties": {
+                    "sheetId":        sheet_id,
+                    "title":          title,
+                    "gridProperties": {"rowCount": len(values) + 1, "columnCount": len(cols)},
+                }}})
+                values = [cols, *values]
+            if values:
+                batch.append({"appendCells": {
+                    "sheetId": sheet_id,
+                    "rows":    [{"values": [_cell(v) for v in row]} for row in values],
+                    "fields":  "userEnteredValue",
+                }})
+        for tab in SEASON_TABS:
+            for first, last in _row_runs(moved[tab] + dropped.get(tab, [])):
+                batch.append({"deleteDimension": {"range": {
+                    "sheetId":    ctx.worksheets[tab].id,
+                    "dimension":  "ROWS",
+                    "startIndex": first - 1,
+                    "endIndex":   last,
+                }}})
+        for tab, rows in added.items():
+            if rows:
+                batch.append({"appendCells": {
+                    "sheetId": ctx.worksheets[tab].id,
+                    "rows":    [{"values": [_cell(row.get(c, "")) for c in SHEET_SCHEMAS[tab]]} for row in rows],
+                    "fields":  "userEnteredValue",
+                }})
+
+        if any(_keys_moved(ctx, tab) for tab in SEASON_TABS):
+            continue
+        _gcall("archive_season", "-", ctx.sh.batch_update, {"requests": batch})
+        break
     else:
-        append_row("availability", {
-            "match_id": match_id,
-            "pseudo":   pseudo,
-            "available": available,
-            "comment":  comment,
-        })
+        raise WriteConflict(f"Could not archive season {season}.")
+
+    with _archive_lock:
+        for tab in SEASON_TABS:
+            _archives.pop((ctx.sh.id, archive_title(tab, season)), None)
+    _archive_index.pop(ctx.sh.id, None)
+    for tab in SEASON_TABS:
+        gone, new = sorted(moved[tab] + dropped.get(tab, [])), added.get(tab, [])
+        if gone or new:
+            def edit(records: list[dict], gone: list[int] = gone, new: list[dict] = new, tab: str = tab) -> None:
+                for r in reversed(gone):
+                    del records[r - 2]
+                records.extend(_as_record(tab, row) for row in new)
+
+            _patch(ctx, tab, False, edit)
+    return {tab: len(rows) for tab, rows in moved.items()}
+
@@ -0,0 +1,197 @@
+# ─────────────────────────────────────────────
+# modules/ical.py — iCalendar feeds per player and per team
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+
+from config.settings import (
+    APP_TITLE, FEED_MAX_AGE_S, FEED_PAST_DAYS, FEED_SECRET, PUBLIC_URL, SIDECAR_HOST, SIDECAR_PORT,
+)
+from modules import sidecar
+from modules.context import DataContext
+from modules.lazy import lazy_import
+from modules.served import served_context
+from modules.tenants import DEFAULT_TENANT
+from modules.views import view
+
+pd = lazy_import("pandas")
+
+# Calendar apps poll a subscription URL every few minutes to hours. A feed is
+# built once per data version (views LRU) together with its ETag, so a poll is
+# a dictionary lookup, and usually a bodiless 304. URLs carry an HMAC token
+# so a feed can't be read by guessing a pseudo.
+
+CONTENT_TYPE = "text/calendar; charset=utf-8"
+_UID_DOMAIN  = re.sub(r"[^a-z0-9]+", "-", APP_TITLE.lower()).strip("-") or "tennis-club"
+
+
+@dataclass(frozen=True)
+class Feed:
+    body:     bytes
+    etag:     str
+    modified: float   # seconds since the epoch
+
+
+# ── Tokens and URLs ───────────────────────────────────────────────────────────
+
+def _club(ctx: DataContext) -> str | None:
+    """The club a feed URL must name (None: the only or default club)."""
+    return ctx.tenant if ctx.tenant not in (None, DEFAULT_TENANT) else None
+
+
+def feed_token(ctx: DataContext, kind: str, name: str) -> str:
+    secret  = (FEED_SECRET or (ctx.sh.id if ctx.sh is not None else "")).encode()
+    message = f"{kind}:{name}" + (f"@{club}" if (club := _club(ctx)) else "")
+    return hmac.new(secret, message.encode(), hashlib.sha256).hexdigest()[:20]
+
+
+def feed_url(ctx: DataContext, kind: str, name: str) -> str | None:
+    """Subscription URL of a player's or team's feed; None when the sidecar is off."""
+    base = PUBLIC_URL or (f"http://{SIDECAR_HOST}:{SIDECAR_PORT}" if SIDECAR_PORT else "")
+    if not base:
+        return None
+    club  = {"club": c} if (c := _club(ctx)) else {}
+    query = urlencode({**club, kind: name, "token": feed_token(ctx, kind, name)})
+    return f"{base.rstrip('/')}/calendar/{kind}.ics?{query}"
+
+
+# ── iCalendar text ────────────────────────────────────────────────────────────
+
+def _text(value) -> str:
+    s = "" if value is None or (isinstance(value, float) and pd.isna(value)) else str(value)
+    return s.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """Split a content line into ≤75-octet pieces (RFC 5545 §3.1)."""
+    out, current = [], ""
+    for ch in line:
+        if len((current + ch).encode()) > (75 if not out else 74):
+            out.append(current)
+            current = ""
+        current += ch
+    out.append(current)
+    return "\r\n ".join(out)
+
+
+def _calendar(name: str, events: list[list[str]], modified: float) -> Feed:
+    lines = [
+        "BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:-//{_text(APP_TITLE)}//League manager//EN",
+        "CALSCALE:GREGORIAN", "METHOD:PUBLISH", f"X-WR-CALNAME:{_text(name)}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:PT{max(FEED_MAX_AGE_S // 60, 1)}M",
+    ]
+    for event in events:
+        lines += ["BEGIN:VEVENT", *event, "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    body = ("\r\n".join(_fold(line) for line in lines) + "\r\n").encode()
+    return Feed(body, f'"{hashlib.sha1(body).hexdigest()[:20]}"', modified)
+
+
+def _event(match, summary: str, description: list[str], stamp: str) -> list[str]:
+    day = match.date.date()
+    return [
+        f"UID:{_text(match.match_id)}@{_UID_DOMAIN}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+        f"SUMMARY:{_text(summary)}",
+        f"LOCATION:{_text(match.location)}",
+        f"DESCRIPTION:{_text(chr(10).join(description))}",
+        f"STATUS:{'CANCELLED' if match.status == 'Cancelled' else 'CONFIRMED'}",
+    ]
+
+
+def _in_window(ctx: DataContext) -> pd.DataFrame:
+    """Matches shown in feeds: from FEED_PAST_DAYS ago on, cancelled ones included so they disappear."""
+    df_m = ctx.dfs["matches"]
+    if df_m.empty:
+        return df_m
+    since = pd.Timestamp.today().normalize() - pd.Timedelta(days=FEED_PAST_DAYS)
+    return df_m[df_m["date"].notna() & (df_m["date"] >= since)].sort_values("date")
+
+
+def _stamp(ctx: DataContext, *tabs: str) -> tuple[float, str]:
+    modified = max(ctx.versions.get(t, 0) for t in tabs) / 1e9
+    return modified, datetime.fromtimestamp(modified, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _result_line(match) -> list[str]:
+    if match.status != "Played":
+        return []
+    return [f"Result: {match.result or '—'} {match.score}".rstrip()]
+
+
+# ── Feeds (memoized per data version) ─────────────────────────────────────────
+
+@view("matches", "availability", "selections")
+def player_feed(ctx: DataContext, pseudo: str) -> Feed:
+    """Every match in the window, with the player's answer and whether they are selected."""
+    modified, stamp = _stamp(ctx, "matches", "availability", "selections")
+    df_a, df_s = ctx.dfs["availability"], ctx.dfs["selections"]
+    answers  = dict(df_a.loc[df_a["pseudo"].astype(str) == pseudo, ["match_id", "available"]].astype(str).values)
+    selected = set(df_s.loc[df_s["pseudo"].astype(str) == pseudo, "match_id"].astype(str))
+
+    events = []
+    for m in _in_window(ctx).itertuples(index=False):
+        mid     = str(m.match_id)
+        picked  = mid in selected
+        summary = f"{'🎾 ' if picked else ''}{m.team} vs {m.opponent_club}"
+        events.append(_event(m, summary, [
+            f"{m.competition_type} · {m.team}",
+            f"My answer: {answers.get(mid, '⏳ Not answered')}",
+            "Selected" if picked else "Not selected",
+            *_result_line(m),
+        ], stamp))
+    return _calendar(f"{APP_TITLE} — {pseudo}", events, modified)
+
+
+@view("matches", "selections")
+def team_feed(ctx: DataContext, team: str) -> Feed:
+    """The team's matches in the window, with the selected players."""
+    modified, stamp = _stamp(ctx, "matches", "selections")
+    df_s    = ctx.dfs["selections"]
+    lineups = df_s.assign(match_id=df_s["match_id"].astype(str)).groupby("match_id")["pseudo"].agg(
+        lambda p: ", ".join(sorted(map(str, p)))
+    ) if not df_s.empty else {}
+
+    window = _in_window(ctx)
+    events = [
+        _event(m, f"{m.team} vs {m.opponent_club}", [
+            m.competition_type,
+            f"Line-up: {lineups.get(str(m.match_id), 'not selected yet')}",
+            *_result_line(m),
+        ], stamp)
+        for m in window[window["team"].astype(str) == team].itertuples(index=False)
+    ] if not window.empty else []
+    return _calendar(f"{APP_TITLE} — {team}", events, modified)
+
+
+# ── Endpoints ─────────────────────────────────────────────────────────────────
+
+def _serve(kind: str, build, query, headers):
+    name = query.get(kind, "")
+    try:
+        ctx = served_context(query.get("club") or None)
+    except ValueError as e:
+        return 404, {"Content-Type": "text/plain"}, f"{e}\n".encode()
+    if not name or not hmac.compare_digest(query.get("token", ""), feed_token(ctx, kind, name)):
+        return 403, {"Content-Type": "text/plain"}, b"invalid or missing token\n"
+    feed = build(ctx, name)
+    return sidecar.conditional(headers, feed.body, CONTENT_TYPE, feed.etag, feed.modified, FEED_MAX_AGE_S)
+
+
+@sidecar.route("/calendar/player.ics")
+def _player_endpoint(query, headers):
+    return _serve("player", player_feed, query, headers)
+
+
+@sidecar.route("/calendar/team.ics")
+def _team_endpoint(query, headers):
+    return _serve("team", team_feed, query, headers)
@@ -0,0 +1,203 @@
+# ─────────────────────────────────────────────
+# modules/imports.py — Bulk file imports (no Streamlit)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+import pandas as pd
+
+from config.settings import ALL_ROLES, COMPETITION_TYPES
+from modules.context import DataContext
+from modules.services import hash_password, match_id_for, parse_roles
+
+
+# ── File reading ──────────────────────────────────────────────────────────────
+
+def read_table(file: str | Path | IO, filename: str | None = None) -> pd.DataFrame:
+    """
+    Read a CSV or Excel file into a DataFrame of strings, with headers
+    normalised to lower_snake_case.
+    """
+    name = (filename or str(file)).lower()
+    if name.endswith(".xlsx"):
+        df = pd.read_excel(file, dtype=str, engine="openpyxl")
+    else:
+        df = pd.read_csv(file, dtype=str, sep=None, engine="python")
+    df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
+    return df.fillna("").apply(lambda col: col.str.strip())
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    """ISO dates as-is; anything else read day-first (league PDFs use 15/09/2024)."""
+    iso    = values.str.match(r"^\d{4}-\d{2}-\d{2}")
+    parsed = pd.to_datetime(values.where(iso), format="ISO8601", errors="coerce")
+    other  = pd.to_datetime(values.where(~iso & (values != "")), dayfirst=True, errors="coerce")
+    return parsed.fillna(other)
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+FIXTURE_ALIASES = {
+    "opponent":    "opponent_club",
+    "club":        "opponent_club",
+    "competition": "competition_type",
+}
+
+
+@dataclass
+class ImportPlan:
+    """What a bulk import would do: a per-row preview and the rows to write."""
+    preview:  pd.DataFrame   # one line per input row, with an "action" column
+    new_rows: list[dict]     # rows to append, in SHEET_SCHEMAS order
+    updates:  list[tuple[dict, dict]] = field(default_factory=list)  # (key, {col: value}) for update_rows
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return self.preview["action"].value_counts().to_dict()
+
+
+def plan_fixture_import(ctx: DataContext, fixtures: pd.DataFrame) -> ImportPlan:
+    """
+    Turn a fixture list into match rows, using the same match_id rule as the
+    Create Match form, and flag duplicates against existing matches and
+    within the file itself. Nothing is written.
+    """
+    df = fixtures.rename(columns=FIXTURE_ALIASES)
+    for col in ("date", "competition_type", "team", "opponent_club", "location"):
+        if col not in df.columns:
+            df[col] = ""
+
+    dates    = _parse_dates(df["date"])
+    existing = set(ctx.dfs["matches"]["match_id"].astype(str)) if not ctx.dfs["matches"].empty else set()
+    seen: set[str] = set()
+
+    preview, new_rows = [], []
+    for i, row in enumerate(df.itertuples(index=False)):
+        match_date = dates.iloc[i]
+        mid        = match_id_for(match_date, row.opponent_club) if pd.notna(match_date) else ""
+
+        if pd.isna(match_date):
+            action = "❌ invalid date"
+        elif not row.team or not row.opponent_club:
+            action = "❌ team and opponent required"
+        elif row.competition_type not in COMPETITION_TYPES:
+            action = f"❌ competition must be one of: {', '.join(COMPETITION_TYPES)}"
+        elif mid in existing:
+            action = "⏭️ already exists"
+        elif mid in seen:
+            action = "⏭️ duplicate in file"
+        else:
+            action = "➕ new"
+            seen.add(mid)
+            new_rows.append({
+                "match_id":         mid,
+                "date":             match_date.strftime("%Y-%m-%d"),
+                "competition_type": row.competition_type,
+                "team":             row.team,
+                "opponent_club":    row.opponent_club,
+                "location":         row.location,
+                "status":           "Upcoming",
+                "score":            "",
+                "result":           "",
+            })
+
+        preview.append({
+            "action":      action,
+            "match_id":    mid,
+            "date":        match_date.strftime("%d %b %Y") if pd.notna(match_date) else row.date,
+            "competition": row.competition_type,
+            "team":        row.team,
+            "opponent":    row.opponent_club,
+            "location":    row.location,
+        })
+
+    cols = ["action", "match_id", "date", "competition", "team", "opponent", "location"]
+    return ImportPlan(pd.DataFrame(preview, columns=cols), new_rows)
+
+
+# ── Accounts ──────────────────────────────────────────────────────────────────
+
+def plan_account_import(ctx: DataContext, accounts: pd.DataFrame) -> ImportPlan:
+    """
+    Create or update accounts from a file with columns pseudo, display_name,
+    roles and password. Unknown pseudos are created (password required);
+    known ones only get the non-empty fields that differ. Nothing is written.
+    """
+    df = accounts.copy()
+    for col in ("pseudo", "display_name", "roles", "password"):
+        if col not in df.columns:
+            df[col] = ""
+
+    users    = ctx.dfs["users"]
+    existing = {str(r["pseudo"]): r for r in users.to_dict("records")} if not users.empty else {}
+    seen: set[str] = set()
+
+    preview, new_rows, updates = [], [], []
+    for row in df.itertuples(index=False):
+        pseudo = row.pseudo
+        roles  = parse_roles(row.roles.replace(";", ",").replace("|", ","))
+        bad    = [r for r in roles if r not in ALL_ROLES]
+
+        if not pseudo:
+            action = "❌ pseudo required"
+        elif pseudo in seen:
+            action = "⏭️ duplicate in file"
+        elif bad:
+            action = f"❌ unknown role(s): {', '.join(bad)}"
+        elif pseudo not in existing:
+            if not row.password:
+                action = "❌ password required for new accounts"
+            else:
+                action = "➕ new"
+                new_rows.append({
+                    "pseudo":        pseudo,
+                    "password_hash": hash_password(row.password),
+                    "roles":         ",".join(roles or ["player"]),
+                    "display_name":  row.display_name or pseudo,
+                })
+        else:
+            current = existing[pseudo]
+            changes = {}
+            if row.display_name and row.display_name != str(current.get("display_name", "")):
+                changes["display_name"] = row.display_name
+            if roles and roles != parse_roles(current.get("roles", "")):
+                changes["roles"] = ",".join(roles)
+            if row.password:
+                changes["password_hash"] = hash_password(row.password)
+            if changes:
+                action = "✏️ update " + ", ".join(c.replace("_hash", "") for c in changes)
+                updates.append(({"pseudo": pseudo}, changes))
+            else:
+                action = "⏭️ unchanged"
+        seen.add(pseudo)
+
+        preview.append({
+            "action":       action,
+            "pseudo":       pseudo,
+            "display_name": row.display_name,
+            "roles":        ", ".join(roles),
+            "password":     "set" if row.password else "—",
+        })
+
+    cols = ["action", "pseudo", "display_name", "roles", "password"]
+    return ImportPlan(pd.DataFrame(preview, columns=cols), new_rows, updates)
+
+
+# ── Apply ─────────────────────────────────────────────────────────────────────
+
+def apply_import(ctx: DataContext, sheet: str, plan: ImportPlan) -> int:
+    """
+    Write a plan: all new rows in one batched append, all updates in one
+    batched update. Returns the number of rows touched.
+    """
+    from modules.gsheets import append_rows, update_rows
+
+    if plan.new_rows:
+        append_rows(ctx, sheet, plan.new_rows)
+    if plan.updates:
+        update_rows(ctx, sheet, plan.updates)
+    return len(plan.new_rows) + len(plan.updates)
@@ -0,0 +1,33 @@
+# ─────────────────────────────────────────────
+# modules/lazy.py — Import heavy dependencies on first use
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+
+# pandas, gspread/google-auth and plotly.express take most of a cold start.
+# Modules on the login path bind them through `lazy_import` so the login
+# screen draws without loading them; the real import happens on the first
+# attribute access (pd.DataFrame, px.bar, …), after which lookups are plain
+# module attribute reads.
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that imports it on first attribute access."""
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        value  = getattr(module, attr)
+        self.__dict__[attr] = value   # next lookup skips __getattr__
+        return value
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return `name` if already imported, else a proxy that imports it when first used."""
+    return sys.modules.get(name) or LazyModule(name)
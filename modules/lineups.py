@@ -0,0 +1,101 @@
+# ─────────────────────────────────────────────
+# modules/lineups.py — Line-up suggestions for every upcoming match (no Streamlit)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+
+from config.settings import AVAIL_OPTIONS
+from modules.context import DataContext
+from modules.lazy import lazy_import
+from modules.seasons import current_season, season_match_ids
+from modules.services import save_selections
+
+pd = lazy_import("pandas")
+
+# Fills the open places of every upcoming match in one pass, date by date:
+#
+#   - players already selected stay, and count against the team size;
+#   - a player plays at most one match per day, whatever the team;
+#   - only players who answered ✅ (first) or ❓ are suggested;
+#   - among those, whoever has been selected least so far this season goes
+#     first, counting the suggestions made earlier in the same pass;
+#   - matches on the same day draft in turn (the one with most open places
+#     picks next), so a team with an early match id can't take every
+#     available player.
+#
+# Everything is plain dict/set work after one pass over the tabs: hundreds of
+# players × dozens of matches take milliseconds.
+
+AVAILABLE, _, MAYBE = AVAIL_OPTIONS
+_TIER = {AVAILABLE: 0, MAYBE: 1}
+
+
+@dataclass
+class LineupPlan:
+    suggested: pd.DataFrame    # match_id, pseudo, available — players to add
+    short:     dict[str, int]  # match_id → places still open after the suggestions
+
+    @property
+    def desired(self) -> dict[str, set[str]]:
+        """match_id → suggested pseudos, in the shape save_selections() takes (plus existing)."""
+        out: dict[str, set[str]] = {}
+        for mid, pseudo in self.suggested[["match_id", "pseudo"]].itertuples(index=False):
+            out.setdefault(mid, set()).add(pseudo)
+        return out
+
+
+def suggest_lineups(ctx: DataContext, upcoming: pd.DataFrame, sizes: dict[str, int]) -> LineupPlan:
+    """
+    Suggest players for the open places of `upcoming` matches; `sizes` gives
+    the line-up size per competition type.
+    """
+    df_a, df_s = ctx.dfs["availability"], ctx.dfs["selections"]
+
+    answers: dict[str, dict[str, int]] = {}
+    for mid, pseudo, avail in df_a[["match_id", "pseudo", "available"]].astype(str).itertuples(index=False):
+        if avail in _TIER:
+            answers.setdefault(mid, {})[pseudo] = _TIER[avail]
+    kept: dict[str, set[str]] = {}
+    for mid, pseudo in df_s[["match_id", "pseudo"]].astype(str).itertuples(index=False):
+        kept.setdefault(mid, set()).add(pseudo)
+    # selections so far this season, suggestions added as we go
+    season = set(season_match_ids(ctx, current_season()))
+    load   = Counter(df_s.loc[df_s["match_id"].astype(str).isin(season), "pseudo"].astype(str))
+
+    rows, short = [], {}
+    matches = upcoming.assign(match_id=upcoming["match_id"].astype(str), day=upcoming["date"].dt.date)
+    for _, day in matches.sort_values(["date", "team"]).groupby("day", sort=True):
+        mids  = day["match_id"].tolist()
+        busy  = set().union(*(kept.get(m, set()) for m in mids))
+        open_ = {
+            m: max(0, sizes.get(comp, 0) - len(kept.get(m, set())))
+            for m, comp in zip(mids, day["competition_type"].astype(str))
+        }
+        while True:
+            waiting = [m for m in mids if open_[m] and any(p not in busy for p in answers.get(m, {}))]
+            if not waiting:
+                break
+            mid    = max(waiting, key=lambda m: open_[m])   # stable: earliest team on ties
+            pool   = answers[mid]
+            pseudo = min((p for p in pool if p not in busy), key=lambda p: (pool[p], load[p], p))
+            busy.add(pseudo)
+            load[pseudo] += 1
+            open_[mid]   -= 1
+            rows.append({"match_id": mid, "pseudo": pseudo, "available": AVAILABLE if pool[pseudo] == 0 else MAYBE})
+        short.update({m: n for m, n in open_.items() if n})
+
+    return LineupPlan(pd.DataFrame(rows, columns=["match_id", "pseudo", "available"]), short)
+
+
+def accept_lineups(ctx: DataContext, plan: LineupPlan) -> int:
+    """Add every suggested player in one batched append. Returns how many selections were added."""
+    df_s    = ctx.dfs["selections"]
+    desired = {
+        mid: set(df_s.loc[df_s["match_id"].astype(str) == mid, "pseudo"].astype(str)) | pseudos
+        for mid, pseudos in plan.desired.items()
+    }
+    added, _ = save_selections(ctx, desired)
+    return added
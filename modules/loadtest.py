@@ -0,0 +1,225 @@
+# ─────────────────────────────────────────────
+# modules/loadtest.py — Concurrent-session load test (python cli.py load-test)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import gc
+import os
+import runpy
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from modules.localsheets import LocalSpreadsheet, seed_club
+
+# How many players can one server process take on match night? Each virtual
+# session runs in its own thread with its own st.session_state (a Streamlit
+# script-run context, as under `streamlit run`), and does what a player does:
+#
+#   1. sign in through auth.try_login_with_password;
+#   2. open every player page — the real page scripts, preceded by what
+#      app.py runs before each page (ui.start_page_run);
+#   3. answer an availability poll (the Save button's upsert_availability,
+#      then the page's rerun).
+#
+# The spreadsheet is a localsheets stand-in with Google-like latency, so
+# upstream calls are counted exactly and no quota is spent. Rendered
+# elements are serialized as they would be for the browser, then dropped.
+#
+# AppTest can't do this: it swaps process-wide runtime state on every run, so
+# its sessions can't run at the same time. The sessions here are built from
+# Streamlit's script-run internals instead, which are private and change
+# between releases: requirements-loadtest.txt pins the release they were
+# written against, and run() refuses any other.
+
+ROOT         = Path(__file__).resolve().parent.parent
+APP_PATH     = ROOT / "app.py"
+PLAYER_PAGES = {   # title → script, as in app.py's navigation
+    "Match Calendar":  "pages/player/calendar.py",
+    "My Availability": "pages/player/availability.py",
+    "Results":         "pages/player/results.py",
+    "Selections":      "pages/player/selections.py",
+}
+PASSWORD = "load-test"
+STREAMLIT_VERSION = "1.66.0"
+
+
+@dataclass
+class LevelReport:
+    sessions:       int
+    wall_s:         float
+    steps:          dict[str, list[float]]   # step (login, page title, save) → latencies
+    upstream_calls: int
+    rss_growth:     int                      # bytes, with every session of the level still alive
+    frame_bytes:    int                      # distinct DataFrames held by the sessions (sessions.usage)
+    errors:         list[str] = field(default_factory=list)
+
+    @property
+    def runs(self) -> int:
+        return sum(len(v) for v in self.steps.values())
+
+    @property
+    def throughput(self) -> float:
+        """Page runs (logins and saves included) per second."""
+        return self.runs / self.wall_s if self.wall_s else 0.0
+
+    def percentile(self, p: int, step: str | None = None) -> float:
+        values = self.steps.get(step, []) if step else [v for vs in self.steps.values() for v in vs]
+        if len(values) < 2:
+            return values[0] if values else 0.0
+        return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def _rss_bytes() -> int:
+    """Resident memory of this process (peak, where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _script_run_context(session_id: str):
+    """A fresh Streamlit session: its own session state, output discarded."""
+    from streamlit.runtime.fragment import MemoryFragmentStorage
+    from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
+    from streamlit.runtime.pages_manager import PagesManager
+    from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+    from streamlit.runtime.state import SafeSessionState, SessionState
+
+    return ScriptRunContext(
+        session_id=session_id,
+        _enqueue=lambda msg: msg.SerializeToString(),   # the cost of sending it, not the sending
+        query_string="",
+        session_state=SafeSessionState(SessionState(), lambda: None),
+        uploaded_file_mgr=MemoryUploadedFileManager("/_stcore/upload_file"),
+        main_script_path=str(APP_PATH),
+        user_info={},
+        fragment_storage=MemoryFragmentStorage(),
+        pages_manager=PagesManager(str(APP_PATH), setup_watcher=False),
+    )
+
+
+def _run_page(run_ctx, title: str, script: str) -> None:
+    """One rerun of a page, the way app.py runs it."""
+    from streamlit.runtime.scriptrunner_utils.exceptions import RerunException, StopException
+    from modules.metrics import timed_render
+    from modules.ui import start_page_run
+
+    run_ctx.reset(query_string="", page_script_hash="")
+    start_page_run(run_ctx.session_id, title)
+    with timed_render(title):
+        try:
+            runpy.run_path(str(ROOT / script), run_name="__main__")
+        except (StopException, RerunException):
+            pass
+
+
+def _session(index: int, pseudo: str, rounds: int, think_s: float, steps: dict, errors: list, held: list) -> None:
+    import streamlit as st
+    from streamlit.runtime.scriptrunner_utils.script_run_context import add_script_run_ctx
+    from modules.auth import init_session_state, session_context, try_login_with_password
+    from modules.gsheets import upsert_availability
+    from modules.views import upcoming_matches
+
+    run_ctx = _script_run_context(f"load-{index}")
+    add_script_run_ctx(threading.current_thread(), run_ctx)
+    init_session_state()
+
+    def timed(step: str, fn, *args) -> None:
+        t0 = time.perf_counter()
+        fn(*args)
+        steps.setdefault(step, []).append(time.perf_counter() - t0)
+
+    try:
+        timed("login", try_login_with_password, pseudo, PASSWORD)
+        if not st.session_state.authenticated:
+            errors.append(f"{pseudo}: login refused")
+            return
+        for r in range(rounds):
+            for title, script in PLAYER_PAGES.items():
+                time.sleep(think_s)
+                timed(title, _run_page, run_ctx, title, script)
+
+            def save() -> None:
+                ctx      = session_context()
+                upcoming = upcoming_matches(ctx)
+                if not upcoming.empty:
+                    mid = upcoming.iloc[r % len(upcoming)]["match_id"]
+                    upsert_availability(ctx, mid, pseudo, "✅ Available", f"load test {r}")
+                _run_page(run_ctx, "My Availability", PLAYER_PAGES["My Availability"])
+
+            time.sleep(think_s)
+            timed("save", save)
+        held.append(dict(st.session_state))   # the session stays open, as a browser tab would
+    except Exception as e:
+        errors.append(f"{pseudo}: {type(e).__name__}: {e}")
+
+
+def run_level(sh: LocalSpreadsheet, pseudos: list[str], sessions: int, rounds: int, think_s: float) -> LevelReport:
+    """Run `sessions` concurrent sessions to completion and measure them."""
+    from modules.sessions import usage
+
+    steps: dict[str, list[float]] = {}
+    errors: list[str] = []
+    held:   list[dict] = []
+    gc.collect()
+    rss0, calls0 = _rss_bytes(), sum(sh.calls.values())
+
+    threads = [
+        threading.Thread(target=_session, args=(i, pseudos[i % len(pseudos)], rounds, think_s, steps, errors, held))
+        for i in range(sessions)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    gc.collect()
+    report = LevelReport(
+        sessions=sessions, wall_s=wall, steps=steps,
+        upstream_calls=sum(sh.calls.values()) - calls0,
+        rss_growth=_rss_bytes() - rss0,
+        frame_bytes=usage()[1],
+        errors=errors,
+    )
+    held.clear()
+    return report
+
+
+def run(levels: list[int], latency_s: float, rounds: int = 1, think_s: float = 0.0, seed: int = 0) -> list[LevelReport]:
+    """
+    Seed a stand-in club big enough for the largest level, then run each
+    level in turn, after one unmeasured session (first-run imports and caches).
+    ValueError when the installed Streamlit is not STREAMLIT_VERSION.
+    """
+    import streamlit
+
+    if streamlit.__version__ != STREAMLIT_VERSION:
+        raise ValueError(
+            f"The load test drives private Streamlit internals and needs streamlit=={STREAMLIT_VERSION} "
+            f"(requirements-loadtest.txt); this is {streamlit.__version__}."
+        )
+    import modules.ratings    # noqa: F401 — the write listeners app.py registers after login
+    import modules.standings  # noqa: F401
+    from modules.services import hash_password
+    from modules.tenants import DEFAULT_TENANT, Tenant, set_registry
+    from streamlit import config
+    from streamlit.logger import set_log_level
+
+    # Bare-mode and deprecation warnings, logged on every page run otherwise
+    config.set_option("global.showWarningOnDirectExecution", False)
+    config.set_option("logger.level", "error")
+    set_log_level("error")
+    sh      = LocalSpreadsheet(latency_s=latency_s, seed=seed)
+    pseudos = seed_club(sh, max(levels), hash_password(PASSWORD), seed=seed)
+    tenant  = Tenant(DEFAULT_TENANT, "Load test", f"local://{sh.id}", "{}", None)
+    set_registry({DEFAULT_TENANT: tenant}, {DEFAULT_TENANT: sh})
+    run_level(sh, pseudos, 1, 1, 0.0)
+    return [run_level(sh, pseudos, n, rounds, think_s) for n in levels]
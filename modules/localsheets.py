@@ -0,0 +1,213 @@
+# ─────────────────────────────────────────────
+# modules/localsheets.py — In-memory stand-in for a Google spreadsheet (load tests)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from config.settings import AVAIL_OPTIONS, SHEET_SCHEMAS
+from modules.lazy import lazy_import
+
+gspread = lazy_import("gspread")
+
+# Implements the part of gspread's Spreadsheet / Worksheet API that
+# modules/gsheets.py calls, over rows kept in memory, so the data layer can be
+# driven at full concurrency without a Google account or quota. Every request
+# sleeps for a latency drawn from a log-normal distribution around
+# `latency_s` (Google's is typically 0.2–0.8 s, with a long tail), and is
+# counted by operation. Cells are stored as text and numericised on read, as
+# get_all_records does against Google.
+#
+# The visualization API is not emulated: filtered reads fall back to a full
+# read of the tab, as they do when Google refuses a query.
+
+_ids = itertools.count(1)
+
+
+class LocalWorksheet:
+    def __init__(self, sh: LocalSpreadsheet, title: str, rows: list[list[str]] | None = None):
+        self.spreadsheet = sh
+        self.title       = title
+        self.id          = next(_ids)
+        self._rows       = rows or []
+
+    def _grid(self, a1: str) -> tuple[int, int, int, int]:
+        """0-based (first row, first col, end row, end col) of an A1 range; open ends run to the last row."""
+        g = gspread.utils.a1_range_to_grid_range(a1)
+        return (
+            g.get("startRowIndex", 0), g.get("startColumnIndex", 0),
+            g.get("endRowIndex", len(self._rows)), g.get("endColumnIndex", max(map(len, self._rows), default=0)),
+        )
+
+    def get_all_records(self, **kwargs) -> list[dict]:
+        with self.spreadsheet._request("get_all_records"):
+            if not self._rows:
+                return []
+            header, body = self._rows[0], self._rows[1:]
+            while body and not any(body[-1]):
+                body = body[:-1]
+            return [
+                dict(zip(header, gspread.utils.numericise_all(row + [""] * (len(header) - len(row)))))
+                for row in body
+            ]
+
+    def batch_get(self, ranges: list[str], **kwargs) -> list[list[list[str]]]:
+        with self.spreadsheet._request("batch_get"):
+            out = []
+            for a1 in ranges:
+                r0, c0, r1, c1 = self._grid(a1)
+                values = [row[c0:c1] for row in self._rows[r0:r1]]
+                while values and not any(values[-1]):
+                    values.pop()
+                out.append(values)
+            return out
+
+    def append_row(self, values: list, **kwargs) -> None:
+        self.append_rows([values])
+
+    def append_rows(self, values: list[list], **kwargs) -> None:
+        with self.spreadsheet._request("append_rows"):
+            self._rows.extend([str(v) for v in row] for row in values)
+
+    def batch_update(self, data: list[dict], **kwargs) -> None:
+        with self.spreadsheet._request("batch_update"):
+            for d in data:
+                r0, c0, _, _ = self._grid(d["range"])
+                for i, values in enumerate(d["values"]):
+                    while len(self._rows) <= r0 + i:
+                        self._rows.append([])
+                    row = self._rows[r0 + i]
+                    row.extend([""] * (c0 + len(values) - len(row)))
+                    row[c0:c0 + len(values)] = [str(v) for v in values]
+
+
+class LocalClient:
+    def __init__(self, sh: LocalSpreadsheet):
+        self._sh = sh
+
+    def open_by_url(self, url: str) -> LocalSpreadsheet:
+        with self._sh._request("open_by_url"):
+            return self._sh
+
+    def request(self, method: str, url: str, **kwargs):
+        with self._sh._request("gviz"):
+            raise ValueError("the visualization API is not emulated by localsheets")
+
+
+class LocalSpreadsheet:
+    def __init__(self, latency_s: float = 0.3, jitter: float = 0.4, seed: int | None = None):
+        self.id        = f"local-{next(_ids)}"
+        self.title     = "Local stand-in"
+        self.client    = LocalClient(self)
+        self.latency_s = latency_s
+        self.jitter    = jitter            # sigma of the log-normal; 0.4 → p95 ≈ 1.9 × median
+        self.calls     = Counter()         # operation → requests served
+        self._wss: dict[str, LocalWorksheet] = {}
+        self._lock   = threading.Lock()    # one request applied at a time, like a single document
+        self._random = random.Random(seed)
+
+    def _request(self, op: str):
+        """Count a request, wait one simulated round trip, then apply it under the lock."""
+        self.calls[op] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s * self._random.lognormvariate(0, self.jitter))
+        return self._lock
+
+    def worksheet(self, title: str) -> LocalWorksheet:
+        with self._request("worksheet"):
+            if title not in self._wss:
+                raise gspread.WorksheetNotFound(title)
+            return self._wss[title]
+
+    def worksheets(self) -> list[LocalWorksheet]:
+        with self._request("worksheets"):
+            return list(self._wss.values())
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26, **kwargs) -> LocalWorksheet:
+        with self._request("add_worksheet"):
+            ws = self._wss[title] = LocalWorksheet(self, title)
+            return ws
+
+    def batch_update(self, body: dict) -> dict:
+        """The structural requests gsheets.py sends: deleteDimension, addSheet, appendCells."""
+        with self._request("batch_update"):
+            by_id = {ws.id: ws for ws in self._wss.values()}
+            for req in body["requests"]:
+                if "deleteDimension" in req:
+                    r = req["deleteDimension"]["range"]
+                    del by_id[r["sheetId"]]._rows[r["startIndex"]:r["endIndex"]]
+                elif "addSheet" in req:
+                    props = req["addSheet"]["properties"]
+                    ws    = self._wss[props["title"]] = by_id[props["sheetId"]] = LocalWorksheet(self, props["title"])
+                    ws.id = props["sheetId"]
+                elif "appendCells" in req:
+                    ac = req["appendCells"]
+                    by_id[ac["sheetId"]]._rows.extend(
+                        [str(next(iter(c["userEnteredValue"].values()))) for c in row["values"]]
+                        for row in ac["rows"]
+                    )
+                else:
+                    raise NotImplementedError(f"localsheets does not emulate {next(iter(req))}")
+            return {}
+
+    def load(self, tabs: dict[str, list[dict]]) -> None:
+        """Replace the content of some tabs (no latency, not counted)."""
+        for name, records in tabs.items():
+            cols = SHEET_SCHEMAS[name]
+            ws   = self._wss.get(name) or LocalWorksheet(self, name)
+            ws._rows = [list(cols)] + [[str(r.get(c, "")) for c in cols] for r in records]
+            self._wss[name] = ws
+
+
+def seed_club(
+    sh: LocalSpreadsheet,
+    players: int,
+    password_hash: str,
+    teams: int = 6,
+    matches_per_team: int = 18,
+    seed: int = 0,
+) -> list[str]:
+    """
+    Fill `sh` with a club of a realistic size: `players` accounts (p0001…,
+    all with `password_hash`), a season of matches per team with half of them
+    played, availability answers and line-ups. Returns the player pseudos.
+    """
+    rnd     = random.Random(seed)
+    pseudos = [f"p{i:04d}" for i in range(1, players + 1)]
+    names   = [f"Men {i // 2 + 1}" if i % 2 == 0 else f"Women {i // 2 + 1}" for i in range(teams)]
+    today   = date.today()
+
+    users = [{"pseudo": "admin", "password_hash": password_hash, "roles": "admin", "display_name": "Admin"}]
+    users += [
+        {"pseudo": p, "password_hash": password_hash, "roles": "captain,player" if i < teams else "player",
+         "display_name": f"Player {p[1:]}"}
+        for i, p in enumerate(pseudos)
+    ]
+    matches, availability, selections = [], [], []
+    for t, team in enumerate(names):
+        squad = pseudos[t::teams] or pseudos
+        for k in range(matches_per_team):
+            day    = today + timedelta(days=7 * (k - matches_per_team // 2) + t)
+            played = day < today
+            mid    = f"{team.replace(' ', '').lower()}-{k:02d}"
+            win    = rnd.random() < 0.5
+            matches.append({
+                "match_id": mid, "date": day.isoformat(), "competition_type": "Interclubs", "team": team,
+                "opponent_club": f"TC {chr(65 + rnd.randrange(20))}", "location": rnd.choice(["Home", "Away"]),
+                "status": "Played" if played else "Upcoming",
+                "score": ("6-3, 6-4" if win else "4-6, 3-6") if played else "",
+                "result": ("Win" if win else "Loss") if played else "",
+            })
+            for p in rnd.sample(squad, min(len(squad), 8)):
+                availability.append({"match_id": mid, "pseudo": p, "available": rnd.choice(AVAIL_OPTIONS), "comment": ""})
+            selections += [{"match_id": mid, "pseudo": p} for p in rnd.sample(squad, min(len(squad), 4))]
+
+    sh.load({"users": users, "matches": matches, "availability": availability, "selections": selections})
+    sh.load({name: [] for name in SHEET_SCHEMAS if name not in sh._wss})
+    return pseudos
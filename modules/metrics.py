@@ -0,0 +1,247 @@
+# ─────────────────────────────────────────────
+# modules/metrics.py — In-process metrics in Prometheus text format
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from config.settings import METRICS_FILE, METRICS_FILE_INTERVAL_S, SESSION_ACTIVE_S, SESSION_MEMORY_BUDGET_MB
+from modules import sessions, sidecar, telemetry
+from modules.breaker import CLOSED, HALF_OPEN, sheets_breaker
+
+# Collected per server process, exposed at /metrics on the sidecar port
+# and/or rewritten every METRICS_FILE_INTERVAL_S to METRICS_FILE (for
+# node_exporter's textfile collector). No client library needed.
+
+RENDER_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LOAD_BUCKETS   = telemetry.LATENCY_BUCKETS
+
+_lock = threading.Lock()
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts  = [0] * (len(buckets) + 1)
+        self.sum     = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+_renders: dict[str, _Histogram] = {}    # page → render durations
+_loads:   dict[str, _Histogram] = {}    # tab → load durations (fetch + parse)
+_cache   = Counter()                    # (tab, "hit" | "miss" | "refresh" | "pushdown") → lookups
+_views   = Counter()                    # (view, "hit" | "miss") → lookups
+_sessions_seen: dict[str, float] = {}   # session id → last run
+_sessions_total = 0
+_frames: dict[str, dict[int, weakref.ref]] = {}   # tab → live DataFrames (every session's copy)
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+@contextmanager
+def timed_render(page: str):
+    """Time one page run, including runs cut short by st.stop() / st.rerun()."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _lock:
+            _renders.setdefault(page, _Histogram(RENDER_BUCKETS)).observe(time.perf_counter() - t0)
+
+
+def observe_load(tab: str, seconds: float) -> None:
+    with _lock:
+        _loads.setdefault(tab, _Histogram(LOAD_BUCKETS)).observe(seconds)
+
+
+def observe_cache(tab: str, result: str) -> None:
+    with _lock:
+        _cache[(tab, result)] += 1
+
+
+def observe_view(view: str, result: str) -> None:
+    with _lock:
+        _views[(view, result)] += 1
+
+
+def observe_session(session_id: str) -> None:
+    global _sessions_total
+    now = time.time()
+    with _lock:
+        if session_id not in _sessions_seen:
+            _sessions_total += 1
+        _sessions_seen[session_id] = now
+        for sid, seen in list(_sessions_seen.items()):
+            if seen < now - SESSION_ACTIVE_S:
+                del _sessions_seen[sid]
+
+
+def track_frame(tab: str, df) -> None:
+    """Count `df` in the tab's memory gauge for as long as it is alive."""
+    with _lock:
+        refs = _frames.setdefault(tab, {})
+        # DataFrames aren't hashable, so no WeakSet: key by id, drop on collection
+        refs[id(df)] = weakref.ref(df, lambda _, key=id(df): refs.pop(key, None))
+
+
+def live_frames() -> dict[str, tuple[int, int]]:
+    """tab → (distinct live DataFrames, their bytes in memory); a frame shared by several sessions counts once."""
+    with _lock:
+        frames = {t: [df for r in list(refs.values()) if (df := r()) is not None] for t, refs in _frames.items()}
+    return {t: (len(dfs), sum(int(df.memory_usage(deep=True).sum()) for df in dfs)) for t, dfs in sorted(frames.items())}
+
+
+# ── Exposition ────────────────────────────────────────────────────────────────
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return f"{{{inner}}}" if inner else ""
+
+
+def _histogram_lines(name: str, series: list[tuple[dict, tuple, list[int], float]]) -> list[str]:
+    """Lines for one histogram; series = [(labels, bucket bounds, bucket counts, sum)]."""
+    lines = []
+    for labels, buckets, counts, total in series:
+        cumulative = 0
+        for bound, count in zip([*buckets, "+Inf"], counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(**labels)} {total:.6f}")
+        lines.append(f"{name}_count{_labels(**labels)} {cumulative}")
+    return lines
+
+
+def render_prometheus() -> str:
+    """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+    with _lock:
+        renders  = [({"page": p}, h.buckets, list(h.counts), h.sum) for p, h in sorted(_renders.items())]
+        loads    = [({"tab": t}, h.buckets, list(h.counts), h.sum) for t, h in sorted(_loads.items())]
+        cache    = dict(_cache)
+        views    = dict(_views)
+        active   = len(_sessions_seen)
+        total    = _sessions_total
+    frames = live_frames()
+    usage, held = sessions.usage()
+
+    out = [
+        "# HELP tc_page_render_seconds Wall time of one page run.",
+        "# TYPE tc_page_render_seconds histogram",
+        *_histogram_lines("tc_page_render_seconds", renders),
+        "# HELP tc_tab_load_seconds Time to load one tab (cache lookup or Google fetch, plus parsing).",
+        "# TYPE tc_tab_load_seconds histogram",
+        *_histogram_lines("tc_tab_load_seconds", loads),
+        "# HELP tc_sessions_active Browser sessions that ran a page in the last SESSION_ACTIVE_S.",
+        "# TYPE tc_sessions_active gauge",
+        f"tc_sessions_active {active}",
+        "# HELP tc_sessions_total Browser sessions seen since the process started.",
+        "# TYPE tc_sessions_total counter",
+        f"tc_sessions_total {total}",
+        "# HELP tc_cache_lookups_total Tab reads by outcome: shared-cache hit, miss (fetched), forced refresh, filtered by Google (pushdown), or last copy served while Google is down (degraded).",
+        "# TYPE tc_cache_lookups_total counter",
+        *(f"tc_cache_lookups_total{_labels(tab=t, result=r)} {n}" for (t, r), n in sorted(cache.items())),
+        "# HELP tc_view_lookups_total Derived-view lookups (modules/views.py) by outcome.",
+        "# TYPE tc_view_lookups_total counter",
+        *(f"tc_view_lookups_total{_labels(view=v, result=r)} {n}" for (v, r), n in sorted(views.items())),
+        "# HELP tc_dataframe_bytes Memory of the distinct live DataFrames of a tab (shared frames counted once).",
+        "# TYPE tc_dataframe_bytes gauge",
+        *(f"tc_dataframe_bytes{_labels(tab=t)} {n_bytes}" for t, (_, n_bytes) in frames.items()),
+        "# HELP tc_dataframes Distinct live DataFrames of a tab; sessions on the same version share one.",
+        "# TYPE tc_dataframes gauge",
+        *(f"tc_dataframes{_labels(tab=t)} {n}" for t, (n, _) in frames.items()),
+        "# HELP tc_session_data_bytes Memory of the distinct DataFrames held by sessions.",
+        "# TYPE tc_session_data_bytes gauge",
+        f"tc_session_data_bytes {held}",
+        "# HELP tc_session_data_budget_bytes SESSION_MEMORY_BUDGET_MB.",
+        "# TYPE tc_session_data_budget_bytes gauge",
+        f"tc_session_data_budget_bytes {SESSION_MEMORY_BUDGET_MB * sessions.MIB}",
+        "# HELP tc_sessions_released Sessions whose data is released (idle).",
+        "# TYPE tc_sessions_released gauge",
+        f"tc_sessions_released {sum(u.released for u in usage)}",
+        "# HELP tc_sessions_released_total Idle sessions whose data was released.",
+        "# TYPE tc_sessions_released_total counter",
+        f"tc_sessions_released_total {sessions.released_total()}",
+    ]
+
+    # Google API calls (modules/telemetry.py), without the per-user label
+    calls = Counter()
+    for (op, tab, page, _user, tenant, status), n in telemetry.totals().items():
+        calls[(op, tab, page, tenant, status)] += n
+    quotas = telemetry.quota_usage()
+    out += [
+        "# HELP tc_gsheets_requests_total Google Sheets API calls.",
+        "# TYPE tc_gsheets_requests_total counter",
+        *(f"tc_gsheets_requests_total{_labels(op=o, tab=t, page=p, tenant=c, status=s)} {n}"
+          for (o, t, p, c, s), n in sorted(calls.items())),
+        "# HELP tc_tenant_quota_per_minute Google API calls per minute guaranteed to a club.",
+        "# TYPE tc_tenant_quota_per_minute gauge",
+        *(f"tc_tenant_quota_per_minute{_labels(tenant=t)} {q}" for t, (_, q, _) in quotas.items()),
+        "# HELP tc_tenant_throttled_total Calls that waited for their club's quota.",
+        "# TYPE tc_tenant_throttled_total counter",
+        *(f"tc_tenant_throttled_total{_labels(tenant=t)} {w}" for t, (_, _, w) in quotas.items()),
+        "# HELP tc_gsheets_breaker_state Google Sheets circuit breaker: 0 closed, 1 half-open (probing), 2 open.",
+        "# TYPE tc_gsheets_breaker_state gauge",
+        f"tc_gsheets_breaker_state {0 if sheets_breaker.state == CLOSED else 1 if sheets_breaker.state == HALF_OPEN else 2}",
+        "# HELP tc_gsheets_breaker_trips_total Times the breaker opened.",
+        "# TYPE tc_gsheets_breaker_trips_total counter",
+        f"tc_gsheets_breaker_trips_total {sheets_breaker.trips}",
+        "# HELP tc_gsheets_breaker_rejected_total Calls refused without trying Google while the breaker was open.",
+        "# TYPE tc_gsheets_breaker_rejected_total counter",
+        f"tc_gsheets_breaker_rejected_total {sheets_breaker.rejected}",
+        "# HELP tc_gsheets_request_seconds Google Sheets API call latency.",
+        "# TYPE tc_gsheets_request_seconds histogram",
+        *_histogram_lines("tc_gsheets_request_seconds", [
+            ({"op": op, "tab": tab}, telemetry.LATENCY_BUCKETS, counts, total_s)
+            for (op, tab), (counts, total_s) in sorted(telemetry.histograms().items())
+        ]),
+    ]
+    return "\n".join(out) + "\n"
+
+
+@sidecar.route("/metrics")
+def _metrics_endpoint(query, headers):
+    return 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}, render_prometheus().encode()
+
+
+def write_textfile(path: str | Path = METRICS_FILE) -> None:
+    """Atomically replace `path` with the current metrics."""
+    path = Path(path)
+    tmp  = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+    tmp.write_text(render_prometheus())
+    os.replace(tmp, path)
+
+
+_writer_started = False
+
+
+def start_exporters() -> None:
+    """Start the /metrics endpoint and the textfile writer, as configured (idempotent)."""
+    global _writer_started
+    sidecar.ensure_started()
+    if not METRICS_FILE:
+        return
+    with _lock:
+        if _writer_started:
+            return
+        _writer_started = True
+
+    def loop() -> None:
+        while True:
+            write_textfile()
+            time.sleep(METRICS_FILE_INTERVAL_S)
+
+    threading.Thread(target=loop, name="metrics-textfile", daemon=True).start()
@@ -0,0 +1,137 @@
+# ─────────────────────────────────────────────
+# modules/profiler.py — Sampling profiler for one page run
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from config.settings import PROFILE_DIR, PROFILE_INTERVAL_S
+
+
+# A background thread snapshots the script thread's Python stack every
+# PROFILE_INTERVAL_S. Unlike cProfile it adds almost no overhead to the page
+# itself, and the samples give a true flame graph (time in Google I/O,
+# pandas loops and Plotly all show up under the page line that caused it).
+
+
+def _frame_label(code) -> str:
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Context manager sampling the calling thread's stack until exit."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_S):
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()   # root-first stack → samples
+        self.elapsed  = 0.0
+        self._stop    = threading.Event()
+
+    def __enter__(self) -> StackSampler:
+        caller       = sys._getframe(1)
+        self._tid    = threading.get_ident()
+        self._skip   = self._depth(caller) - 1   # keep the caller's own frame as the root
+        self._t0     = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="page-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._t0
+
+    @staticmethod
+    def _depth(frame) -> int:
+        depth = 0
+        while frame is not None:
+            depth, frame = depth + 1, frame.f_back
+        return depth
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._tid)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            if len(stack) > self._skip:
+                self.stacks[tuple(stack[self._skip:])] += 1
+
+    # ── Reports ──────────────────────────────────────────────────────────────
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def seconds_per_sample(self) -> float:
+        return self.elapsed / self.samples if self.samples else 0.0
+
+    def top_functions(self, n: int = 25) -> list[dict]:
+        """Functions by total time (on the stack) and self time (at the top of it)."""
+        total, own = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            for label in set(stack):
+                total[label] += count
+            own[stack[-1]] += count
+        scale = self.seconds_per_sample()
+        return [
+            {
+                "function":  label,
+                "total_s":   round(total[label] * scale, 3),
+                "self_s":    round(own[label] * scale, 3),
+                "total_pct": round(100 * total[label] / self.samples, 1),
+            }
+            for label, _ in total.most_common(n)
+        ]
+
+    def icicle(self, min_share: float = 0.005) -> dict[str, list]:
+        """
+        Flame-graph nodes for plotly's icicle chart (ids, labels, parents,
+        values). Nodes below `min_share` of all samples are dropped.
+        """
+        values: Counter[tuple[str, ...]] = Counter()
+        for stack, count in self.stacks.items():
+            for i in range(1, len(stack) + 1):
+                values[stack[:i]] += count
+        floor = self.samples * min_share
+        nodes = sorted(path for path, v in values.items() if v >= floor)
+        return {
+            "ids":     [";".join(p) for p in nodes],
+            "labels":  [p[-1] for p in nodes],
+            "parents": [";".join(p[:-1]) for p in nodes],
+            "values":  [values[p] for p in nodes],
+        }
+
+    def folded(self) -> str:
+        """Samples in the folded-stack format read by flamegraph.pl and speedscope."""
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common())
+
+    def write_report(self, page: str, user: str | None, out_dir: str | Path = PROFILE_DIR) -> Path:
+        """Write `<stamp>_<page>.folded` and a `.txt` summary; return the .txt path."""
+        out  = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        slug = "".join(c if c.isalnum() else "_" for c in page.lower()).strip("_")
+        base = out / f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]}_{slug}"   # ms: a save and its rerun share a second
+
+        base.with_suffix(".folded").write_text(self.folded() + "\n")
+        lines = [
+            f"page:     {page}",
+            f"user:     {user or '-'}",
+            f"taken at: {datetime.now().isoformat(timespec='seconds')}",
+            f"elapsed:  {self.elapsed:.3f} s   samples: {self.samples}",
+            "",
+            f"{'total s':>9}{'self s':>9}{'total %':>9}  function",
+        ]
+        for row in self.top_functions(50):
+            lines.append(f"{row['total_s']:>9.3f}{row['self_s']:>9.3f}{row['total_pct']:>9.1f}  {row['function']}")
+        base.with_suffix(".txt").write_text("\n".join(lines) + "\n")
+        return base.with_suffix(".txt")
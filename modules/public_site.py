@@ -0,0 +1,242 @@
+# ─────────────────────────────────────────────
+# modules/public_site.py — Static public site: results, standings, fixtures (no Streamlit)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import hashlib
+import html
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from config.settings import APP_ICON, APP_TITLE, PUBLIC_RESULTS_COUNT, PUBLIC_SITE_DIR
+from modules.context import DataContext
+from modules.gsheets import on_write
+from modules.lazy import lazy_import
+from modules.standings import standings
+from modules.tenants import DEFAULT_TENANT
+from modules.views import played_matches, upcoming_matches
+
+pd = lazy_import("pandas")
+
+# Parents and members without an account read plain files served by any web
+# server (or a bucket), so public traffic costs the app and the Sheets quota
+# nothing. Everything comes from the matches tab: one read per export.
+#
+# Each page is fingerprinted from the rows it shows. manifest.json in the
+# output folder keeps the fingerprint of every page written, and an export
+# only renders and rewrites pages whose fingerprint moved: saving one result
+# rewrites the results, standings and that team's page, not the fixtures.
+# Files are replaced atomically, so a reader never sees half a page.
+#
+# Only match data is published: no player names, answers or selections.
+
+MANIFEST = "manifest.json"
+LAYOUT   = 1   # bump when the templates change, to rewrite every page
+
+FIXTURE_COLUMNS = ["match_id", "date", "competition_type", "team", "opponent_club", "location"]
+RESULT_COLUMNS  = ["match_id", "date", "competition_type", "team", "opponent_club", "score", "result"]
+TABLE_COLUMNS   = ["position", "club", "played", "won", "drawn", "lost", "points", "rubber_diff", "set_diff", "game_diff"]
+_HEADINGS       = {
+    "date": "Date", "competition_type": "Competition", "team": "Team", "opponent_club": "Opponent",
+    "location": "Location", "score": "Score", "result": "Result", "position": "#", "club": "Club",
+    "played": "P", "won": "W", "drawn": "D", "lost": "L", "points": "Pts",
+    "rubber_diff": "Rubbers ±", "set_diff": "Sets ±", "game_diff": "Games ±",
+}
+
+
+@dataclass
+class Page:
+    path:   str
+    data:   tuple[pd.DataFrame, ...]   # what the page shows: its fingerprint
+    render: Callable[[], str]
+
+
+@dataclass
+class ExportReport:
+    written:   list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    removed:   list[str] = field(default_factory=list)
+
+
+# ── Data ──────────────────────────────────────────────────────────────────────
+
+def public_frame(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """`columns` of `df` as published: dates as YYYY-MM-DD, blanks for missing values."""
+    out = df.reindex(columns=columns)
+    if "date" in out:
+        out = out.assign(date=pd.to_datetime(out["date"], errors="coerce").dt.strftime("%Y-%m-%d").fillna(""))
+    return out.fillna("").reset_index(drop=True)
+
+
+def _slug(name: str) -> str:
+    return "".join(c if c.isalnum() else "-" for c in name.lower()).strip("-") or "team"
+
+
+def fingerprint(page: Page, nav: list[str]) -> str:
+    h = hashlib.sha1(f"{LAYOUT}:{page.path}:{nav}".encode())
+    for df in page.data:
+        h.update(",".join(map(str, df.columns)).encode())
+        if not df.empty:
+            h.update(pd.util.hash_pandas_object(df.astype(str), index=False).values.tobytes())
+    return h.hexdigest()
+
+
+# ── Rendering ─────────────────────────────────────────────────────────────────
+
+_STYLE = (
+    "body{font-family:system-ui,sans-serif;max-width:60rem;margin:2rem auto;padding:0 1rem;color:#222}"
+    "table{border-collapse:collapse;width:100%;margin:.5rem 0 1.5rem}"
+    "th,td{padding:.3rem .5rem;border-bottom:1px solid #ddd;text-align:left}"
+    "nav a{margin-right:1rem}.Win{color:#1a7f37}.Loss{color:#cf222e}.Draw{color:#9a6700}"
+)
+
+
+def _document(title: str, body: str, teams: list[str]) -> str:
+    links = "".join(
+        f'<a href="{href}">{html.escape(label)}</a>'
+        for href, label in [("index.html", "Home"), ("results.html", "Results"),
+                            ("standings.html", "Standings"), ("fixtures.html", "Fixtures")]
+        + [(f"team-{_slug(t)}.html", t) for t in teams]
+    )
+    updated = datetime.now().strftime("%d %b %Y %H:%M")
+    return (
+        f'<!doctype html><html lang="en"><head><meta charset="utf-8">'
+        f'<meta name="viewport" content="width=device-width,initial-scale=1">'
+        f"<title>{html.escape(f'{APP_TITLE} — {title}')}</title><style>{_STYLE}</style></head>"
+        f"<body><h1>{APP_ICON} {html.escape(APP_TITLE)}</h1><nav>{links}</nav>"
+        f"<h2>{html.escape(title)}</h2>{body}<footer><small>Updated {updated}</small></footer></body></html>\n"
+    )
+
+
+def _html_table(df: pd.DataFrame, empty: str, bold: str | None = None) -> str:
+    if df.empty:
+        return f"<p>{html.escape(empty)}</p>"
+    cols = [c for c in df.columns if c != "match_id"]
+    head = "".join(f"<th>{html.escape(_HEADINGS.get(c, c))}</th>" for c in cols)
+    rows = []
+    for rec in df[cols].to_dict("records"):
+        attrs = ' style="font-weight:bold"' if bold is not None and rec.get("club") == bold else ""
+        cells = "".join(
+            f'<td class="{html.escape(str(v))}">{html.escape(str(v))}</td>' if c == "result"
+            else f"<td>{html.escape(f'{v:+d}' if c.endswith('_diff') else str(v))}</td>"
+            for c, v in rec.items()
+        )
+        rows.append(f"<tr{attrs}>{cells}</tr>")
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{''.join(rows)}</tbody></table>"
+
+
+def _html_standings(table: pd.DataFrame) -> str:
+    if table.empty:
+        return "<p>No standings yet.</p>"
+    parts = [f"<p>Season {html.escape(str(table['season'].iloc[0]))} · points, then rubber, set and game difference</p>"]
+    for (competition, team), group in table.groupby(["competition_type", "team"], sort=True):
+        parts.append(f"<h3>{html.escape(team)} — {html.escape(competition)}</h3>")
+        parts.append(_html_table(group[TABLE_COLUMNS], "", bold=team))
+    return "".join(parts)
+
+
+def _json(df: pd.DataFrame) -> str:
+    return json.dumps(df.to_dict("records"), ensure_ascii=False, indent=1, default=int) + "\n"
+
+
+# ── Pages ─────────────────────────────────────────────────────────────────────
+
+def _teams(ctx: DataContext) -> list[str]:
+    """Teams with a page (and a link in every page's menu)."""
+    return sorted(set(upcoming_matches(ctx)["team"].astype(str)) | set(played_matches(ctx)["team"].astype(str)))
+
+
+def build_pages(ctx: DataContext) -> list[Page]:
+    """Every page of the site with the data it shows (nothing rendered yet)."""
+    fixtures = public_frame(upcoming_matches(ctx), FIXTURE_COLUMNS)
+    results  = public_frame(played_matches(ctx), RESULT_COLUMNS)
+    table    = standings(ctx)
+    if not table.empty:
+        table = table[table["season"] == table["season"].max()].reset_index(drop=True)
+    teams = _teams(ctx)
+    nxt   = fixtures.head(PUBLIC_RESULTS_COUNT)
+    last  = results.head(PUBLIC_RESULTS_COUNT)
+
+    def doc(title: str, body: str) -> str:
+        return _document(title, body, teams)
+
+    pages = [
+        Page("index.html", (nxt, last), lambda: doc(
+            "Home",
+            "<h3>Next matches</h3>" + _html_table(nxt, "No upcoming matches.")
+            + "<h3>Latest results</h3>" + _html_table(last, "No results yet."),
+        )),
+        Page("results.html",   (results,),  lambda: doc("Results", _html_table(results, "No results yet."))),
+        Page("fixtures.html",  (fixtures,), lambda: doc("Fixtures", _html_table(fixtures, "No upcoming matches."))),
+        Page("standings.html", (table,),    lambda: doc("Standings", _html_standings(table))),
+        Page("results.json",   (results,),  lambda: _json(results)),
+        Page("fixtures.json",  (fixtures,), lambda: _json(fixtures)),
+        Page("standings.json", (table,),    lambda: _json(table.reindex(columns=["season", "competition_type", "team", *TABLE_COLUMNS]))),
+    ]
+    for team in teams:
+        f = fixtures[fixtures["team"] == team]
+        r = results[results["team"] == team]
+        t = table[table["team"] == team] if not table.empty else table
+        pages.append(Page(f"team-{_slug(team)}.html", (f, r, t), lambda team=team, f=f, r=r, t=t: doc(
+            team,
+            "<h3>Fixtures</h3>" + _html_table(f, "No upcoming matches.")
+            + "<h3>Results</h3>" + _html_table(r, "No results yet.")
+            + "<h3>Standings</h3>" + _html_standings(t),
+        )))
+    return pages
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+_export_lock = threading.Lock()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def export_site(ctx: DataContext, out_dir: str | Path, force: bool = False) -> ExportReport:
+    """
+    Write the public site to `out_dir`, rewriting only pages whose data
+    changed since the last export there (every page with force=True).
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    report = ExportReport()
+    with _export_lock:
+        try:
+            manifest = json.loads((out / MANIFEST).read_text())
+        except (OSError, ValueError):
+            manifest = {}
+        fresh = {}
+        nav   = _teams(ctx)
+        for page in build_pages(ctx):
+            fp = fingerprint(page, nav)
+            fresh[page.path] = fp
+            if not force and manifest.get(page.path) == fp and (out / page.path).exists():
+                report.unchanged.append(page.path)
+                continue
+            _write_atomic(out / page.path, page.render())
+            report.written.append(page.path)
+        for path in sorted(set(manifest) - set(fresh)):
+            (out / path).unlink(missing_ok=True)
+            report.removed.append(path)
+        if report.written or report.removed:
+            _write_atomic(out / MANIFEST, json.dumps(fresh, indent=1, sort_keys=True) + "\n")
+    return report
+
+
+@on_write("matches")
+def _export_on_write(ctx: DataContext) -> None:
+    """Keep the site current from the app itself when TC_PUBLIC_SITE_DIR is set (one subfolder per club)."""
+    if PUBLIC_SITE_DIR and "matches" in ctx.dfs:
+        club = ctx.tenant if ctx.tenant not in (None, DEFAULT_TENANT) else ""
+        export_site(ctx, Path(PUBLIC_SITE_DIR) / club)
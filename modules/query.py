@@ -0,0 +1,141 @@
+# ─────────────────────────────────────────────
+# modules/query.py — Filtered, projected reads of one tab
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+from config.settings import GVIZ_MAX_IN, SHEET_SCHEMAS
+from modules.lazy import lazy_import
+
+pd      = lazy_import("pandas")
+gspread = lazy_import("gspread")
+
+# A Query says which rows and columns of a tab a caller needs. The same query
+# is compiled for every backend gsheets.query() can use:
+#
+#   - a DataFrame already in memory        → apply()
+#   - the shared SQLite cache              → to_sql()   (json_each over the snapshot)
+#   - Google's visualization endpoint      → to_gviz()  (rows filtered server-side)
+#
+# Backends only narrow the data down; apply() always runs last, so a filter a
+# backend can't express (too long an IN list, awkward quoting) is still honoured.
+
+
+@dataclass(frozen=True)
+class Query:
+    tab:       str
+    where:     tuple[tuple[str, tuple[str, ...]], ...] = ()   # (column, allowed values), ANDed
+    date_from: date | None = None   # matches.date >= date_from
+    date_to:   date | None = None   # matches.date <= date_to
+    columns:   tuple[str, ...] | None = None
+
+    @classmethod
+    def of(
+        cls,
+        tab: str,
+        *,
+        columns: list[str] | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        **filters,
+    ) -> Query:
+        """
+        Query.of("matches", status="Upcoming", team="Men 1")
+        Query.of("selections", match_id={"m1", "m2"}, columns=["pseudo"])
+        A filter value is one value or a collection of allowed values.
+        """
+        schema = SHEET_SCHEMAS[tab]
+        for col in [*filters, *(columns or [])]:
+            if col not in schema:
+                raise ValueError(f"'{tab}' has no column '{col}'.")
+        if (date_from or date_to) and "date" not in schema:
+            raise ValueError(f"'{tab}' has no date column.")
+        where = tuple(
+            (col, (str(v),) if isinstance(v, (str, int)) else tuple(sorted(str(x) for x in v)))
+            for col, v in sorted(filters.items())
+        )
+        return cls(tab, where, date_from, date_to, tuple(columns) if columns else None)
+
+    @property
+    def fetched_columns(self) -> list[str]:
+        """Columns a backend must return: the projection plus every filtered column."""
+        if self.columns is None:
+            return list(SHEET_SCHEMAS[self.tab])
+        needed = set(self.columns) | {c for c, _ in self.where}
+        if self.date_from or self.date_to:
+            needed.add("date")
+        return [c for c in SHEET_SCHEMAS[self.tab] if c in needed]
+
+
+# ── In memory ─────────────────────────────────────────────────────────────────
+
+def apply(df: pd.DataFrame, q: Query) -> pd.DataFrame:
+    """Run `q` against a parsed DataFrame of its tab."""
+    if df.empty:
+        return df[list(q.columns)] if q.columns else df
+    mask = pd.Series(True, index=df.index)
+    for col, values in q.where:
+        mask &= df[col].astype(str).isin(values)
+    if q.date_from:
+        mask &= df["date"] >= pd.Timestamp(q.date_from)
+    if q.date_to:
+        mask &= df["date"] <= pd.Timestamp(q.date_to)
+    out = df[mask]
+    return out[list(q.columns)] if q.columns else out
+
+
+# ── SQLite (shared cache snapshots) ───────────────────────────────────────────
+
+def _json_col(col: str) -> str:
+    return f"json_extract(j.value, '$.\"{col}\"')"
+
+
+def to_sql(q: Query) -> tuple[str, list]:
+    """WHERE clause (over json_each rows `j`) and its parameters."""
+    clauses, params = [], []
+    for col, values in q.where:
+        clauses.append(f"CAST({_json_col(col)} AS TEXT) IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    # Snapshots hold the records as read from the sheet, dates as ISO strings
+    if q.date_from:
+        clauses.append(f"substr({_json_col('date')}, 1, 10) >= ?")
+        params.append(q.date_from.isoformat())
+    if q.date_to:
+        clauses.append(f"substr({_json_col('date')}, 1, 10) <= ?")
+        params.append(q.date_to.isoformat())
+    return " AND ".join(clauses) or "1", params
+
+
+# ── Google visualization query ────────────────────────────────────────────────
+
+def _gviz_literal(value: str) -> str | None:
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    return None   # can't be quoted; left to apply()
+
+
+def to_gviz(q: Query) -> str:
+    """
+    A visualization-API query (SELECT … WHERE …) over column letters.
+    The app writes every cell as text (RAW), dates included, so string
+    comparisons are exact.
+    """
+    schema  = SHEET_SCHEMAS[q.tab]
+    letter  = {c: gspread.utils.rowcol_to_a1(1, i + 1)[:-1] for i, c in enumerate(schema)}
+    clauses = []
+    for col, values in q.where:
+        literals = [_gviz_literal(v) for v in values]
+        if not values or len(values) > GVIZ_MAX_IN or None in literals:
+            continue
+        clauses.append("(" + " or ".join(f"{letter[col]} = {lit}" for lit in literals) + ")")
+    if q.date_from:
+        clauses.append(f"{letter['date']} >= '{q.date_from.isoformat()}'")
+    if q.date_to:
+        clauses.append(f"{letter['date']} <= '{q.date_to.isoformat()}'")
+    select = ", ".join(letter[c] for c in q.fetched_columns)
+    return f"select {select}" + (f" where {' and '.join(clauses)}" if clauses else "")
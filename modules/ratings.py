@@ -0,0 +1,199 @@
+# ─────────────────────────────────────────────
+# modules/ratings.py — Incremental Elo ratings for teams and players
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+from config.settings import RATING_K, RATING_START
+from modules.context import DataContext
+from modules.gsheets import (
+    WriteConflict, append_rows, list_archives, load_history, on_archive, on_write, reload_sheet, replace_rows,
+)
+from modules.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# Every played match with a Win/Loss/Draw is one Elo contest against the
+# opponent club: our team and each selected player are rated against the
+# club's rating, and the club against our team's. When the tie's rubbers were
+# entered, players are rated on the rubbers they played instead (one contest
+# per rubber, summed when a player played several). Results are applied in
+# date order.
+#
+# The `ratings` tab is both the engine's state and its history: one row per
+# entity per rated match, with the rating before and after. Current ratings
+# are the last row of each entity, and a match is rated once it appears in
+# the log. So saving a result only rates the matches not in the log yet
+# (one append); a full rebuild from every season is an explicit job
+# (cli.py rebuild-ratings, Site Settings → Ratings).
+#
+# Archiving a season moves its rows to ratings_<season> like the other
+# season tabs, so the live log stays one season long. Each entity left
+# without a live row keeps its rating through a CARRIED_OVER row (before =
+# after = its rating at the end of the archived seasons), written in the same
+# batch as the archive; a rebuild writes the same rows for archived seasons.
+
+SCORE        = {"Win": 1.0, "Draw": 0.5, "Loss": 0.0}
+CARRIED_OVER = "carried-over"   # match_id of the rows carrying archived seasons' ratings
+
+
+def expected(rating: float, opponent: float) -> float:
+    """Elo win expectancy of `rating` against `opponent`."""
+    return 1 / (1 + 10 ** ((opponent - rating) / 400))
+
+
+def carried_over(state: dict[tuple[str, str], float]) -> list[dict]:
+    """Log rows keeping `state` in the live log once the matches behind it are archived."""
+    return [
+        {"match_id": CARRIED_OVER, "date": "", "kind": kind, "name": name, "result": "", "before": r, "after": r}
+        for (kind, name), r in state.items()
+    ]
+
+
+def current_state(log: pd.DataFrame) -> dict[tuple[str, str], float]:
+    """(kind, name) → rating after the last logged match."""
+    if log.empty:
+        return {}
+    last = log.groupby(["kind", "name"], sort=False)["after"].last()
+    return {(str(k), str(n)): float(r) for (k, n), r in last.items()}
+
+
+def rateable(matches: pd.DataFrame) -> pd.DataFrame:
+    """Played matches with a result, in the order they are rated."""
+    if matches.empty:
+        return matches
+    done = matches[(matches["status"] == "Played") & matches["result"].isin(list(SCORE))]
+    return done.sort_values(["date", "match_id"], kind="stable")
+
+
+def _contests(selections: pd.DataFrame, rubbers: pd.DataFrame | None) -> tuple[dict, dict]:
+    """match_id → selected pseudos, and match_id → [(pseudos, score)] for decided rubbers."""
+    selected = selections.groupby("match_id")["pseudo"].agg(list).to_dict() if not selections.empty else {}
+    played: dict[str, list[tuple[list[str], float]]] = {}
+    if rubbers is not None and not rubbers.empty:
+        decided = rubbers[rubbers["winner"].isin(["Us", "Them"])]
+        for r in decided.itertuples(index=False):
+            pseudos = [p.strip() for p in str(r.players).split(",") if p.strip()]
+            played.setdefault(r.match_id, []).append((pseudos, 1.0 if r.winner == "Us" else 0.0))
+    return selected, played
+
+
+def rate(
+    matches: pd.DataFrame,
+    selections: pd.DataFrame,
+    state: dict[tuple[str, str], float],
+    rubbers: pd.DataFrame | None = None,
+) -> list[dict]:
+    """
+    Apply `matches` (already in order) to `state`, updating it in place.
+    Returns the log rows to append.
+    """
+    selected, played = _contests(selections, rubbers)
+    rows = []
+    for m in matches.itertuples(index=False):
+        score    = SCORE[m.result]
+        opponent = ("opponent", str(m.opponent_club))
+        team     = ("team", str(m.team))
+        r_opp    = state.get(opponent, RATING_START)
+        r_team   = state.get(team, RATING_START)
+        contests = played.get(m.match_id) or [([p], score) for p in selected.get(m.match_id, [])]
+
+        updates = {team: (r_team, r_team + RATING_K * (score - expected(r_team, r_opp)))}
+        for pseudos, s in contests:
+            for p in pseudos:
+                before, after = updates.get(("player", str(p)), (state.get(("player", str(p)), RATING_START),) * 2)
+                updates[("player", str(p))] = (before, after + RATING_K * (s - expected(before, r_opp)))
+        updates[opponent] = (r_opp, r_opp + RATING_K * ((1 - score) - expected(r_opp, r_team)))
+
+        day = m.date.strftime("%Y-%m-%d") if pd.notna(m.date) else ""
+        for (kind, name), (before, after) in updates.items():
+            state[(kind, name)] = round(after, 1)   # as the log keeps it, so rebuilds and updates agree
+            rows.append({
+                "match_id": m.match_id, "date": day, "kind": kind, "name": name,
+                "result": m.result, "before": round(before, 1), "after": round(after, 1),
+            })
+    return rows
+
+
+# ── Incremental update and full rebuild ───────────────────────────────────────
+
+def pending_matches(ctx: DataContext) -> pd.DataFrame:
+    """Rateable matches of the live tab not in the rating log yet."""
+    todo = rateable(ctx.dfs["matches"])
+    return todo[~todo["match_id"].isin(ctx.dfs["ratings"]["match_id"])] if not todo.empty else todo
+
+
+def stale_matches(ctx: DataContext) -> list[str]:
+    """Rated matches whose result has changed since; only a rebuild corrects them."""
+    log = ctx.dfs["ratings"]
+    if log.empty:
+        return []
+    rated = log.drop_duplicates("match_id").set_index("match_id")["result"]
+    live  = ctx.dfs["matches"].set_index("match_id")
+    now   = live["result"].where(live["status"] == "Played", "").reindex(rated.index)
+    return sorted(rated.index[now.notna() & (now != rated)].astype(str))
+
+
+def update_ratings(ctx: DataContext) -> int:
+    """Rate the matches played since the last update. Returns how many were rated."""
+    if pending_matches(ctx).empty:
+        return 0
+    reload_sheet(ctx, "ratings")   # another session may have just rated them
+    todo = pending_matches(ctx)
+    if todo.empty:
+        return 0
+    state = current_state(ctx.dfs["ratings"])
+    try:
+        append_rows(ctx, "ratings", rate(todo, ctx.dfs["selections"], state, ctx.dfs["rubbers"]))
+    except WriteConflict:   # another session rated them since the reload
+        reload_sheet(ctx, "ratings")
+        return 0
+    return len(todo)
+
+
+def rebuild_ratings(ctx: DataContext) -> int:
+    """
+    Recompute every rating from the first archived season on. Returns matches
+    rated. Only the live seasons are logged in full; archived ones leave their
+    end state as CARRIED_OVER rows (their ratings_<season> logs are kept as written).
+    """
+    seasons    = list(list_archives(ctx))
+    matches    = rateable(load_history(ctx, "matches", seasons))
+    selections = load_history(ctx, "selections", seasons)
+    rubbers    = load_history(ctx, "rubbers", seasons)
+    live       = matches["match_id"].astype(str).isin(ctx.dfs["matches"]["match_id"].astype(str))
+    state: dict[tuple[str, str], float] = {}
+    rate(matches[~live], selections, state, rubbers)
+    replace_rows(ctx, "ratings", carried_over(state) + rate(matches[live], selections, state, rubbers))
+    return len(matches)
+
+
+@on_archive("ratings")
+def _carry_over(moved: list[dict], kept: list[dict]) -> tuple[list[int], list[dict]]:
+    """Replace the carried-over rows by the state after the archived season, for entities with no live row left."""
+    old   = [i for i, r in enumerate(kept) if str(r["match_id"]) == CARRIED_OVER]
+    live  = {(str(r["kind"]), str(r["name"])) for r in kept if str(r["match_id"]) != CARRIED_OVER}
+    state = {(str(r["kind"]), str(r["name"])): float(r["after"]) for r in [*(kept[i] for i in old), *moved]}
+    return old, carried_over({e: r for e, r in state.items() if e not in live})
+
+
+@on_write("matches")
+def _rate_new_results(ctx: DataContext) -> None:
+    if "ratings" in ctx.dfs and "matches" in ctx.dfs:
+        update_ratings(ctx)
+
+
+# ── Reporting ─────────────────────────────────────────────────────────────────
+
+def ratings_table(log: pd.DataFrame, kind: str) -> pd.DataFrame:
+    """Current rating, matches rated and last change of every entity of `kind`, best first."""
+    cols = ["name", "rating", "matches", "last_change"]
+    rows = log[log["kind"] == kind] if not log.empty else log
+    if rows.empty:
+        return pd.DataFrame(columns=cols)
+    played = rows["match_id"].astype(str) != CARRIED_OVER
+    out = rows.assign(played=played, change=(rows["after"] - rows["before"]).where(played)).groupby("name", sort=False).agg(
+        rating=("after", "last"), matches=("played", "sum"), last_change=("change", "last"),
+    )
+    out["last_change"] = out["last_change"].fillna(0.0)
+    return out.reset_index().sort_values("rating", ascending=False, ignore_index=True)[cols]
@@ -0,0 +1,149 @@
+# ─────────────────────────────────────────────
+# modules/scores.py — Structured, vectorised score parsing (no Streamlit)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from modules.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# The score column is free text, always from the club's side:
+#
+#   "6-3, 4-6, 7-5"                  one rubber, three sets
+#   "7-6(5) 6-4"                     tiebreak, with the loser's points
+#   "6-3 3-6 [10-8]"                 match tiebreak instead of a third set
+#   "6-3, 6-4; 2-6, 6-7(3-7)"        several rubbers, separated by ";" (or "|")
+#
+# Everything below works on whole columns (str.extractall, groupby); there is
+# no per-match Python loop, so years of results parse in one pass.
+
+RUBBER_SEP = r"\s*[;|\n]\s*"
+SET_RE     = (
+    r"(?P<open>\[)?(?P<us>\d{1,2})\s*[-–:/]\s*(?P<them>\d{1,2})\]?"
+    r"(?:\s*\(\s*(?P<tb_a>\d{1,2})(?:\s*[-–:/]\s*(?P<tb_b>\d{1,2}))?\s*\))?"
+)
+
+SET_COLUMNS   = ["match_id", "rubber", "set", "us", "them", "tiebreak", "tb_us", "tb_them", "match_tiebreak", "valid"]
+ISSUE_COLUMNS = ["match_id", "score", "problem"]
+
+
+@dataclass
+class ParsedScores:
+    sets:   pd.DataFrame   # one row per set, SET_COLUMNS
+    issues: pd.DataFrame   # one row per problem found, ISSUE_COLUMNS
+
+    @property
+    def valid_sets(self) -> pd.DataFrame:
+        """Sets of matches whose score parsed cleanly."""
+        return self.sets[~self.sets["match_id"].isin(self.issues["match_id"])]
+
+
+def parse_scores(matches: pd.DataFrame) -> ParsedScores:
+    """Parse the score of every row of `matches` (needs match_id, score, result)."""
+    scores = matches[["match_id", "score", "result"]].astype({"score": str}).copy()
+    scores["score"] = scores["score"].str.strip()
+    scores = scores[scores["score"] != ""]
+    if scores.empty:
+        return ParsedScores(pd.DataFrame(columns=SET_COLUMNS), pd.DataFrame(columns=ISSUE_COLUMNS))
+
+    # ── Rubbers ──────────────────────────────────────────────────────────────
+    rubbers = (
+        scores.assign(text=scores["score"].str.split(RUBBER_SEP, regex=True))
+        .explode("text")
+        .reset_index(drop=True)
+    )
+    rubbers["rubber"] = rubbers.groupby("match_id").cumcount() + 1
+
+    # ── Sets ─────────────────────────────────────────────────────────────────
+    found = rubbers["text"].str.extractall(SET_RE)
+    sets  = found.reset_index(level="match").rename(columns={"match": "set"})
+    sets  = rubbers[["match_id", "rubber"]].join(sets, how="inner")
+    sets["set"] += 1
+    for col in ("us", "them", "tb_a", "tb_b"):
+        sets[col] = pd.to_numeric(sets[col], errors="coerce").astype("Int64")
+
+    hi, lo   = sets[["us", "them"]].max(axis=1), sets[["us", "them"]].min(axis=1)
+    last_set = sets["set"] == sets.groupby(["match_id", "rubber"])["set"].transform("max")
+    sets["tiebreak"]       = hi.eq(7) & lo.eq(6)
+    sets["match_tiebreak"] = last_set & (sets["open"].notna() | (hi >= 10)) & (hi - lo >= 2) & (hi >= 10)
+
+    # Tiebreak points: "(5)" is the loser's score; "(7-5)" is ours-theirs
+    loser_pts = sets["tb_a"].where(sets["tb_b"].isna())
+    we_won    = sets["us"] > sets["them"]
+    sets["tb_us"]   = sets["tb_a"].where(sets["tb_b"].notna(), (loser_pts + 2).clip(lower=7).where(we_won, loser_pts))
+    sets["tb_them"] = sets["tb_b"].where(sets["tb_b"].notna(), loser_pts.where(we_won, (loser_pts + 2).clip(lower=7)))
+    sets.loc[~sets["tiebreak"], ["tb_us", "tb_them"]] = pd.NA
+
+    regular       = (hi.eq(6) & lo.le(4)) | (hi.eq(7) & lo.isin([5, 6]))
+    sets["valid"] = regular | sets["match_tiebreak"]
+    sets          = sets[SET_COLUMNS].reset_index(drop=True)
+
+    # ── Problems ─────────────────────────────────────────────────────────────
+    residue = rubbers["text"].str.replace(SET_RE, "", regex=True).str.replace(r"[\s,]", "", regex=True)
+    issues  = [
+        rubbers.loc[residue != "", ["match_id", "score"]].assign(problem="unreadable: " + residue[residue != ""]),
+        rubbers.loc[~rubbers.index.isin(found.index.get_level_values(0)), ["match_id", "score"]]
+               .assign(problem="no set score found"),
+    ]
+    bad = sets[~sets["valid"]]
+    issues.append(
+        bad[["match_id"]].assign(problem="impossible set " + bad["us"].astype(str) + "-" + bad["them"].astype(str))
+        .merge(scores[["match_id", "score"]], on="match_id")
+    )
+
+    # The sets must agree with the Win/Loss entered for the match
+    implied    = implied_results(sets)
+    entered    = scores.set_index("match_id")["result"].reindex(implied.index)
+    clash      = entered.isin(["Win", "Loss", "Draw"]) & (entered != implied)
+    issues.append(
+        pd.DataFrame({"match_id": implied.index[clash]})
+        .assign(problem=[f"score gives a {i}, result says {e}" for i, e in zip(implied[clash], entered[clash])])
+        .merge(scores[["match_id", "score"]], on="match_id")
+    )
+
+    issues = pd.concat(issues, ignore_index=True)[ISSUE_COLUMNS].drop_duplicates(ignore_index=True)
+    return ParsedScores(sets, issues)
+
+
+def implied_results(sets: pd.DataFrame) -> pd.Series:
+    """match_id → Win / Loss / Draw: the majority of rubbers, each won on the majority of its sets."""
+    set_wins   = sets.assign(won=sets["us"] > sets["them"]).groupby(["match_id", "rubber"])["won"].agg(["sum", "count"])
+    rubber_won = (set_wins["sum"] * 2 > set_wins["count"]).groupby("match_id").agg(["sum", "count"])
+    implied    = pd.Series("Draw", index=rubber_won.index)
+    implied[rubber_won["sum"] * 2 > rubber_won["count"]] = "Win"
+    implied[rubber_won["sum"] * 2 < rubber_won["count"]] = "Loss"
+    return implied
+
+
+# ── Statistics ────────────────────────────────────────────────────────────────
+
+def set_totals(sets: pd.DataFrame) -> dict[str, int]:
+    """Sets, games and tiebreaks won and lost (match tiebreaks count as a set, not as games)."""
+    won       = sets["us"] > sets["them"]
+    regular   = sets[~sets["match_tiebreak"]]
+    tiebreaks = sets["tiebreak"] | sets["match_tiebreak"]
+    return {
+        "sets_won":        int(won.sum()),
+        "sets_lost":       int((~won).sum()),
+        "games_won":       int(regular["us"].sum()),
+        "games_lost":      int(regular["them"].sum()),
+        "tiebreaks_won":   int((tiebreaks & won).sum()),
+        "tiebreaks_lost":  int((tiebreaks & ~won).sum()),
+    }
+
+
+def margin_distribution(sets: pd.DataFrame) -> pd.DataFrame:
+    """How often each set score (from the winner's side, e.g. "6-3") was won and lost."""
+    regular = sets[~sets["match_tiebreak"]]
+    if regular.empty:
+        return pd.DataFrame(columns=["set_score", "won", "lost"])
+    hi    = regular[["us", "them"]].max(axis=1).astype(int).astype(str)
+    lo    = regular[["us", "them"]].min(axis=1).astype(int).astype(str)
+    dist  = pd.crosstab(hi + "-" + lo, regular["us"] > regular["them"])
+    dist  = dist.reindex(columns=[True, False], fill_value=0)
+    dist.columns = ["won", "lost"]
+    order = sorted(dist.index, key=lambda s: tuple(int(x) for x in s.split("-")))
+    return dist.loc[order].rename_axis("set_score").reset_index()
@@ -0,0 +1,87 @@
+# ─────────────────────────────────────────────
+# modules/seasons.py — Season arithmetic (no Streamlit, no I/O)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import re
+from datetime import date, timedelta
+
+from config.settings import SEASON_START_MONTH, SEASON_TABS
+from modules.context import DataContext
+from modules.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# A match's season follows from its date, so the sheets need no extra column:
+# "2024-25" = SEASON_START_MONTH 2024 up to the day before it in 2025.
+
+_ARCHIVE_TITLE = re.compile(rf"^({'|'.join(SEASON_TABS)})_(\d{{4}}-\d{{2}})$")
+
+
+def season_of(day: date) -> str:
+    start = day.year if day.month >= SEASON_START_MONTH else day.year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def season_series(dates: pd.Series) -> pd.Series:
+    """Vectorised season_of; missing dates give an empty string."""
+    dates = pd.to_datetime(dates, errors="coerce")
+    start = dates.dt.year - (dates.dt.month < SEASON_START_MONTH)
+    label = start.astype("Int64").astype(str) + "-" + ((start + 1) % 100).astype("Int64").astype(str).str.zfill(2)
+    return label.where(dates.notna(), "")
+
+
+def current_season(today: date | None = None) -> str:
+    return season_of(today or date.today())
+
+
+def season_bounds(season: str) -> tuple[date, date]:
+    """First and last day of a season."""
+    start = date(int(season[:4]), SEASON_START_MONTH, 1)
+    end   = date(start.year + 1, SEASON_START_MONTH, 1) - timedelta(days=1)
+    return start, end
+
+
+def archive_title(tab: str, season: str) -> str:
+    return f"{tab}_{season}"
+
+
+def parse_archive_title(title: str) -> tuple[str, str] | None:
+    """(tab, season) for an archive tab title, else None."""
+    m = _ARCHIVE_TITLE.match(title)
+    return (m.group(1), m.group(2)) if m else None
+
+
+def season_match_ids(ctx: DataContext, season: str) -> list[str]:
+    """Ids of the matches of `season` still in the live matches tab."""
+    df_m = ctx.dfs["matches"]
+    if df_m.empty:
+        return []
+    return df_m.loc[season_series(df_m["date"]) == season, "match_id"].astype(str).tolist()
+
+
+def season_summary(ctx: DataContext, today: date | None = None) -> pd.DataFrame:
+    """
+    One row per season still in the live tabs: row counts per tab, upcoming
+    matches, and whether it can be archived (the oldest, over, nothing upcoming).
+    """
+    today = today or date.today()
+    df_m  = ctx.dfs["matches"]
+    cols  = ["season", *SEASON_TABS, "upcoming", "archivable"]
+    if df_m.empty:
+        return pd.DataFrame(columns=cols)
+
+    seasons  = season_series(df_m["date"])
+    by_match = dict(zip(df_m["match_id"].astype(str), seasons))
+    rows = []
+    for season in sorted(s for s in seasons.unique() if s):
+        in_season = seasons == season
+        upcoming  = int((df_m.loc[in_season, "status"] == "Upcoming").sum())
+        row = {"season": season, "upcoming": upcoming}
+        for tab in SEASON_TABS:
+            ids      = ctx.dfs[tab]["match_id"].astype(str) if not ctx.dfs[tab].empty else pd.Series(dtype=str)
+            row[tab] = int(in_season.sum()) if tab == "matches" else int((ids.map(by_match) == season).sum())
+        row["archivable"] = not rows and season_bounds(season)[1] < today and upcoming == 0
+        rows.append(row)
+    return pd.DataFrame(rows, columns=cols)
@@ -0,0 +1,101 @@
+# ─────────────────────────────────────────────
+# modules/served.py — One read-only data context per club and process, for endpoints
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+
+from config.settings import SERVED_REFRESH_S, SHEET_SCHEMAS
+from modules.context import DataContext
+from modules.gsheets import load_tab, on_write, sync_shared_cache
+from modules.telemetry import set_tenant
+
+# Sidecar endpoints (calendar feeds…) have no Streamlit session. They all read
+# this context instead (one per club), opened from secrets.toml on first use.
+# Polling clients never cause Google reads of their own:
+#
+#   - a session of this process that writes a tab hands its new DataFrame
+#     over (write listener): no copy, no fetch;
+#   - with a shared cache, writes of other processes arrive through
+#     sync_shared_cache (one SQLite query);
+#   - every SERVED_REFRESH_S the tabs are re-read, for edits made directly
+#     in the sheet; a tab that comes back identical keeps its version, so
+#     version-based ETags and memoized views stay valid.
+#
+# Frames are shared with the writing session: never modify them in place.
+
+_lock = threading.Lock()   # guards the dicts below and the swaps into served contexts
+_contexts:   dict[str, DataContext]    = {}   # club key → context
+_refreshed:  dict[str, float]          = {}
+_club_locks: dict[str, threading.Lock] = {}   # club key → held while opening or updating it
+
+
+def served_context(club: str | None = None) -> DataContext:
+    """
+    The shared context of `club` (the only club when not given); ValueError if unknown.
+
+    Google is never called under the process-wide lock: a club's first
+    request opens it under that club's own lock, and a due refresh is done
+    by whichever request finds the club lock free, while concurrent requests
+    go on reading the current frames.
+    """
+    from modules.tenants import resolve
+
+    tenant = resolve(club)
+    set_tenant(tenant.key)
+    with _lock:
+        ctx       = _contexts.get(tenant.key)
+        club_lock = _club_locks.setdefault(tenant.key, threading.Lock())
+    if ctx is None:
+        with club_lock:
+            with _lock:
+                ctx = _contexts.get(tenant.key)
+            if ctx is None:
+                from modules.tenants import connect_tenant
+                ctx = connect_tenant(tenant)
+                with _lock:
+                    _contexts[tenant.key], _refreshed[tenant.key] = ctx, time.monotonic()
+        return ctx
+    if club_lock.acquire(blocking=False):
+        try:
+            if time.monotonic() - _refreshed[tenant.key] > SERVED_REFRESH_S:
+                _refresh(tenant.key, ctx)
+            else:
+                sync_shared_cache(ctx)
+        finally:
+            club_lock.release()
+    return ctx
+
+
+def _refresh(key: str, ctx: DataContext) -> None:
+    """Re-read every tab of a served context, then swap the changed ones in."""
+    seen  = dict(ctx.versions)
+    fresh = {name: load_tab(ctx.worksheets[name], name) for name in SHEET_SCHEMAS}
+    with _lock:
+        for name, (df, version) in fresh.items():
+            if ctx.versions.get(name) != seen.get(name):
+                continue   # a session's write was adopted meanwhile: newer than our read
+            old = ctx.dfs.get(name)
+            if old is None or not df.equals(old):
+                ctx.dfs[name], ctx.versions[name] = df, version
+        _refreshed[key] = time.monotonic()
+
+
+def _adopt(tab: str, ctx: DataContext) -> None:
+    """Take over a tab a session just wrote, if one of ours is on that spreadsheet and older."""
+    if ctx.sh is None:
+        return
+    with _lock:
+        for served in _contexts.values():
+            if served is ctx or served.sh is None or served.sh.id != ctx.sh.id:
+                continue
+            if ctx.versions.get(tab, 0) > served.versions.get(tab, 0):
+                served.dfs[tab]      = ctx.dfs[tab]
+                served.versions[tab] = ctx.versions[tab]
+
+
+for _tab in SHEET_SCHEMAS:
+    on_write(_tab)(functools.partial(_adopt, _tab))
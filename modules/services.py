@@ -0,0 +1,202 @@
+# ─────────────────────────────────────────────
+# modules/services.py — Plain-Python service layer
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import hashlib
+import re
+from datetime import date
+from typing import Mapping
+
+from modules.context import DataContext
+
+
+# Everything here works on an explicit DataContext and never touches
+# st.session_state, so it runs the same inside a page and in cli.py.
+
+
+# ── Connection ────────────────────────────────────────────────────────────────
+
+def connect_from_secrets(secrets: Mapping | None = None, load: bool = True, club: str | None = None) -> DataContext:
+    """
+    Open the club spreadsheet described by secrets.toml (`club` among several,
+    see modules/tenants.py) and load every tab (or nothing, with load=False —
+    then read with gsheets.query()).
+    """
+    from modules.tenants import connect_tenant, resolve
+
+    return connect_tenant(resolve(club, secrets), load)
+
+
+def connect(creds_raw: str, sheet_url: str) -> DataContext:
+    """Open a spreadsheet from raw JSON credentials and load every tab."""
+    from modules.gsheets import build_connection, open_context
+
+    _, sh = build_connection(creds_raw, sheet_url)
+    return open_context(sh)
+
+
+# ── Password helpers ──────────────────────────────────────────────────────────
+
+def hash_password(password: str) -> str:
+    return hashlib.sha256(password.strip().encode()).hexdigest()
+
+
+def verify_password(password: str, stored_hash: str) -> bool:
+    return hash_password(password) == stored_hash
+
+
+# ── Accounts ──────────────────────────────────────────────────────────────────
+
+ADMIN_PSEUDO = "admin"
+
+
+def parse_roles(raw) -> list[str]:
+    """Split a comma-separated roles cell into a clean list."""
+    return [r.strip() for r in str(raw).split(",") if r.strip()]
+
+
+def _user_info(row, default_roles: str, default_display: str) -> dict:
+    return {
+        "pseudo":       str(row["pseudo"]),
+        "roles":        parse_roles(row.get("roles", default_roles)),
+        "display_name": str(row.get("display_name", default_display)),
+    }
+
+
+def authenticate(ctx: DataContext, pseudo: str, password: str) -> tuple[dict | None, str]:
+    """
+    Check pseudo + password against the users tab.
+    Returns (user_info, "") on success, (None, error_message) otherwise.
+    """
+    users_df = ctx.dfs.get("users")
+    if users_df is None or users_df.empty:
+        return None, "No users registered yet. Ask your admin to create your account."
+
+    match = users_df[users_df["pseudo"] == pseudo]
+    if match.empty:
+        return None, "Unknown username."
+
+    row = match.iloc[0]
+    if not verify_password(password, str(row["password_hash"])):
+        return None, "Incorrect password."
+
+    return _user_info(row, "player", pseudo), ""
+
+
+def ensure_admin_account(ctx: DataContext) -> dict:
+    """Seed the default admin account on first connection and return its info."""
+    from modules.gsheets import append_row
+
+    users_df = ctx.dfs["users"]
+    if users_df.empty or ADMIN_PSEUDO not in users_df["pseudo"].values:
+        append_row(ctx, "users", {
+            "pseudo":        ADMIN_PSEUDO,
+            "password_hash": hash_password("changeme"),
+            "roles":         "admin,captain,player",
+            "display_name":  "Admin",
+        })
+
+    users_df = ctx.dfs["users"]
+    row      = users_df[users_df["pseudo"] == ADMIN_PSEUDO].iloc[0]
+    return _user_info(row, "admin", "Admin")
+
+
+# ── Matches ───────────────────────────────────────────────────────────────────
+
+def match_id_for(match_date: date, opponent: str) -> str:
+    """Stable match id: YYYYMMDD + first 10 alphanumerics of the opponent club."""
+    slug = re.sub(r"[^a-z0-9]", "", opponent.lower())[:10]
+    return f"{match_date.strftime('%Y%m%d')}_{slug}"
+
+
+# ── Selections ────────────────────────────────────────────────────────────────
+
+def save_selections(ctx: DataContext, desired: dict[str, set[str]]) -> tuple[int, int]:
+    """
+    Make the selections of each match in `desired` ({match_id: {pseudo, ...}})
+    exactly match it, writing only the difference with the selections tab:
+    one batched append for added players, one batched delete for removed ones.
+    Matches not in `desired` are left alone. Returns (added, removed).
+    """
+    from modules.gsheets import append_rows, delete_rows
+
+    df_s    = ctx.dfs["selections"]
+    current = {
+        (str(m), str(p))
+        for m, p in df_s[df_s["match_id"].astype(str).isin(desired)][["match_id", "pseudo"]].itertuples(index=False)
+    }
+    wanted  = {(str(m), str(p)) for m, players in desired.items() for p in players}
+
+    added   = sorted(wanted - current)
+    removed = sorted(current - wanted)
+    if added:
+        append_rows(ctx, "selections", [{"match_id": m, "pseudo": p} for m, p in added])
+    if removed:
+        delete_rows(ctx, "selections", [{"match_id": m, "pseudo": p} for m, p in removed])
+    return len(added), len(removed)
+
+
+# ── Rubbers ───────────────────────────────────────────────────────────────────
+
+def tie_result(rubbers: list[dict]) -> tuple[str, str]:
+    """
+    Fill in each rubber's winner from its score when left blank, and return
+    the tie's (score, result): the rubber scores joined with "; " and
+    Win / Loss / Draw on rubbers won. Rubbers with neither winner nor a
+    readable score don't count.
+    """
+    import pandas as pd
+    from modules.scores import implied_results, parse_scores
+
+    scored = pd.DataFrame({
+        "match_id": range(len(rubbers)),
+        "score":    [str(r.get("score", "")) for r in rubbers],
+        "result":   "",
+    })
+    implied = implied_results(parse_scores(scored).sets)
+    for i, r in enumerate(rubbers):
+        if not r.get("winner") and implied.get(i) in ("Win", "Loss"):
+            r["winner"] = "Us" if implied[i] == "Win" else "Them"
+
+    won, lost = (sum(r.get("winner") == side for r in rubbers) for side in ("Us", "Them"))
+    result    = "" if not won + lost else "Win" if won > lost else "Loss" if lost > won else "Draw"
+    return "; ".join(str(r["score"]).strip() for r in rubbers if str(r.get("score", "")).strip()), result
+
+
+def save_rubbers(ctx: DataContext, match_id: str, rubbers: list[dict]) -> str:
+    """
+    Replace the rubbers of a tie with `rubbers` (dicts with type, players,
+    score, winner; numbered in order) and record the derived score and result
+    on the match, which becomes Played. Writes only what changed: one batched
+    append for a tie entered for the first time, plus the match update.
+    Returns the derived result.
+    """
+    from modules.gsheets import append_rows, delete_rows, update_cells, update_rows
+
+    rubbers = [{**r, "match_id": match_id, "rubber": i} for i, r in enumerate(rubbers, start=1)]
+    score, result = tie_result(rubbers)
+
+    df_r     = ctx.dfs["rubbers"]
+    cols     = ["type", "players", "score", "winner"]
+    existing = {
+        int(r["rubber"]): {c: str(r[c]) for c in cols}
+        for r in df_r[df_r["match_id"].astype(str) == str(match_id)].to_dict("records")
+    }
+    new     = [r for r in rubbers if r["rubber"] not in existing]
+    changed = [
+        ({"match_id": match_id, "rubber": r["rubber"]}, {c: r.get(c, "") for c in cols})
+        for r in rubbers
+        if r["rubber"] in existing and existing[r["rubber"]] != {c: str(r.get(c, "")) for c in cols}
+    ]
+    removed = [{"match_id": match_id, "rubber": n} for n in existing if n > len(rubbers)]
+
+    if new:
+        append_rows(ctx, "rubbers", new)
+    if changed:
+        update_rows(ctx, "rubbers", changed)
+    if removed:
+        delete_rows(ctx, "rubbers", removed)
+    update_cells(ctx, "matches", "match_id", match_id, {"status": "Played", "score": score, "result": result})
+    return result
@@ -0,0 +1,133 @@
+# ─────────────────────────────────────────────
+# modules/sessions.py — Memory held by each session's data (no Streamlit)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from collections import Counter
+from dataclasses import dataclass
+
+from config.settings import (
+    SESSION_EVICT_INTERVAL_S, SESSION_EVICT_MIN_IDLE_S, SESSION_IDLE_S, SESSION_MEMORY_BUDGET_MB,
+)
+from modules.context import DataContext
+
+# Streamlit keeps a session (and its st.session_state.ctx) for as long as its
+# browser tab is open, so without a limit the server holds the data of every
+# tab anyone ever left open. app.py calls touch() on every run; check_budget()
+# then releases the DataFrames of sessions that have not run for
+# SESSION_IDLE_S, and, while all sessions together hold more than
+# SESSION_MEMORY_BUDGET_MB, of any session idle SESSION_EVICT_MIN_IDLE_S,
+# longest idle first. A released session gets its data back on its next run
+# (gsheets.restore_frames) from the process's newest copy of each tab, with
+# no Google call — the copy that sessions on the same version share anyway.
+
+MIB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SessionUsage:
+    session_id:   str
+    user:         str | None
+    idle_s:       float
+    bytes:        int    # its DataFrames
+    shared_bytes: int    # … of which other sessions hold the very same frames
+    released:     bool
+
+
+_lock     = threading.Lock()
+_sessions: dict[str, tuple[weakref.ref[DataContext], str | None, float]] = {}   # id → (ctx, user, last run)
+_sizes:    dict[int, int] = {}   # id(df) → bytes, while the frame is alive
+_released: Counter[str | None] = Counter()   # club key → sessions released since start
+_last_check     = 0.0
+
+
+def frame_bytes(df) -> int:
+    """Deep memory of a DataFrame, measured once (frames are never edited in place)."""
+    size = _sizes.get(id(df))
+    if size is None:
+        size = _sizes[id(df)] = int(df.memory_usage(deep=True).sum())
+        weakref.finalize(df, _sizes.pop, id(df), None)
+    return size
+
+
+def touch(session_id: str, ctx: DataContext, user: str | None) -> None:
+    """Record a run of this session (its context is not released while it runs)."""
+    with _lock:
+        _sessions[session_id] = (weakref.ref(ctx), user, time.monotonic())
+
+
+def _live(tenant: str | None = None) -> list[tuple[str, DataContext, str | None, float]]:
+    """(id, ctx, user, last run) of the sessions still holding a context (of `tenant` if given), holding _lock."""
+    for sid in [sid for sid, (ref, _, _) in _sessions.items() if ref() is None]:
+        del _sessions[sid]   # logged out, or the tab was closed
+    return [
+        (sid, ctx, user, seen) for sid, (ref, user, seen) in _sessions.items()
+        if (ctx := ref()) is not None and (tenant is None or ctx.tenant == tenant)
+    ]
+
+
+def _held_bytes(contexts: list[DataContext]) -> int:
+    """Memory of the distinct frames these contexts hold."""
+    frames = {id(df): df for ctx in contexts for df in ctx.dfs.values()}
+    return sum(frame_bytes(df) for df in frames.values())
+
+
+def usage(tenant: str | None = None) -> tuple[list[SessionUsage], int]:
+    """Every session's data (of one club if given), largest first, and the memory they hold together."""
+    now = time.monotonic()
+    with _lock:
+        live = _live(tenant)
+    holders = Counter(id(df) for _, ctx, _, _ in live for df in ctx.dfs.values())
+    rows = [
+        SessionUsage(
+            session_id=sid, user=user, idle_s=now - seen,
+            bytes=sum(frame_bytes(df) for df in ctx.dfs.values()),
+            shared_bytes=sum(frame_bytes(df) for df in ctx.dfs.values() if holders[id(df)] > 1),
+            released=ctx.released,
+        )
+        for sid, ctx, user, seen in live
+    ]
+    return sorted(rows, key=lambda u: -u.bytes), _held_bytes([ctx for _, ctx, _, _ in live])
+
+
+def released_total(tenant: str | None = None) -> int:
+    """Sessions (of one club if given) whose data was released since the process started."""
+    return _released[tenant] if tenant is not None else sum(_released.values())
+
+
+def enforce(budget_bytes: int = SESSION_MEMORY_BUDGET_MB * MIB, tenant: str | None = None) -> int:
+    """
+    Release the data of idle sessions as described above, among one club's
+    sessions if `tenant` is given. Returns how many were released.
+    """
+    from modules.gsheets import release_frames
+
+    now = time.monotonic()
+    with _lock:
+        live     = _live(tenant)
+        holding  = [(seen, ctx) for _, ctx, _, seen in live if not ctx.released]
+        released = 0
+        for seen, ctx in sorted(holding, key=lambda e: e[0]):   # longest idle first
+            idle = now - seen
+            if idle < SESSION_IDLE_S:
+                if idle < SESSION_EVICT_MIN_IDLE_S or _held_bytes([c for _, c in holding if not c.released]) <= budget_bytes:
+                    break
+            release_frames(ctx)
+            _released[ctx.tenant] += 1
+            released += 1
+    return released
+
+
+def check_budget() -> None:
+    """enforce(), at most every SESSION_EVICT_INTERVAL_S (called on every page run)."""
+    global _last_check
+    now = time.monotonic()
+    with _lock:
+        if now - _last_check < SESSION_EVICT_INTERVAL_S:
+            return
+        _last_check = now
+    enforce()
@@ -0,0 +1,240 @@
+# ─────────────────────────────────────────────
+# modules/shared_cache.py — Cross-process sheet cache
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable
+
+from config.settings import SHARED_CACHE_LEASE_S, SHARED_CACHE_PATH, SHARED_CACHE_TTL_S
+
+
+# One SQLite file shared by every server process on the host. It holds the
+# parsed records of each tab, their version, and an append-only event log that
+# processes poll to learn which tabs changed. Tabs are namespaced by
+# spreadsheet id so several spreadsheets can share one file.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    ns         TEXT    NOT NULL,
+    tab        TEXT    NOT NULL,
+    version    INTEGER NOT NULL,
+    fetched_at REAL    NOT NULL,
+    stale      INTEGER NOT NULL DEFAULT 0,
+    records    TEXT    NOT NULL,
+    PRIMARY KEY (ns, tab)
+);
+CREATE TABLE IF NOT EXISTS events (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    ns      TEXT    NOT NULL,
+    tab     TEXT    NOT NULL,
+    kind    TEXT    NOT NULL,   -- snapshot | invalidate
+    version INTEGER NOT NULL,
+    at      REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    ns      TEXT NOT NULL,
+    tab     TEXT NOT NULL,
+    owner   TEXT NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (ns, tab)
+);
+"""
+
+EVENT_RETENTION_S = 24 * 3600
+_POLL_S           = 0.05
+
+
+class SharedCache:
+    """Tab snapshots, versions and invalidation events in a shared SQLite file."""
+
+    def __init__(self, path: str):
+        self.path   = path
+        self.owner  = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ── Snapshots ─────────────────────────────────────────────────────────────
+
+    def get(self, ns: str, tab: str, allow_stale: bool = False) -> tuple[list[dict], int] | None:
+        """
+        Return (records, version) if a fresh snapshot exists, else None.
+        allow_stale returns any snapshot (Google unreachable, see gsheets.load_tab).
+        """
+        row = self._conn().execute(
+            "SELECT records, version, fetched_at, stale FROM snapshots WHERE ns=? AND tab=?",
+            (ns, tab),
+        ).fetchone()
+        if row is None or (not allow_stale and (row[3] or time.time() - row[2] > SHARED_CACHE_TTL_S)):
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, ns: str, tab: str, records: list[dict], version: int, since: int | None = None) -> None:
+        """
+        Store a freshly fetched snapshot and announce it.
+
+        `since` is last_event_id() taken before the fetch started: if the tab
+        was invalidated after it, the fetch may predate that write, so the
+        snapshot is stored stale (kept only as a last-known copy) rather than
+        hiding the invalidation from every other reader.
+        """
+        now  = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            stale = since is not None and conn.execute(
+                "SELECT 1 FROM events WHERE ns=? AND tab=? AND kind='invalidate' AND id>?",
+                (ns, tab, since),
+            ).fetchone() is not None
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (ns, tab, version, fetched_at, stale, records) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (ns, tab, version, now, int(stale), json.dumps(records, default=str)),
+            )
+            conn.execute(
+                "INSERT INTO events (ns, tab, kind, version, at) VALUES (?, ?, 'snapshot', ?, ?)",
+                (ns, tab, version, now),
+            )
+            conn.execute("DELETE FROM events WHERE at < ?", (now - EVENT_RETENTION_S,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def invalidate(self, ns: str, tab: str, version: int) -> None:
+        """Mark a tab as changed upstream; the next reader refetches it once."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("UPDATE snapshots SET stale=1 WHERE ns=? AND tab=?", (ns, tab))
+            conn.execute(
+                "INSERT INTO events (ns, tab, kind, version, at) VALUES (?, ?, 'invalidate', ?, ?)",
+                (ns, tab, version, time.time()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def select(self, ns: str, tab: str, columns: list[str], where: str, params: list) -> list[dict] | None:
+        """
+        Run a filter over a fresh snapshot's records in SQLite (json_each), so
+        only the matching rows and the given columns are decoded. `where` is
+        a clause over the json_each rows `j` (see modules.query.to_sql).
+        Returns None when there is no fresh snapshot.
+        """
+        fresh = self._conn().execute(
+            "SELECT 1 FROM snapshots WHERE ns=? AND tab=? AND stale=0 AND fetched_at>?",
+            (ns, tab, time.time() - SHARED_CACHE_TTL_S),
+        ).fetchone()
+        if fresh is None:
+            return None
+        select = ", ".join(f"json_extract(j.value, '$.\"{c}\"')" for c in columns)
+        rows   = self._conn().execute(
+            f"SELECT {select} FROM snapshots s, json_each(s.records) j "
+            f"WHERE s.ns=? AND s.tab=? AND ({where}) ORDER BY j.key",
+            (ns, tab, *params),
+        ).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    # ── Single-flight fetch ───────────────────────────────────────────────────
+
+    def _acquire(self, ns: str, tab: str) -> bool:
+        now  = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT owner, expires FROM leases WHERE ns=? AND tab=?", (ns, tab),
+            ).fetchone()
+            if row is not None and row[0] != self.owner and row[1] > now:
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (ns, tab, owner, expires) VALUES (?, ?, ?, ?)",
+                (ns, tab, self.owner, now + SHARED_CACHE_LEASE_S),
+            )
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _release(self, ns: str, tab: str) -> None:
+        self._conn().execute(
+            "DELETE FROM leases WHERE ns=? AND tab=? AND owner=?", (ns, tab, self.owner),
+        )
+
+    def get_or_fetch(
+        self,
+        ns: str,
+        tab: str,
+        fetch: Callable[[], list[dict]],
+        new_version: Callable[[], int],
+    ) -> tuple[list[dict], int]:
+        """
+        Return a fresh snapshot, calling fetch() only if none exists.
+
+        A lease makes sure that when N processes miss at once, only one of them
+        hits Google; the others wait for its snapshot (up to the lease length).
+        """
+        deadline = time.time() + SHARED_CACHE_LEASE_S
+        while True:
+            hit = self.get(ns, tab)
+            if hit is not None:
+                return hit
+            if self._acquire(ns, tab) or time.time() > deadline:
+                break
+            time.sleep(_POLL_S)
+        try:
+            since   = self.last_event_id()
+            records = fetch()
+            version = new_version()
+            self.put(ns, tab, records, version, since)
+            return records, version
+        finally:
+            self._release(ns, tab)
+
+    # ── Change feed ───────────────────────────────────────────────────────────
+
+    def last_event_id(self) -> int:
+        row = self._conn().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()
+        return row[0]
+
+    def changed_since(self, ns: str, event_id: int) -> tuple[set[str], int]:
+        """Return (tabs with events after event_id, newest event id)."""
+        rows = self._conn().execute(
+            "SELECT tab, MAX(id) FROM events WHERE ns=? AND id>? GROUP BY tab", (ns, event_id),
+        ).fetchall()
+        newest = max((r[1] for r in rows), default=event_id)
+        return {r[0] for r in rows}, newest
+
+
+_caches: dict[str, SharedCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_shared_cache() -> SharedCache | None:
+    """Return the process-wide shared cache, or None when it is not configured."""
+    if not SHARED_CACHE_PATH:
+        return None
+    with _caches_lock:
+        if SHARED_CACHE_PATH not in _caches:
+            _caches[SHARED_CACHE_PATH] = SharedCache(SHARED_CACHE_PATH)
+        return _caches[SHARED_CACHE_PATH]
@@ -0,0 +1,107 @@
+# ─────────────────────────────────────────────
+# modules/sidecar.py — Small HTTP endpoint next to the Streamlit server
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import sys
+import threading
+import traceback
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Mapping
+from urllib.parse import parse_qsl, urlsplit
+
+from config.settings import BREAKER_OPEN_S, SIDECAR_HOST, SIDECAR_PORT
+from modules.breaker import SheetsUnavailable
+
+# Streamlit only serves the app itself, so machine-readable endpoints
+# (/metrics, …) are served by a plain http.server thread in the same process,
+# on its own port. Handlers get the query string and request headers and
+# return (status, headers, body).
+Handler = Callable[[dict[str, str], Mapping[str, str]], tuple[int, dict[str, str], bytes]]
+
+ROUTES: dict[str, Handler] = {}
+
+_lock   = threading.Lock()
+_server: ThreadingHTTPServer | None = None
+_failed = False   # port taken: warn once, keep the app running
+
+
+def route(path: str) -> Callable[[Handler], Handler]:
+    """Register a GET handler for `path`."""
+    def register(fn: Handler) -> Handler:
+        ROUTES[path] = fn
+        return fn
+    return register
+
+
+def conditional(
+    headers: Mapping[str, str],
+    body: bytes,
+    content_type: str,
+    etag: str,
+    modified: float | None = None,
+    max_age: int = 0,
+) -> tuple[int, dict[str, str], bytes]:
+    """
+    Response for a cacheable `body`: 304 with no body when the client's
+    If-None-Match (or, without one, If-Modified-Since) shows it has it already.
+    """
+    out = {"Content-Type": content_type, "ETag": etag, "Cache-Control": f"max-age={max_age}"}
+    if modified:
+        out["Last-Modified"] = formatdate(modified, usegmt=True)
+    if (tags := headers.get("If-None-Match")) is not None:
+        if tags.strip() == "*" or etag in (t.strip() for t in tags.split(",")):
+            return 304, out, b""
+    elif modified and (since := headers.get("If-Modified-Since")):
+        try:
+            if int(modified) <= parsedate_to_datetime(since).timestamp():
+                return 304, out, b""
+        except (TypeError, ValueError):
+            pass
+    return 200, out, body
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        url     = urlsplit(self.path)
+        handler = ROUTES.get(url.path)
+        if handler is None:
+            status, headers, body = 404, {"Content-Type": "text/plain"}, b"not found\n"
+        else:
+            try:
+                status, headers, body = handler(dict(parse_qsl(url.query)), self.headers)
+            except SheetsUnavailable as e:   # first read of a club during a Google outage
+                status, headers, body = 503, {"Content-Type": "text/plain", "Retry-After": str(BREAKER_OPEN_S)}, f"{e}\n".encode()
+            except Exception:   # never let one bad request kill the thread, nor show its details
+                print(f"sidecar: GET {url.path} failed", file=sys.stderr)
+                traceback.print_exc(file=sys.stderr)
+                status, headers, body = 500, {"Content-Type": "text/plain"}, b"internal error\n"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:   # keep the Streamlit console clean
+        pass
+
+
+def ensure_started(port: int = SIDECAR_PORT, host: str = SIDECAR_HOST) -> ThreadingHTTPServer | None:
+    """Start the sidecar once per process; no-op when no port is configured."""
+    global _server, _failed
+    if not port or _failed:
+        return _server
+    with _lock:
+        if _server is None and not _failed:
+            try:
+                _server = ThreadingHTTPServer((host, port), _RequestHandler)
+            except OSError as e:
+                _failed = True
+                print(f"sidecar: cannot listen on {host}:{port} ({e}); endpoints disabled", file=sys.stderr)
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="sidecar", daemon=True).start()
+    return _server
@@ -0,0 +1,167 @@
+# ─────────────────────────────────────────────
+# modules/standings.py — Incremental league tables (no Streamlit)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import threading
+
+from config.settings import STANDINGS_POINTS
+from modules.context import DataContext
+from modules.gsheets import on_write
+from modules.lazy import lazy_import
+from modules.scores import parse_scores
+from modules.seasons import season_series
+
+pd = lazy_import("pandas")
+
+# The spreadsheet holds our club's fixtures, so each table is one of our
+# teams' groups as seen from its own ties: the team plus every club it met,
+# per season and competition. Each played match contributes two rows
+# (our team, the opponent) of points, ties, rubbers, sets and games; the
+# rubber/set/game counts come from the parsed score.
+#
+# Tables are kept per process and updated incrementally: every row of the
+# matches tab is fingerprinted, and only matches whose fingerprint changed
+# (a result saved, a score corrected, a match archived) have their old
+# contribution subtracted and the new one added. A write through
+# update_cells triggers it right away (write listener); reads catch up on
+# changes made by other processes. rebuild_standings() starts over.
+
+GROUP   = ["season", "competition_type", "team"]
+COUNTS  = [
+    "played", "won", "drawn", "lost", "points",
+    "rubbers_for", "rubbers_against", "sets_for", "sets_against", "games_for", "games_against",
+]
+COLUMNS = [*GROUP, "position", "club", *COUNTS, "rubber_diff", "set_diff", "game_diff"]
+_SIGNED = ["status", "result", "score", "date", "competition_type", "team", "opponent_club"]
+
+
+def contributions(matches: pd.DataFrame) -> pd.DataFrame:
+    """Two rows per decided match (our team, the opponent club): GROUP, match_id, club, COUNTS."""
+    done = matches[(matches["status"] == "Played") & matches["result"].isin(list(STANDINGS_POINTS))]
+    if done.empty:
+        return pd.DataFrame(columns=[*GROUP, "match_id", "club", *COUNTS])
+
+    sets = parse_scores(done).valid_sets
+    sets = sets.assign(
+        won=sets["us"] > sets["them"],
+        gf=sets["us"].where(~sets["match_tiebreak"], 0),
+        ga=sets["them"].where(~sets["match_tiebreak"], 0),
+    )
+    rubbers = sets.groupby(["match_id", "rubber"]).agg(sw=("won", "sum"), n=("won", "count"), gf=("gf", "sum"), ga=("ga", "sum"))
+    per_match = (
+        rubbers.assign(rw=rubbers["sw"] * 2 > rubbers["n"], rl=rubbers["sw"] * 2 < rubbers["n"], sl=rubbers["n"] - rubbers["sw"])
+        .groupby("match_id").agg(
+            rubbers_for=("rw", "sum"), rubbers_against=("rl", "sum"),
+            sets_for=("sw", "sum"), sets_against=("sl", "sum"),
+            games_for=("gf", "sum"), games_against=("ga", "sum"),
+        )
+    )
+
+    base = done.assign(season=season_series(done["date"])).set_index("match_id")
+    base = base.join(per_match).fillna({c: 0 for c in per_match.columns}).reset_index()
+    result = base["result"]
+    ours = pd.DataFrame({
+        **{g: base[g].astype(str) for g in GROUP},
+        "match_id": base["match_id"].astype(str),
+        "club":     base["team"].astype(str),
+        "played":   1,
+        "won":      (result == "Win").astype(int),
+        "drawn":    (result == "Draw").astype(int),
+        "lost":     (result == "Loss").astype(int),
+        "points":   result.map(STANDINGS_POINTS),
+        **{c: base[c].astype(int) for c in per_match.columns},
+    })
+    swap   = {"won": "lost", "lost": "won", "rubbers_for": "rubbers_against", "rubbers_against": "rubbers_for",
+              "sets_for": "sets_against", "sets_against": "sets_for", "games_for": "games_against", "games_against": "games_for"}
+    theirs = ours.rename(columns=swap).assign(
+        club=base["opponent_club"].astype(str),
+        points=result.map({"Win": "Loss", "Loss": "Win", "Draw": "Draw"}).map(STANDINGS_POINTS),
+    )
+    return pd.concat([ours, theirs[ours.columns]], ignore_index=True)
+
+
+def _table(totals: pd.DataFrame) -> pd.DataFrame:
+    """Totals → ranked tables: points, then rubber, set and game difference."""
+    if totals.empty:
+        return pd.DataFrame(columns=COLUMNS)
+    t = totals.reset_index()
+    t = t.assign(
+        rubber_diff=t["rubbers_for"] - t["rubbers_against"],
+        set_diff=t["sets_for"] - t["sets_against"],
+        game_diff=t["games_for"] - t["games_against"],
+    )
+    t = t.sort_values([*GROUP, "points", "rubber_diff", "set_diff", "game_diff", "club"],
+                      ascending=[True, True, True, False, False, False, False, True], ignore_index=True)
+    t["position"] = t.groupby(GROUP).cumcount() + 1
+    return t[COLUMNS]
+
+
+class StandingsEngine:
+    """Running totals of one spreadsheet, updated by match fingerprint."""
+
+    def __init__(self):
+        self._lock        = threading.Lock()
+        self.version      = None
+        self.fingerprints = pd.Series(dtype="uint64")
+        self.rows         = pd.DataFrame(columns=[*GROUP, "match_id", "club", *COUNTS])
+        self.totals       = pd.DataFrame(columns=COUNTS, index=pd.MultiIndex.from_tuples([], names=[*GROUP, "club"]))
+        self.table        = pd.DataFrame(columns=COLUMNS)
+
+    def sync(self, matches: pd.DataFrame, version: int | None) -> int:
+        """Apply what changed in `matches` since the last sync. Returns how many matches were re-scored."""
+        with self._lock:
+            if version is not None and version == self.version:
+                return 0
+            live  = matches.drop_duplicates("match_id", keep="last")
+            live  = live.assign(match_id=live["match_id"].astype(str))
+            fps   = pd.util.hash_pandas_object(live.set_index("match_id")[_SIGNED].astype(str), index=False)
+            old   = self.fingerprints.reindex(fps.index)
+            moved = set(fps.index[old.isna() | (old != fps)]) | set(self.fingerprints.index.difference(fps.index))
+            if moved:
+                gone  = self.rows[self.rows["match_id"].isin(moved)]
+                fresh = contributions(live[live["match_id"].isin(moved)])
+                self.totals = (
+                    self.totals
+                    .sub(gone.groupby([*GROUP, "club"])[COUNTS].sum(), fill_value=0)
+                    .add(fresh.groupby([*GROUP, "club"])[COUNTS].sum(), fill_value=0)
+                )
+                self.totals = self.totals[self.totals["played"] > 0].astype(int)
+                self.rows   = pd.concat([self.rows[~self.rows["match_id"].isin(moved)], fresh], ignore_index=True)
+                self.table  = _table(self.totals)
+            self.fingerprints = fps
+            self.version      = version
+            return len(moved)
+
+
+_engines_lock = threading.Lock()
+_engines: dict[str | None, StandingsEngine] = {}
+
+
+def _engine(ctx: DataContext) -> StandingsEngine:
+    key = ctx.sh.id if ctx.sh is not None else None
+    with _engines_lock:
+        return _engines.setdefault(key, StandingsEngine())
+
+
+def standings(ctx: DataContext, season: str | None = None) -> pd.DataFrame:
+    """Current tables (of `season`, default: every season in the live tab)."""
+    engine = _engine(ctx)
+    engine.sync(ctx.dfs["matches"], ctx.versions.get("matches"))
+    table = engine.table
+    return table[table["season"] == season].reset_index(drop=True) if season else table
+
+
+def rebuild_standings(ctx: DataContext) -> int:
+    """Drop the running totals and recompute them from the live matches tab."""
+    key = ctx.sh.id if ctx.sh is not None else None
+    with _engines_lock:
+        _engines[key] = StandingsEngine()
+    return _engine(ctx).sync(ctx.dfs["matches"], ctx.versions.get("matches"))
+
+
+@on_write("matches")
+def _update_standings(ctx: DataContext) -> None:
+    if "matches" in ctx.dfs:
+        _engine(ctx).sync(ctx.dfs["matches"], ctx.versions.get("matches"))
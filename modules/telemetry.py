@@ -0,0 +1,192 @@
+# ─────────────────────────────────────────────
+# modules/telemetry.py — Google API call accounting
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+
+from config.settings import GSHEETS_TENANT_RESERVE, TELEMETRY_WINDOW_S
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ── Request labels ────────────────────────────────────────────────────────────
+
+# Which page / user the current script run belongs to. Set once per run in
+# app.py (each run has its own thread), or by a CLI job.
+_labels: contextvars.ContextVar[tuple[str, str]] = contextvars.ContextVar("labels", default=("-", "-"))
+
+
+def set_labels(page: str, user: str | None) -> None:
+    """Attribute the calls made from now on in this run to `page` and `user`."""
+    _labels.set((page or "-", user or "-"))
+
+
+# Which club (modules/tenants.py) the calls are made for; set with the context
+# a run or an endpoint works on. "-" when a single club is served.
+_tenant: contextvars.ContextVar[str] = contextvars.ContextVar("tenant", default="-")
+
+
+def set_tenant(key: str | None) -> None:
+    """Attribute (and meter) the calls made from now on in this thread to club `key`."""
+    _tenant.set(key or "-")
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class ApiCall:
+    at:      float   # time.time() when the call finished
+    op:      str     # gspread method, e.g. get_all_records
+    tab:     str
+    page:    str
+    user:    str
+    tenant:  str
+    seconds: float
+    status:  str     # "ok", "not_found", an HTTP status like "429", or "error"
+
+
+_lock        = threading.Lock()
+_recent: deque[ApiCall] = deque()
+_totals      = Counter()   # (op, tab, page, user, tenant, status) → calls since start
+_histograms: dict[tuple[str, str], list[int]] = {}   # (op, tab) → bucket counts
+_latency_sum = Counter()   # (op, tab) → total seconds
+
+
+def record_call(op: str, tab: str, seconds: float, status: str) -> None:
+    """Record one finished Google API call."""
+    page, user = _labels.get()
+    call = ApiCall(time.time(), op, tab, page, user, _tenant.get(), seconds, status)
+    with _lock:
+        _recent.append(call)
+        cutoff = call.at - TELEMETRY_WINDOW_S
+        while _recent and _recent[0].at < cutoff:
+            _recent.popleft()
+        _totals[(op, tab, page, user, call.tenant, status)] += 1
+        buckets = _histograms.setdefault((op, tab), [0] * (len(LATENCY_BUCKETS) + 1))
+        buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        _latency_sum[(op, tab)] += seconds
+
+
+# ── Per-club quota ────────────────────────────────────────────────────────────
+
+# Clubs served with the same service account share its Google quota (a
+# "pool"). Within the pool's limit per rolling minute, each club may always
+# use its share, and may borrow what the others leave unused as long as each
+# of them keeps GSHEETS_TENANT_RESERVE calls free (enough to sign in and load
+# a page). A call over that waits for a slot, so a busy club slows itself
+# down instead of drawing 429s for every club, and once its borrowed calls
+# age out the others get their full share back.
+
+_quota_lock = threading.Lock()
+_shares: dict[str, int]          = {}   # tenant → guaranteed calls per minute
+_pool_of: dict[str, str]         = {}   # tenant → pool (service account)
+_limits: dict[str, int]          = {}   # pool → calls per minute
+_starts: dict[str, deque[float]] = {}   # tenant → start times of its calls in the last minute
+_waited = Counter()                     # tenant → calls that had to wait
+
+
+def set_quota(tenant: str, share: int | None, pool: str = "", limit: int = 0) -> None:
+    """Guarantee club `tenant` `share` calls a minute out of `limit` for `pool` (share None: no metering)."""
+    with _quota_lock:
+        if share:
+            _shares[tenant], _pool_of[tenant], _limits[pool] = share, pool, max(limit, share)
+        else:
+            _shares.pop(tenant, None)
+            _pool_of.pop(tenant, None)
+
+
+def _admit(tenant: str, now: float) -> float:
+    """Record a call start and return 0, or return how long to wait (holding _quota_lock)."""
+    pool    = _pool_of[tenant]
+    members = [t for t, p in _pool_of.items() if p == pool]
+    for t in members:
+        starts = _starts.setdefault(t, deque())
+        while starts and starts[0] <= now - 60:
+            starts.popleft()
+    used     = len(_starts[tenant])
+    in_pool  = sum(len(_starts[t]) for t in members)
+    reserved = sum(min(max(0, _shares[t] - len(_starts[t])), GSHEETS_TENANT_RESERVE) for t in members if t != tenant)
+    if in_pool < _limits[pool] and (used < _shares[tenant] or in_pool + reserved < _limits[pool]):
+        _starts[tenant].append(now)
+        return 0.0
+    oldest = min(_starts[t][0] for t in members if _starts[t])
+    return max(oldest + 60 - now, 0.01)
+
+
+def throttle() -> float:
+    """Wait, if needed, until the current club may start a call. Returns the seconds waited."""
+    tenant = _tenant.get()
+    waited = 0.0
+    while True:
+        with _quota_lock:
+            if tenant not in _shares:
+                return waited
+            pause = _admit(tenant, time.monotonic())
+            if not pause:
+                return waited
+            if not waited:
+                _waited[tenant] += 1
+        time.sleep(pause)
+        waited += pause
+
+
+def quota_usage() -> dict[str, tuple[int, int, int]]:
+    """tenant → (calls started in the last minute, guaranteed share, calls that waited since start)."""
+    now = time.monotonic()
+    with _quota_lock:
+        return {
+            t: (sum(s > now - 60 for s in _starts.get(t, ())), q, _waited[t])
+            for t, q in sorted(_shares.items())
+        }
+
+
+# ── Queries ───────────────────────────────────────────────────────────────────
+
+def recent_calls(window_s: float = TELEMETRY_WINDOW_S, tenant: str | None = None) -> list[ApiCall]:
+    """Calls finished in the last `window_s` seconds (of one club, if given), oldest first."""
+    cutoff = time.time() - window_s
+    with _lock:
+        return [c for c in _recent if c.at >= cutoff and (tenant is None or c.tenant == tenant)]
+
+
+def quantile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def totals() -> dict[tuple[str, str, str, str, str, str], int]:
+    """Calls since process start by (op, tab, page, user, tenant, status)."""
+    with _lock:
+        return dict(_totals)
+
+
+def histograms() -> dict[tuple[str, str], tuple[list[int], float]]:
+    """Latency histograms since process start: (op, tab) → (bucket counts, sum of seconds)."""
+    with _lock:
+        return {k: (list(v), _latency_sum[k]) for k, v in _histograms.items()}
+
+
+def summary(window_s: float = TELEMETRY_WINDOW_S, tenant: str | None = None) -> dict:
+    """Headline numbers for the admin panel over the recent window (of one club, if given)."""
+    calls     = recent_calls(window_s, tenant)
+    now       = time.time()
+    last_min  = [c for c in calls if c.at >= now - 60]
+    latencies = [c.seconds for c in calls]
+    return {
+        "calls":      len(calls),
+        "per_minute": len(last_min),
+        "p50":        quantile(latencies, 0.50),
+        "p95":        quantile(latencies, 0.95),
+        "throttled":  sum(c.status == "429" for c in calls),
+        "errors":     sum(c.status not in ("ok", "not_found") for c in calls),
+    }
@@ -0,0 +1,146 @@
+# ─────────────────────────────────────────────
+# modules/tenants.py — Clubs served by one deployment (no Streamlit)
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Mapping
+
+from config.settings import API_TOKEN, APP_TITLE, GSHEETS_QUOTA_PER_MIN
+from modules.context import DataContext
+from modules.telemetry import set_quota, set_tenant
+
+if TYPE_CHECKING:
+    import gspread
+
+# One server process can serve several clubs, each with its own spreadsheet
+# (and possibly its own service account), declared in secrets.toml:
+#
+#     [tenants.riverside]
+#     name          = "Riverside TC"
+#     url           = "https://docs.google.com/spreadsheets/d/…"
+#     quota_per_min = 30            # optional guaranteed share of the Google quota
+#     api_token     = "…"           # optional bearer token for its /api/… (else TC_API_TOKEN)
+#     [tenants.riverside.gsheets_creds]
+#     type = "service_account"      # … or creds = '{"type": …}'
+#
+# Without a [tenants] table the usual [gsheets] section is the only club,
+# under the key "default", and nothing changes.
+#
+# Every cache is already keyed by spreadsheet id (views, standings, shared
+# cache, archives), so contexts of different clubs never mix. What is per
+# club here: one spreadsheet handle (its client and HTTP connection pool are
+# per service account, see gsheets._make_client) and the quota accounting:
+# clubs sharing a service account are each guaranteed an equal share of its
+# per-minute quota (or quota_per_min), and may borrow what the others leave
+# unused (telemetry.throttle).
+
+DEFAULT_TENANT = "default"
+
+
+@dataclass(frozen=True)
+class Tenant:
+    key:           str
+    name:          str
+    url:           str
+    creds:         str          # service-account JSON
+    quota_per_min: int | None   # guaranteed Google calls per minute; None → not metered
+    api_token:     str = ""     # bearer token for /api/…?club=<key>; "" → API open
+
+    @property
+    def client_email(self) -> str:
+        return json.loads(self.creds).get("client_email", "")
+
+
+def load_registry(secrets: Mapping) -> dict[str, Tenant]:
+    """Clubs declared in `secrets` (a parsed secrets.toml), by key; registers their quotas."""
+    from modules.gsheets import secrets_creds
+
+    sections = secrets.get("tenants")
+    if not sections:
+        tenants = {DEFAULT_TENANT: Tenant(DEFAULT_TENANT, APP_TITLE, secrets["gsheets"]["url"], secrets_creds(secrets), None, API_TOKEN)}
+    else:
+        found = {
+            key: (section, secrets_creds(section if "gsheets_creds" in section else {"gsheets": {"creds": section["creds"]}}))
+            for key, section in sections.items()
+        }
+        sharing = Counter(json.loads(creds).get("client_email", "") for _, creds in found.values())
+        tenants = {}
+        for key, (section, creds) in found.items():
+            share = sharing[json.loads(creds).get("client_email", "")]
+            quota = int(section.get("quota_per_min") or 0) or (GSHEETS_QUOTA_PER_MIN // share if share > 1 else None)
+            token = str(section.get("api_token") or API_TOKEN)
+            tenants[key] = Tenant(key, section.get("name") or key, section["url"], creds, quota, token)
+    for t in tenants.values():
+        set_quota(t.key, t.quota_per_min, t.client_email, GSHEETS_QUOTA_PER_MIN)
+    return tenants
+
+
+_lock = threading.Lock()
+_registry: dict[str, Tenant] | None = None                  # from st.secrets
+_spreadsheets: dict[tuple[str, str], gspread.Spreadsheet] = {}   # (key, url) → handle
+
+
+def registry(secrets: Mapping | None = None) -> dict[str, Tenant]:
+    """Clubs of `secrets`, or of st.secrets (read once per process)."""
+    global _registry
+    if secrets is not None:
+        return load_registry(secrets)
+    with _lock:
+        if _registry is None:
+            import streamlit as st
+            _registry = load_registry(st.secrets)
+        return _registry
+
+
+def set_registry(tenants: dict[str, Tenant], sheets: Mapping[str, gspread.Spreadsheet] | None = None) -> None:
+    """Serve `tenants` instead of st.secrets' clubs, optionally with ready spreadsheets by key (load tests)."""
+    global _registry
+    with _lock:
+        _registry = dict(tenants)
+        for key, sh in (sheets or {}).items():
+            _spreadsheets[(key, tenants[key].url)] = sh
+    for t in tenants.values():
+        set_quota(t.key, t.quota_per_min, t.client_email, GSHEETS_QUOTA_PER_MIN)
+
+
+def resolve(club: str | None = None, secrets: Mapping | None = None) -> Tenant:
+    """The club called `club`, or the only (or default) one when not given."""
+    tenants = registry(secrets)
+    if club:
+        if club not in tenants:
+            raise ValueError(f"Unknown club '{club}'.")
+        return tenants[club]
+    if len(tenants) == 1:
+        return next(iter(tenants.values()))
+    if DEFAULT_TENANT in tenants:
+        return tenants[DEFAULT_TENANT]
+    raise ValueError("Several clubs are configured: choose one.")
+
+
+def spreadsheet(tenant: Tenant) -> gspread.Spreadsheet:
+    """The club's spreadsheet, opened once per process."""
+    from modules.gsheets import build_connection
+
+    with _lock:
+        sh = _spreadsheets.get((tenant.key, tenant.url))
+    if sh is None:
+        set_tenant(tenant.key)
+        _, sh = build_connection(tenant.creds, tenant.url)
+        with _lock:
+            sh = _spreadsheets.setdefault((tenant.key, tenant.url), sh)
+    return sh
+
+
+def connect_tenant(tenant: Tenant, load: bool = True) -> DataContext:
+    """Open the club's data context; Google calls from this thread are counted against the club."""
+    from modules.gsheets import open_context
+
+    set_tenant(tenant.key)
+    ctx        = open_context(spreadsheet(tenant), load)
+    ctx.tenant = tenant.key
+    return ctx
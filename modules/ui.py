@@ -5,8 +5,11 @@
 from __future__ import annotations
 
 import streamlit as st
-import pandas as pd
-from modules.auth import logout, has_role
+from modules.auth import logout, has_role, session_context
+from modules.breaker import CLOSED, sheets_breaker
+from modules.lazy import lazy_import
+
+pd = lazy_import("pandas")   # not needed to draw the login screen
 
 
 def render_sidebar_footer() -> None:
@@ -23,13 +26,60 @@ def render_sidebar_footer() -> None:
             from modules.gsheets import reload_sheet
             from config.settings import SHEET_SCHEMAS
             for k in SHEET_SCHEMAS:
-                reload_sheet(k)
+                reload_sheet(session_context(), k, force=True)
             st.rerun()
     with col2:
         if st.button("🚪 Logout", use_container_width=True):
             logout()
 
 
+def render_degraded_banner() -> None:
+    """Warn on every page while Google Sheets is unreachable (modules/breaker.py)."""
+    if sheets_breaker.state == CLOSED:
+        return
+    wait = sheets_breaker.retry_in()
+    st.warning(
+        "⚠️ **Google Sheets is not responding.** You are seeing the data as last loaded, "
+        "and changes can't be saved for now. "
+        + (f"Retrying in {wait:.0f} s." if wait else "Checking whether it is back…")
+    )
+
+
+def render_unavailable(err: Exception) -> None:
+    """Shown instead of a traceback when a page needed Google Sheets during an outage."""
+    st.error(f"⚠️ This needs Google Sheets, which is not responding ({err}). Nothing was saved — try again in a moment.")
+
+
+def start_page_run(session_id: str | None, title: str) -> None:
+    """
+    What every run of a signed-in page does before the page itself (app.py,
+    and the load test's virtual sessions). Google calls from here on are
+    counted against `title`, the user and their club. Raises
+    SheetsUnavailable if the session's data can't be restored during an outage.
+    """
+    from modules.gsheets import restore_frames, sync_shared_cache
+    from modules.sessions import check_budget, touch
+    from modules.telemetry import set_labels, set_tenant
+
+    set_labels(title, st.session_state.pseudo)
+    set_tenant(st.session_state.tenant)
+
+    # Sidebar footer (logout, refresh, user info) — drawn first, so it is there even during an outage
+    render_sidebar_footer()
+
+    # Session memory: get this session's data back if it was released while idle,
+    # and release that of sessions idle for too long (modules/sessions.py)
+    if session_id is not None:
+        touch(session_id, session_context(), st.session_state.pseudo)
+    if session_context().released:
+        restore_frames(session_context())
+    check_budget()
+
+    # Pick up changes made by other sessions / server processes
+    sync_shared_cache(session_context())
+    render_degraded_banner()
+
+
 def page_header(title: str, subtitle: str = "") -> None:
     """Render a consistent page title + optional caption + divider."""
     st.title(title)
@@ -70,6 +120,37 @@ def result_badge(result: str) -> None:
         st.caption("—")
 
 
+def render_standings(table: pd.DataFrame) -> None:
+    """Render the league tables of the latest season in `table` (modules/standings.py), one per group."""
+    if table.empty:
+        st.info("No standings yet: tables fill in as results are saved.")
+        return
+    season = table["season"].max()
+    st.caption(f"Season {season} · points, then rubber, set and game difference")
+    cols = ["position", "club", "played", "won", "drawn", "lost", "points", "rubber_diff", "set_diff", "game_diff"]
+    for (competition, team), group in table[table["season"] == season].groupby(["competition_type", "team"], sort=True):
+        st.markdown(f"**{team}** — {competition}")
+        st.dataframe(
+            group[cols].style.apply(
+                lambda row: ["font-weight: bold" if row["club"] == team else ""] * len(row), axis=1,
+            ),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "position":    st.column_config.NumberColumn("#", width="small"),
+                "club":        "Club",
+                "played":      "P",
+                "won":         "W",
+                "drawn":       "D",
+                "lost":        "L",
+                "points":      "Pts",
+                "rubber_diff": st.column_config.NumberColumn("Rubbers ±", format="%+d"),
+                "set_diff":    st.column_config.NumberColumn("Sets ±", format="%+d"),
+                "game_diff":   st.column_config.NumberColumn("Games ±", format="%+d"),
+            },
+        )
+
+
 def no_data_info(msg: str = "No data available yet.") -> None:
     st.info(msg)
     st.stop()
@@ -81,6 +162,8 @@ def require_gsheets_secrets() -> bool:
     Show a warning and return False otherwise.
     """
     try:
+        if "tenants" in st.secrets:   # several clubs (modules/tenants.py)
+            return True
         _ = st.secrets["gsheets"]["url"]
         _ = st.secrets["gsheets"]["creds"]
         return True
@@ -91,3 +174,24 @@ def require_gsheets_secrets() -> bool:
             "and fill in your Google Sheets credentials."
         )
         return False
+
+
+def render_profile_report(sampler, report_path) -> None:
+    """Show a page profile (modules.profiler.StackSampler) below the page."""
+    import plotly.graph_objects as go
+
+    st.divider()
+    with st.expander(f"⏱️ Profile — {sampler.elapsed:.2f} s, {sampler.samples} samples", expanded=True):
+        st.caption(f"Report written to `{report_path}` (+ `.folded` for flamegraph.pl / speedscope).")
+        if not sampler.samples:
+            st.info("The page ran faster than one sampling period.")
+            return
+        fig = go.Figure(go.Icicle(
+            **sampler.icicle(),
+            branchvalues="total",
+            tiling=dict(orientation="v"),
+            hovertemplate="%{label}<br>%{value} samples · %{percentRoot:.1%}<extra></extra>",
+        ))
+        fig.update_layout(height=600, margin=dict(t=10, b=10, l=10, r=10))
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(pd.DataFrame(sampler.top_functions()), use_container_width=True, hide_index=True)
@@ -0,0 +1,132 @@
+# ─────────────────────────────────────────────
+# modules/views.py — Derived views, memoized by data version
+# ─────────────────────────────────────────────
+
+from __future__ import annotations
+
+import functools
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from config.settings import VIEW_CACHE_SIZE
+from modules.context import DataContext
+from modules.gsheets import load_history, query
+from modules.metrics import observe_view
+from modules.query import Query
+from modules.ratings import ratings_table
+from modules.scores import ParsedScores, parse_scores
+
+# Frames and lists every page derives from the raw tabs (sorted upcoming
+# matches, the player roster, selectbox label maps…). Each view is computed
+# on first use and then served from one process-wide LRU keyed by
+# (view, spreadsheet, versions of the tabs it reads, arguments), so widget
+# reruns, and other sessions on the same data, reuse it. A write bumps the
+# tab's version, which simply makes the next lookup miss.
+#
+# Results are shared: callers must not modify them in place (.copy() first).
+
+_lock  = threading.Lock()
+_cache: OrderedDict[tuple, object] = OrderedDict()
+
+
+def view(*tabs: str) -> Callable:
+    """Declare a derived view of `tabs`: fn(ctx, *args) is memoized per data version."""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def cached(ctx: DataContext, *args):
+            versions = tuple(ctx.versions.get(t) for t in tabs)
+            if None in versions:   # tab not loaded (lean context): nothing to key on
+                return fn(ctx, *args)
+            key = (fn.__name__, ctx.sh.id if ctx.sh is not None else None, versions, args)
+            with _lock:
+                if key in _cache:
+                    _cache.move_to_end(key)
+                    observe_view(fn.__name__, "hit")
+                    return _cache[key]
+            value = fn(ctx, *args)
+            observe_view(fn.__name__, "miss")
+            with _lock:
+                _cache[key] = value
+                while len(_cache) > VIEW_CACHE_SIZE:
+                    _cache.popitem(last=False)
+            return value
+        return cached
+    return decorate
+
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
+
+
+# ── Matches ───────────────────────────────────────────────────────────────────
+
+@view("matches")
+def upcoming_matches(ctx: DataContext):
+    """Upcoming matches, soonest first."""
+    return query(ctx, Query.of("matches", status="Upcoming")).sort_values("date")
+
+
+@view("matches")
+def played_matches(ctx: DataContext):
+    """Played matches, newest first."""
+    return query(ctx, Query.of("matches", status="Played")).sort_values("date", ascending=False)
+
+
+@view("matches")
+def editable_matches(ctx: DataContext):
+    """Matches whose result can still be entered or corrected, newest first."""
+    return query(ctx, Query.of("matches", status=["Upcoming", "Played"])).sort_values("date", ascending=False)
+
+
+@view("matches")
+def result_options(ctx: DataContext) -> dict[str, str]:
+    """Selectbox label → match_id for the Enter Results page."""
+    return {
+        f"{row.date.strftime('%d %b %Y')}  —  vs {row.opponent_club}  [{row.status}]": row.match_id
+        for row in editable_matches(ctx).itertuples(index=False)
+    }
+
+
+@view("matches")
+def upcoming_teams(ctx: DataContext) -> list[str]:
+    return sorted(upcoming_matches(ctx)["team"].astype(str).unique())
+
+
+@view("matches")
+def team_match_labels(ctx: DataContext, team: str) -> dict[str, str]:
+    """match_id → "15 Sep · Opponent" for a team's upcoming matches, soonest first."""
+    upcoming = upcoming_matches(ctx)
+    return {
+        str(row.match_id): f"{row.date.strftime('%d %b')} · {row.opponent_club}"
+        for row in upcoming[upcoming["team"].astype(str) == team].itertuples(index=False)
+    }
+
+
+@view("matches")
+def parsed_scores(ctx: DataContext, seasons: tuple[str, ...] = ()) -> ParsedScores:
+    """Scores of played matches split into sets, archived `seasons` included (archives never change)."""
+    df_m = load_history(ctx, "matches", list(seasons)) if seasons else ctx.dfs["matches"]
+    if df_m.empty:
+        return parse_scores(df_m.reindex(columns=["match_id", "score", "result"]))
+    return parse_scores(df_m[df_m["status"] == "Played"])
+
+
+# ── Ratings ───────────────────────────────────────────────────────────────────
+
+@view("ratings")
+def current_ratings(ctx: DataContext, kind: str):
+    """Ratings of every team / player / opponent club, best first."""
+    return ratings_table(ctx.dfs["ratings"], kind)
+
+
+# ── Users ─────────────────────────────────────────────────────────────────────
+
+@view("users")
+def roster(ctx: DataContext) -> list[str]:
+    """Pseudos of every account with the player role."""
+    df_u = ctx.dfs["users"]
+    if df_u.empty:
+        return []
+    return df_u[df_u["roles"].str.contains("player", na=False)]["pseudo"].tolist()
@@ -2,18 +2,23 @@
 # pages/admin/manage_accounts.py
 # ─────────────────────────────────────────────
 
+import math
 import streamlit as st
 import pandas as pd
-from modules.auth import require_role, hash_password
-from modules.gsheets import append_row, update_cells, delete_rows_where, reload_sheet
+from modules.auth import require_role, session_context, hash_password
+from modules.gsheets import append_row, update_rows, delete_rows
+from modules.imports import apply_import, plan_account_import, read_table
+from modules.services import parse_roles
 from modules.ui import page_header
 from config.settings import ALL_ROLES
 
+PAGE_SIZE = 50
 
 require_role("admin")
 page_header("👤 Manage Accounts", "Create and manage user accounts and their roles.")
 
-df_users = st.session_state.dfs["users"]
+ctx = session_context()
+df_users = ctx.dfs["users"]
 
 # ── Current accounts ──────────────────────────────────────────────────────────
 st.subheader("Current accounts")
@@ -21,55 +26,115 @@ st.subheader("Current accounts")
 if df_users.empty:
     st.info("No accounts found.")
 else:
-    for i, row in df_users.iterrows():
-        pseudo       = str(row["pseudo"])
-        current_roles = [r.strip() for r in str(row.get("roles", "")).split(",") if r.strip()]
-        display      = str(row.get("display_name", pseudo))
-
-        with st.container(border=True):
-            c1, c2, c3, c4 = st.columns([2, 2, 3, 1])
-
-            with c1:
-                new_display = st.text_input(
-                    "Display name", value=display, key=f"dn_{pseudo}",
-                    label_visibility="collapsed",
-                )
-
-            with c2:
-                new_roles = st.multiselect(
-                    "Roles", ALL_ROLES, default=current_roles,
-                    key=f"roles_{pseudo}", label_visibility="collapsed",
-                )
-
-            with c3:
-                new_pw = st.text_input(
-                    "New password (leave blank to keep)", type="password",
-                    key=f"pw_{pseudo}", placeholder="New password…",
-                    label_visibility="collapsed",
-                )
-
-            with c4:
-                save_btn = st.button("💾", key=f"save_{pseudo}", help="Save changes")
-                del_btn  = st.button("🗑️", key=f"del_{pseudo}",  help="Delete account")
-
-            if save_btn:
-                updates: dict = {
-                    "roles":        ",".join(new_roles),
-                    "display_name": new_display,
-                }
-                if new_pw.strip():
-                    updates["password_hash"] = hash_password(new_pw.strip())
-                update_cells("users", "pseudo", pseudo, updates)
-                st.success(f"Account **{pseudo}** updated.")
-                st.rerun()
-
-            if del_btn:
-                if pseudo == st.session_state.pseudo:
-                    st.error("You cannot delete your own account.")
-                else:
-                    delete_rows_where("users", "pseudo", pseudo)
-                    st.success(f"Account **{pseudo}** deleted.")
-                    st.rerun()
+    c_search, c_page = st.columns([4, 1])
+    with c_search:
+        search = st.text_input("🔍 Search", placeholder="Username or display name…")
+
+    view = df_users
+    if search.strip():
+        needle = search.strip()
+        view   = df_users[
+            df_users["pseudo"].astype(str).str.contains(needle, case=False, regex=False)
+            | df_users["display_name"].astype(str).str.contains(needle, case=False, regex=False)
+        ]
+
+    n_pages = max(1, math.ceil(len(view) / PAGE_SIZE))
+    with c_page:
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1)
+    chunk = view.iloc[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+
+    roles_by_user = chunk["roles"].astype(str).map(parse_roles)
+    grid = pd.DataFrame({
+        "pseudo":       chunk["pseudo"].astype(str),
+        "display_name": chunk["display_name"].astype(str),
+        **{role: roles_by_user.map(lambda rs, role=role: role in rs) for role in ALL_ROLES},
+        "reset_password": False,
+        "delete":         False,
+    })
+
+    edited = st.data_editor(
+        grid,
+        key=f"accounts_grid_{search}_{page}_{ctx.versions.get('users')}",
+        hide_index=True,
+        use_container_width=True,
+        disabled=["pseudo"],
+        column_config={
+            "pseudo":       st.column_config.TextColumn("Username"),
+            "display_name": st.column_config.TextColumn("Display name"),
+            **{role: st.column_config.CheckboxColumn(role.capitalize()) for role in ALL_ROLES},
+            "reset_password": st.column_config.CheckboxColumn("🔑 New password"),
+            "delete":         st.column_config.CheckboxColumn("🗑️ Delete"),
+        },
+    )
+    st.caption(f"{len(view)} account(s) · edits on this page are saved together.")
+
+    # Passwords are typed in masked fields, never in the grid (which shows its cells in clear)
+    new_passwords = {
+        r["pseudo"]: st.text_input(
+            f"New password for **{r['pseudo']}**", type="password",
+            key=f"new_pw_{r['pseudo']}_{ctx.versions.get('users')}",
+            placeholder="Leave blank to keep",
+        )
+        for r in edited.to_dict("records") if r["reset_password"] and not r["delete"]
+    }
+
+    if st.button("💾 Save changes", use_container_width=True):
+        changes, to_delete = [], []
+        for before, after in zip(grid.to_dict("records"), edited.to_dict("records")):
+            pseudo = before["pseudo"]
+            if after["delete"]:
+                to_delete.append(pseudo)
+                continue
+            updates: dict = {}
+            if after["display_name"] != before["display_name"]:
+                updates["display_name"] = after["display_name"]
+            if any(after[r] != before[r] for r in ALL_ROLES):
+                updates["roles"] = ",".join(r for r in ALL_ROLES if after[r])
+            if new_passwords.get(pseudo, "").strip():
+                updates["password_hash"] = hash_password(new_passwords[pseudo].strip())
+            if updates:
+                changes.append(({"pseudo": pseudo}, updates))
+
+        if st.session_state.pseudo in to_delete:
+            st.error("You cannot delete your own account.")
+        elif not changes and not to_delete:
+            st.info("Nothing to save.")
+        else:
+            if changes:
+                update_rows(ctx, "users", changes)
+            if to_delete:
+                delete_rows(ctx, "users", [{"pseudo": p} for p in to_delete])
+            st.success(f"{len(changes)} account(s) updated, {len(to_delete)} deleted.")
+            st.rerun()
+
+st.divider()
+
+# ── Bulk create / update from CSV ─────────────────────────────────────────────
+st.subheader("📥 Bulk create / update")
+st.caption(
+    "Upload a CSV with columns **pseudo, display_name, roles, password** "
+    "(roles separated by `;`). New usernames are created; for existing ones, "
+    "only non-empty fields are updated."
+)
+
+upload = st.file_uploader("Accounts file", type=["csv", "xlsx"], label_visibility="collapsed")
+if upload is not None:
+    try:
+        plan = plan_account_import(ctx, read_table(upload, upload.name))
+    except ValueError as e:
+        st.error(str(e))
+    else:
+        counts = plan.counts
+        k1, k2, k3 = st.columns(3)
+        k1.metric("➕ New", len(plan.new_rows))
+        k2.metric("✏️ Updated", len(plan.updates))
+        k3.metric("❌ Errors", sum(n for a, n in counts.items() if a.startswith("❌")))
+        st.dataframe(plan.preview, use_container_width=True, hide_index=True)
+
+        if (plan.new_rows or plan.updates) and st.button("📥 Apply", use_container_width=True):
+            n = apply_import(ctx, "users", plan)
+            st.success(f"✅ {n} account(s) created or updated.")
+            st.rerun()
 
 st.divider()
 
@@ -90,10 +155,10 @@ with st.form("create_account_form", clear_on_submit=True):
 if submitted:
     if not new_pseudo.strip() or not new_pw.strip() or not new_roles:
         st.error("Username, password and at least one role are required.")
-    elif new_pseudo.strip() in (st.session_state.dfs["users"]["pseudo"].values if not st.session_state.dfs["users"].empty else []):
+    elif new_pseudo.strip() in (ctx.dfs["users"]["pseudo"].values if not ctx.dfs["users"].empty else []):
         st.warning(f"Username **{new_pseudo}** already exists.")
     else:
-        append_row("users", {
+        append_row(ctx, "users", {
             "pseudo":        new_pseudo.strip(),
             "password_hash": hash_password(new_pw.strip()),
             "roles":         ",".join(new_roles),
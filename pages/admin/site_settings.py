@@ -3,14 +3,25 @@
 # ─────────────────────────────────────────────
 
 import streamlit as st
-from modules.auth import require_role
+import pandas as pd
+from modules.auth import require_role, session_context
 from modules.ui import page_header
-from modules.gsheets import reload_sheet
-from config.settings import SHEET_SCHEMAS, APP_TITLE, APP_ICON
+from modules.gsheets import archive_season, reload_sheet
+from modules.ratings import rebuild_ratings, stale_matches
+from modules.seasons import season_summary
+from modules.standings import rebuild_standings
+from modules import sessions, telemetry
+from modules.tenants import registry
+from config.settings import (
+    SHEET_SCHEMAS, APP_TITLE, APP_ICON, GSHEETS_QUOTA_PER_MIN, TELEMETRY_WINDOW_S, PROFILE_DIR,
+    SESSION_MEMORY_BUDGET_MB, SESSION_IDLE_S, SESSION_EVICT_MIN_IDLE_S,
+)
 
 require_role("admin")
 page_header("⚙️ Site Settings", "Application configuration and maintenance.")
 
+ctx = session_context()
+
 # ── App info ──────────────────────────────────────────────────────────────────
 st.subheader("📋 App info")
 c1, c2, c3 = st.columns(3)
@@ -24,20 +35,177 @@ st.divider()
 st.subheader("🗃️ Sheet row counts")
 cols = st.columns(len(SHEET_SCHEMAS))
 for col, (name, _) in zip(cols, SHEET_SCHEMAS.items()):
-    df  = st.session_state.dfs.get(name)
+    df  = ctx.dfs.get(name)
     cnt = len(df) if df is not None else 0
     col.metric(name.capitalize(), cnt)
 
 st.divider()
 
+# ── Google API usage ──────────────────────────────────────────────────────────
+st.subheader("📡 Google API usage")
+
+# With several clubs on this server, show this club's calls against its share
+try:
+    club = ctx.tenant if len(registry()) > 1 else None
+except (KeyError, ValueError, FileNotFoundError):   # no usable secrets.toml (see Secrets below)
+    club = None
+quota = telemetry.quota_usage().get(club, (0, GSHEETS_QUOTA_PER_MIN, 0))[1] if club else GSHEETS_QUOTA_PER_MIN
+st.caption(
+    f"Calls made by this server process{f' for this club ({club})' if club else ''} over the last "
+    f"{TELEMETRY_WINDOW_S // 60} minutes (quota: {quota} requests per minute). Refreshes every 5 seconds."
+)
+
+
+@st.fragment(run_every=5)
+def api_usage_panel():
+    s = telemetry.summary(tenant=club)
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Requests / min", s["per_minute"], help=f"Quota: {quota}")
+    k2.metric("p50 latency", f"{s['p50'] * 1000:.0f} ms")
+    k3.metric("p95 latency", f"{s['p95'] * 1000:.0f} ms")
+    k4.metric("429 (throttled)", s["throttled"], help=f"{s['errors']} failed call(s) in total")
+    st.progress(min(s["per_minute"] / quota, 1.0))
+    if club and (waited := telemetry.quota_usage().get(club, (0, 0, 0))[2]):
+        st.caption(f"⏳ {waited} call(s) waited for this club's quota share since the server started.")
+
+    calls = telemetry.recent_calls(tenant=club)
+    if not calls:
+        st.info("No Google API calls recorded yet.")
+        return
+
+    df = pd.DataFrame([c.__dict__ for c in calls])
+    df["minute"] = pd.to_datetime(df["at"], unit="s").dt.floor("min")
+    st.bar_chart(df.groupby(["minute", "op"]).size().unstack(fill_value=0))
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("**By operation**")
+        by_op = (
+            df.groupby(["op", "tab"])
+            .agg(calls=("seconds", "size"),
+                 p50_ms=("seconds", lambda x: telemetry.quantile(list(x), 0.50) * 1000),
+                 p95_ms=("seconds", lambda x: telemetry.quantile(list(x), 0.95) * 1000),
+                 errors=("status", lambda x: int((x != "ok").sum())))
+            .round()
+            .sort_values("calls", ascending=False)
+        )
+        st.dataframe(by_op, use_container_width=True)
+    with c2:
+        st.markdown("**Top pages**")
+        by_page = (
+            df.groupby(["page", "user"]).size().rename("calls")
+            .sort_values(ascending=False).head(10).reset_index()
+        )
+        st.dataframe(by_page, use_container_width=True, hide_index=True)
+
+
+api_usage_panel()
+
+st.divider()
+
+# ── Session memory ────────────────────────────────────────────────────────────
+st.subheader("🧠 Session memory")
+st.caption(
+    f"Data held by the browser sessions of this server process{f' for this club ({club})' if club else ''}. A session idle for "
+    f"{SESSION_IDLE_S // 60} minutes releases its data, and so does one idle for "
+    f"{SESSION_EVICT_MIN_IDLE_S} s while all of them together exceed {SESSION_MEMORY_BUDGET_MB} MiB. "
+    f"It gets it back on its next page, from memory."
+)
+usage, held = sessions.usage(tenant=club)
+m1, m2, m3 = st.columns(3)
+m1.metric("Sessions", len(usage), help=f"{sum(u.released for u in usage)} released")
+m2.metric("Data held", f"{held / sessions.MIB:.1f} MiB", help=f"Budget: {SESSION_MEMORY_BUDGET_MB} MiB")
+m3.metric("Released since start", sessions.released_total(tenant=club))
+st.progress(min(held / (SESSION_MEMORY_BUDGET_MB * sessions.MIB), 1.0))
+if usage:
+    st.dataframe(
+        pd.DataFrame([{
+            "user":        u.user,
+            "idle (min)":  round(u.idle_s / 60, 1),
+            "data (MiB)":  round(u.bytes / sessions.MIB, 2),
+            "shared (MiB)": round(u.shared_bytes / sessions.MIB, 2),
+            "released":    u.released,
+        } for u in usage]),
+        use_container_width=True, hide_index=True,
+    )
+if st.button("🧹 Release idle sessions now", help=f"Every session idle for {SESSION_EVICT_MIN_IDLE_S} s or more"):
+    st.success(f"Released {sessions.enforce(budget_bytes=0, tenant=club)} session(s).")
+
+st.divider()
+
+# ── Profiler ──────────────────────────────────────────────────────────────────
+st.subheader("⏱️ Page profiler")
+st.caption(
+    f"Samples every page you open and shows a flame graph and the slowest functions below it. "
+    f"Reports are also written to `{PROFILE_DIR}/`. Add `?profile=1` to a page URL to profile "
+    f"just that page."
+)
+
+
+def _sync_profile_toggle():
+    st.session_state.profile_pages = st.session_state.profile_pages_toggle
+
+
+st.session_state.profile_pages_toggle = st.session_state.profile_pages
+st.toggle("Profile every page I open", key="profile_pages_toggle", on_change=_sync_profile_toggle)
+
+st.divider()
+
+# ── Seasons ───────────────────────────────────────────────────────────────────
+st.subheader("🗄️ Seasons")
+st.caption(
+    "Every page loads the live tabs, so keep them to the current season: archiving moves a "
+    "finished season's matches, availability, selections, rubbers and ratings to `<tab>_<season>` "
+    "tabs in one batch, oldest season first. Current ratings stay live. Statistics can still "
+    "include archived seasons."
+)
+
+summary = season_summary(ctx)
+if summary.empty:
+    st.info("No matches yet.")
+else:
+    st.dataframe(summary, use_container_width=True, hide_index=True)
+    closed = summary.loc[summary["archivable"], "season"].tolist()
+    if closed:
+        c1, c2 = st.columns([2, 1])
+        season = c1.selectbox("Season to archive", closed, label_visibility="collapsed")
+        if c2.button("🗄️ Archive season", use_container_width=True):
+            with st.spinner(f"Archiving {season}…"):
+                moved = archive_season(ctx, season)
+            st.success("Archived: " + ", ".join(f"{n} {tab} row(s)" for tab, n in moved.items()))
+            st.rerun()
+    else:
+        st.caption("Only the oldest season, once over with no upcoming match left, can be archived.")
+
+st.divider()
+
+# ── Ratings ───────────────────────────────────────────────────────────────────
+st.subheader("🏅 Ratings")
+st.caption(
+    "Saving a result rates the newly played matches. Rebuild to recompute every rating from the "
+    "first archived season, e.g. after correcting an old result or changing a past line-up."
+)
+if stale := stale_matches(ctx):
+    st.warning(f"{len(stale)} rated match(es) have had their result changed since: {', '.join(stale)}")
+if st.button("🏅 Rebuild ratings"):
+    with st.spinner("Recomputing ratings…"):
+        n = rebuild_ratings(ctx)
+    st.success(f"Ratings rebuilt from {n} match(es).")
+
+st.divider()
+
 # ── Force full reload ─────────────────────────────────────────────────────────
 st.subheader("🔄 Force data reload")
-st.caption("Reload all sheets from Google Sheets. Useful if data was edited directly in the sheet.")
+st.caption(
+    "Reload all sheets from Google Sheets and rebuild the league tables. "
+    "Useful if data was edited directly in the sheet."
+)
 
 if st.button("🔄 Reload all sheets", use_container_width=False):
     with st.spinner("Reloading…"):
         for name in SHEET_SCHEMAS:
-            reload_sheet(name)
+            reload_sheet(ctx, name, force=True)
+        rebuild_standings(ctx)
     st.success("All sheets reloaded.")
 
 st.divider()
@@ -45,16 +213,18 @@ st.divider()
 # ── Secrets check ─────────────────────────────────────────────────────────────
 st.subheader("🔑 Secrets configuration")
 
-if "gsheets" in st.secrets:
-    st.success("✅ `secrets.toml` is configured — captain/player login is available.")
-    try:
-        url = st.secrets["gsheets"]["url"]
-        st.caption(f"Connected sheet: `{url}`")
-    except KeyError:
-        st.warning("Found `[gsheets]` section but `url` key is missing.")
-else:
+try:
+    tenants = registry(st.secrets)
+except (KeyError, ValueError, FileNotFoundError) as e:   # FileNotFoundError: no secrets.toml at all
     st.error(
-        "❌ `[gsheets]` section not found in `secrets.toml`.  \n"
+        f"❌ `secrets.toml` has no usable `[gsheets]` section or `[tenants]` table ({e}).  \n"
         "Captain and player login will not work until you configure it.  \n\n"
         "See `.streamlit/secrets.toml.example` for the required format."
     )
+else:
+    st.success(
+        "✅ `secrets.toml` is configured — captain/player login is available"
+        + (f" for {len(tenants)} clubs." if len(tenants) > 1 else ".")
+    )
+    if ctx.tenant in tenants:
+        st.caption(f"Connected sheet: `{tenants[ctx.tenant].url}`")
@@ -4,46 +4,143 @@
 
 import streamlit as st
 import pandas as pd
-from modules.auth import require_role
-from modules.gsheets import append_row, delete_rows_where
+from modules.auth import require_role, session_context
+from modules.lineups import accept_lineups, suggest_lineups
+from modules.services import save_selections
 from modules.ui import page_header, no_data_info
-from config.settings import AVAIL_OPTIONS
+from modules.views import roster, team_match_labels, upcoming_matches, upcoming_teams
+from config.settings import AVAIL_OPTIONS, COMPETITION_TYPES, LINEUP_SIZES
+
+NO_RESPONSE = "⏳"
+SELECTED    = "🎾"
 
 require_role("captain", "admin")
 page_header("🗳️ Availability Manager", "Review player responses and finalise selection for each match.")
 
-df_m = st.session_state.dfs["matches"]
-df_a = st.session_state.dfs["availability"]
-df_s = st.session_state.dfs["selections"]
-df_u = st.session_state.dfs["users"]
+ctx = session_context()
+df_a = ctx.dfs["availability"]
+df_s = ctx.dfs["selections"]
 
-upcoming = df_m[df_m["status"] == "Upcoming"].sort_values("date")
+upcoming = upcoming_matches(ctx)
 if upcoming.empty:
     no_data_info("No upcoming matches. Create one in **Create Match**.")
 
-# ── Match picker ──────────────────────────────────────────────────────────────
-options = {
-    f"{row['date'].strftime('%d %b %Y')}  —  vs {row['opponent_club']}": row["match_id"]
-    for _, row in upcoming.iterrows()
-}
-chosen_label = st.selectbox("Select a match", list(options.keys()))
-mid          = options[chosen_label]
-match_row    = upcoming[upcoming["match_id"] == mid].iloc[0]
-
-st.subheader(f"vs {match_row['opponent_club']}  ·  {match_row['date'].strftime('%d %b %Y')}")
-st.caption(f"{match_row['competition_type']}  ·  {match_row['team']}  ·  📍 {match_row.get('location','—')}")
-st.divider()
+all_players = roster(ctx)
+
+# ── Suggestions for every team at once ────────────────────────────────────────
+with st.expander("🤖 Suggest line-ups for all upcoming matches"):
+    st.caption(
+        "Fills the open places of every upcoming match from the ✅ then ❓ answers, one match per "
+        "player per day, favouring players selected least this season. Current selections are kept."
+    )
+    size_cols = st.columns(len(COMPETITION_TYPES))
+    sizes = {
+        comp: col.number_input(f"Players · {comp}", min_value=1, max_value=12, value=LINEUP_SIZES.get(comp, 4))
+        for col, comp in zip(size_cols, COMPETITION_TYPES)
+    }
+    if st.button("🤖 Suggest line-ups"):
+        st.session_state["lineup_plan"] = suggest_lineups(ctx, upcoming, sizes)
+
+    plan = st.session_state.get("lineup_plan")
+    if plan is not None:
+        if plan.suggested.empty:
+            st.info("Nothing to suggest: every match is full or has no available player left.")
+        else:
+            names = {
+                str(r.match_id): f"{r.date.strftime('%d %b')} · {r.team} vs {r.opponent_club}"
+                for r in upcoming.itertuples(index=False)
+            }
+            shown = (
+                plan.suggested.assign(match=plan.suggested["match_id"].map(names),
+                                      player=plan.suggested["pseudo"] + " " + plan.suggested["available"].str[0])
+                .groupby("match", sort=False)["player"].agg(", ".join).reset_index()
+            )
+            st.dataframe(shown, use_container_width=True, hide_index=True)
+            if plan.short:
+                st.warning("Not enough available players for: " + ", ".join(
+                    f"{names.get(m, m)} ({n} missing)" for m, n in plan.short.items()
+                ))
+            if st.button(f"✅ Accept {len(plan.suggested)} suggestion(s)", type="primary"):
+                added = accept_lineups(ctx, plan)
+                del st.session_state["lineup_plan"]
+                st.success(f"{added} selection(s) added.")
+                st.rerun()
+
+# ── Team picker ───────────────────────────────────────────────────────────────
+team         = st.selectbox("Team", upcoming_teams(ctx))
+team_matches = upcoming[upcoming["team"].astype(str) == team]
+labels       = team_match_labels(ctx, team)
+mids         = list(labels)
+
+# ── Line-up grid: players × upcoming matches ──────────────────────────────────
+st.subheader("✅ Line-ups")
+st.caption(
+    f"Each cell shows the player's response (✅ ❓ ❌, {NO_RESPONSE} = no response). "
+    f"Pick the **{SELECTED}** variant to select them. Only changed cells are saved."
+)
 
-# ── Players with roles containing "player" ────────────────────────────────────
-all_players: list[str] = []
-if not df_u.empty:
-    all_players = df_u[df_u["roles"].str.contains("player", na=False)]["pseudo"].tolist()
+avail_icon = {opt: opt.split()[0] for opt in AVAIL_OPTIONS}
+team_avail = df_a[df_a["match_id"].astype(str).isin(mids)]
+responses  = (
+    team_avail.assign(match_id=team_avail["match_id"].astype(str))
+    .pivot_table(index="pseudo", columns="match_id", values="available", aggfunc="first")
+    .reindex(index=all_players, columns=mids)
+    .apply(lambda col: col.map(avail_icon))
+    .fillna(NO_RESPONSE)
+)
+team_sel = df_s[df_s["match_id"].astype(str).isin(mids)]
+selected = (
+    pd.crosstab(team_sel["pseudo"], team_sel["match_id"].astype(str))
+    .reindex(index=all_players, columns=mids, fill_value=0)
+    .gt(0)
+)
 
-avail_df = df_a[df_a["match_id"] == mid]
+# Available first, then maybe, then the rest — by how many matches they're free for
+rank = responses.apply(lambda col: col.map({"✅": 0, "❓": 1})).fillna(2).sum(axis=1)
+grid = responses.where(~selected, responses + f" {SELECTED}").loc[rank.sort_values(kind="stable").index]
+grid = grid.rename_axis(index="Player", columns=None)
+
+cell_options = [i + s for s in ("", f" {SELECTED}") for i in [*avail_icon.values(), NO_RESPONSE]]
+edited = st.data_editor(
+    grid,
+    key=f"lineup_grid_{team}_{ctx.versions.get('selections')}",
+    use_container_width=True,
+    column_config={
+        mid: st.column_config.SelectboxColumn(
+            labels[mid],
+            options=cell_options,
+            required=True,
+            help=f"{int(selected[mid].sum())} selected · {int((responses[mid] == '✅').sum())} available",
+        )
+        for mid in mids
+    },
+)
 
-# ── Availability summary ──────────────────────────────────────────────────────
+if st.button("💾 Save line-ups", use_container_width=True):
+    desired = {mid: set(edited.index[edited[mid].str.endswith(SELECTED)]) for mid in mids}
+    added, removed = save_selections(ctx, desired)
+    if added or removed:
+        st.success(f"Line-ups saved: {added} selection(s) added, {removed} removed.")
+    else:
+        st.info("No changes to save.")
+    st.rerun()
+
+st.divider()
+
+# ── Match details ─────────────────────────────────────────────────────────────
 st.subheader("📋 Availability responses")
 
+chosen_label = st.selectbox("Select a match", list(labels.values()))
+mid          = next(m for m, label in labels.items() if label == chosen_label)
+match_row    = team_matches[team_matches["match_id"].astype(str) == mid].iloc[0]
+
+st.caption(
+    f"vs {match_row['opponent_club']}  ·  {match_row['date'].strftime('%d %b %Y')}  ·  "
+    f"{match_row['competition_type']}  ·  📍 {match_row.get('location','—')}"
+)
+
+avail_df = df_a[df_a["match_id"].astype(str) == mid]
+
 summary = []
 for p in all_players:
     row = avail_df[avail_df["pseudo"] == p]
@@ -69,53 +166,3 @@ k1.metric("✅ Available",      yes)
 k2.metric("❌ Unavailable",    no)
 k3.metric("❓ Maybe",          maybe)
 k4.metric("⏳ No response",    len(all_players) - yes - no - maybe)
-
-st.divider()
-
-# ── Player selection ──────────────────────────────────────────────────────────
-st.subheader("✅ Select players for this match")
-
-available_pseudos = avail_df[avail_df["available"] == "✅ Available"]["available"].index.map(
-    lambda i: avail_df.loc[i, "pseudo"]
-).tolist()
-maybe_pseudos = avail_df[avail_df["available"] == "❓ Maybe"]["available"].index.map(
-    lambda i: avail_df.loc[i, "pseudo"]
-).tolist()
-
-# Build display helper
-def fmt(p: str) -> str:
-    if p in available_pseudos:
-        return f"✅ {p}"
-    if p in maybe_pseudos:
-        return f"❓ {p}"
-    no_resp = [r["Player"] for r in summary if r["Response"] == "⏳ No response"]
-    if p in no_resp:
-        return f"⏳ {p}"
-    return f"❌ {p}"
-
-# Sort: available first, then maybe, then others
-sorted_players = (
-    [p for p in all_players if p in available_pseudos] +
-    [p for p in all_players if p in maybe_pseudos] +
-    [p for p in all_players if p not in available_pseudos and p not in maybe_pseudos]
-)
-
-current_sel = df_s[df_s["match_id"] == mid]["pseudo"].tolist()
-
-st.caption("Available and Maybe players are shown first.")
-selected = st.multiselect(
-    "Selected players",
-    options=sorted_players,
-    default=[p for p in current_sel if p in sorted_players],
-    format_func=fmt,
-)
-
-if st.button("💾 Save selection", use_container_width=True):
-    delete_rows_where("selections", "match_id", mid)
-    for p in selected:
-        append_row("selections", {"match_id": mid, "pseudo": p})
-    if selected:
-        st.success(f"Selection saved: {', '.join(selected)}")
-    else:
-        st.success("Selection cleared (no players selected).")
-    st.rerun()
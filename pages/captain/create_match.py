@@ -2,17 +2,21 @@
 # pages/captain/create_match.py
 # ─────────────────────────────────────────────
 
-import re
 import streamlit as st
 from datetime import date
-from modules.auth import require_role
+from modules.auth import require_role, session_context
 from modules.gsheets import append_row
+from modules.imports import apply_import, plan_fixture_import, read_table
+from modules.services import match_id_for
 from modules.ui import page_header
+from modules.views import upcoming_matches
 from config.settings import COMPETITION_TYPES
 
 require_role("captain", "admin")
 page_header("➕ Create a Match", "Schedule a new match. It will appear automatically in player availability polls.")
 
+ctx = session_context()
+
 with st.form("create_match_form", clear_on_submit=True):
     c1, c2 = st.columns(2)
     with c1:
@@ -29,14 +33,13 @@ if submitted:
     if not opponent.strip() or not team.strip():
         st.error("Opponent club and team are required.")
     else:
-        slug = re.sub(r"[^a-z0-9]", "", opponent.lower())[:10]
-        mid  = f"{match_date.strftime('%Y%m%d')}_{slug}"
+        mid = match_id_for(match_date, opponent)
 
-        existing = st.session_state.dfs["matches"]
+        existing = ctx.dfs["matches"]
         if not existing.empty and mid in existing["match_id"].values:
             st.error("A match with this date and opponent already exists.")
         else:
-            append_row("matches", {
+            append_row(ctx, "matches", {
                 "match_id":         mid,
                 "date":             match_date.strftime("%Y-%m-%d"),
                 "competition_type": competition,
@@ -50,12 +53,38 @@ if submitted:
             st.success(f"✅ Match created: **{match_date.strftime('%d %b %Y')}** vs **{opponent.strip()}**")
             st.balloons()
 
+# ── Bulk import (whole season) ────────────────────────────────────────────────
+st.divider()
+st.subheader("📥 Import a season's fixtures")
+st.caption(
+    "Upload a CSV or Excel file with columns **date, competition_type, team, opponent_club, location**. "
+    "Matches that already exist are skipped; everything new is written in one go."
+)
+
+upload = st.file_uploader("Fixture file", type=["csv", "xlsx"], label_visibility="collapsed")
+if upload is not None:
+    try:
+        plan = plan_fixture_import(ctx, read_table(upload, upload.name))
+    except ValueError as e:
+        st.error(str(e))
+    else:
+        counts = plan.counts
+        k1, k2, k3 = st.columns(3)
+        k1.metric("➕ New", len(plan.new_rows))
+        k2.metric("⏭️ Skipped", sum(n for a, n in counts.items() if a.startswith("⏭️")))
+        k3.metric("❌ Errors", sum(n for a, n in counts.items() if a.startswith("❌")))
+        st.dataframe(plan.preview, use_container_width=True, hide_index=True)
+
+        if plan.new_rows and st.button(f"📥 Import {len(plan.new_rows)} matches", use_container_width=True):
+            n = apply_import(ctx, "matches", plan)
+            st.success(f"✅ {n} matches imported.")
+            st.rerun()
+
 # ── Existing upcoming matches (read-only preview) ─────────────────────────────
 st.divider()
 st.subheader("Scheduled upcoming matches")
 
-df_m = st.session_state.dfs["matches"]
-upcoming = df_m[df_m["status"] == "Upcoming"].sort_values("date")
+upcoming = upcoming_matches(ctx)
 
 if upcoming.empty:
     st.info("No upcoming matches yet.")
@@ -4,21 +4,24 @@
 
 import streamlit as st
 import pandas as pd
-from modules.auth import require_role
-from modules.ui import page_header, match_card
+from modules.auth import require_role, session_context
+from modules.standings import standings
+from modules.ui import page_header, match_card, render_standings
+from modules.views import played_matches, upcoming_matches
 
 require_role("captain", "admin")
 page_header("📊 Dashboard", "Overview of upcoming matches and availability responses.")
 
-df_m = st.session_state.dfs["matches"]
-df_a = st.session_state.dfs["availability"]
-df_s = st.session_state.dfs["selections"]
-df_p = st.session_state.dfs["users"]
+ctx = session_context()
+df_m = ctx.dfs["matches"]
+df_a = ctx.dfs["availability"]
+df_s = ctx.dfs["selections"]
+df_p = ctx.dfs["users"]
 
 # ── Global KPIs ───────────────────────────────────────────────────────────────
 total_matches = len(df_m)
-upcoming      = df_m[df_m["status"] == "Upcoming"]
-played        = df_m[df_m["status"] == "Played"]
+upcoming      = upcoming_matches(ctx)
+played        = played_matches(ctx)
 wins          = (played["result"] == "Win").sum() if not played.empty else 0
 players_count = len(df_p) if not df_p.empty else 0
 
@@ -36,7 +39,7 @@ st.subheader("📅 Upcoming matches")
 if upcoming.empty:
     st.info("No upcoming matches. Create one in **Create Match**.")
 else:
-    for _, row in upcoming.sort_values("date").iterrows():
+    for _, row in upcoming.iterrows():
         mid   = row["match_id"]
         avail = df_a[df_a["match_id"] == mid]
         yes   = (avail["available"] == "✅ Available").sum()
@@ -59,7 +62,7 @@ st.subheader("🏆 Recent results")
 if played.empty:
     st.info("No results yet.")
 else:
-    recent = played.sort_values("date", ascending=False).head(5)
+    recent = played.head(5)
     for _, row in recent.iterrows():
         with st.container(border=True):
             c1, c2 = st.columns([5, 1])
@@ -74,3 +77,9 @@ else:
                     st.error("Loss")
                 else:
                     st.caption("—")
+
+st.divider()
+
+# ── Standings ─────────────────────────────────────────────────────────────────
+st.subheader("📋 Standings")
+render_standings(standings(ctx))
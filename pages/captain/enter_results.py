@@ -2,25 +2,27 @@
 # pages/captain/enter_results.py
 # ─────────────────────────────────────────────
 
+import pandas as pd
 import streamlit as st
-from modules.auth import require_role
+from config.settings import RUBBER_TYPES, RUBBER_WINNERS
+from modules.auth import require_role, session_context
 from modules.gsheets import update_cells
+from modules.scores import parse_scores
+from modules.services import save_rubbers
 from modules.ui import page_header, no_data_info
+from modules.views import editable_matches, result_options, roster
 
 require_role("captain", "admin")
 page_header("📝 Enter Results", "Record the score and outcome for played matches.")
 
-df_m = st.session_state.dfs["matches"]
-editable = df_m[df_m["status"].isin(["Upcoming", "Played"])].sort_values("date", ascending=False)
+ctx = session_context()
+editable = editable_matches(ctx)
 
 if editable.empty:
     no_data_info("No matches to update yet. Create one first.")
 
 # ── Match selector ────────────────────────────────────────────────────────────
-options = {
-    f"{row['date'].strftime('%d %b %Y')}  —  vs {row['opponent_club']}  [{row['status']}]": row["match_id"]
-    for _, row in editable.iterrows()
-}
+options = result_options(ctx)
 chosen_label = st.selectbox("Select a match", list(options.keys()))
 mid          = options[chosen_label]
 match_row    = editable[editable["match_id"] == mid].iloc[0]
@@ -34,7 +36,10 @@ with st.container(border=True):
 
 st.divider()
 
-with st.form("result_form"):
+tab_match, tab_rubbers = st.tabs(["🏁 Match result", "🎾 Rubbers"])
+
+# ── Whole match: one score and result ─────────────────────────────────────────
+with tab_match, st.form("result_form"):
     c1, c2, c3 = st.columns(3)
     with c1:
         new_status = st.selectbox(
@@ -56,10 +61,62 @@ with st.form("result_form"):
     save = st.form_submit_button("💾 Save", use_container_width=True)
 
 if save:
-    update_cells("matches", "match_id", mid, {
+    update_cells(ctx, "matches", "match_id", mid, {
         "status": new_status,
         "score":  score,
         "result": result,
     })
     st.success("Result saved!")
-    st.rerun()
+    issues = parse_scores(match_row.to_frame().T.assign(score=score, result=result)).issues
+    if issues.empty:
+        st.rerun()
+    st.warning(
+        "Saved, but the score is left out of the set and game statistics: "
+        + "; ".join(issues["problem"])
+    )
+
+# ── Tie: every rubber at once; the match score and result follow from them ──
+with tab_rubbers:
+    st.caption(
+        "One row per rubber, our score first. Leave the winner blank to take it from the score. "
+        "Saving marks the match as played, with its score and result derived from the rubbers."
+    )
+    df_r    = ctx.dfs["rubbers"]
+    current = df_r[df_r["match_id"].astype(str) == str(mid)].sort_values("rubber")
+    grid    = pd.DataFrame({
+        "type":     current["type"].astype(str).tolist(),
+        "player_1": [str(p).split(",")[0].strip() for p in current["players"]],
+        "player_2": [(str(p).split(",") + [""])[1].strip() for p in current["players"]],
+        "score":    current["score"].astype(str).tolist(),
+        "winner":   current["winner"].astype(str).tolist(),
+    }, columns=["type", "player_1", "player_2", "score", "winner"]).astype(str)
+
+    players = ["", *roster(ctx)]
+    edited  = st.data_editor(
+        grid,
+        key=f"rubbers_{mid}_{ctx.versions.get('rubbers')}",
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "type":     st.column_config.SelectboxColumn("Type", options=RUBBER_TYPES, default=RUBBER_TYPES[0], required=True),
+            "player_1": st.column_config.SelectboxColumn("Player", options=players),
+            "player_2": st.column_config.SelectboxColumn("Partner (doubles)", options=players),
+            "score":    st.column_config.TextColumn("Score", help="e.g. 6-3, 7-6(4)"),
+            "winner":   st.column_config.SelectboxColumn("Winner", options=["", *RUBBER_WINNERS]),
+        },
+    )
+
+    if st.button("💾 Save rubbers", use_container_width=True, disabled=edited.empty):
+        rubbers = [
+            {
+                "type":    r.type,
+                "players": ", ".join(p for p in (r.player_1, r.player_2 if r.type == "Doubles" else "") if p),
+                "score":   r.score or "",
+                "winner":  r.winner or "",
+            }
+            for r in edited.fillna("").itertuples(index=False)
+        ]
+        outcome = save_rubbers(ctx, mid, rubbers)
+        st.success(f"{len(rubbers)} rubber(s) saved — match result: {outcome or 'undecided'}.")
+        st.rerun()
@@ -3,16 +3,34 @@
 # ─────────────────────────────────────────────
 
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from modules.auth import require_role
+from modules.auth import require_role, session_context
+from modules.gsheets import list_archives, load_history
+from modules.lazy import lazy_import
+from modules.scores import margin_distribution, set_totals
 from modules.ui import page_header, no_data_info
+from modules.views import current_ratings, parsed_scores
+
+px = lazy_import("plotly.express")         # only loaded once there is something to plot
+go = lazy_import("plotly.graph_objects")
 
 require_role("captain", "admin")
 page_header("📈 Statistics", "Team performance, trends and player involvement.")
 
-df_m = st.session_state.dfs["matches"]
-df_s = st.session_state.dfs["selections"]
+ctx = session_context()
+df_m = ctx.dfs["matches"]
+df_s = ctx.dfs["selections"]
+seasons: list[str] = []
+
+# ── Past seasons (archive tabs, loaded only on request) ──────────────────────
+if st.toggle("Include past seasons", help="Archived seasons are read once per server and then reused."):
+    archived = list(list_archives(ctx))
+    if archived:
+        seasons = st.multiselect("Archived seasons", archived, default=archived)
+        df_m    = load_history(ctx, "matches", seasons)
+        df_s    = load_history(ctx, "selections", seasons)
+    else:
+        st.caption("No season has been archived yet.")
+
 played = df_m[df_m["status"] == "Played"].copy()
 
 if played.empty:
@@ -104,6 +122,47 @@ fig_adv = px.bar(
 fig_adv.update_layout(margin=dict(t=10, b=10), legend_title_text="")
 st.plotly_chart(fig_adv, use_container_width=True)
 
+# ── Sets & games (parsed from the score column) ─────────────────────────────
+st.subheader("🎾 Sets & games")
+scores = parsed_scores(ctx, tuple(seasons))
+sets   = scores.valid_sets
+if sets.empty:
+    st.caption("No readable scores yet.")
+else:
+    t = set_totals(sets)
+    s1, s2, s3, s4 = st.columns(4)
+    s1.metric("Sets won",   f"{t['sets_won']} / {t['sets_won'] + t['sets_lost']}")
+    s2.metric("Games won",  f"{t['games_won']} / {t['games_won'] + t['games_lost']}")
+    s3.metric("Tiebreaks",  f"{t['tiebreaks_won']}–{t['tiebreaks_lost']}")
+    s4.metric("Game diff.", f"{t['games_won'] - t['games_lost']:+d}")
+
+    margins = margin_distribution(sets)
+    fig_mar = px.bar(
+        margins, x="set_score", y=["won", "lost"], barmode="group",
+        color_discrete_map={"won": "#2d6a4f", "lost": "#e63946"},
+        labels={"set_score": "Set score", "value": "Sets", "variable": ""},
+    )
+    fig_mar.update_layout(margin=dict(t=10, b=10), legend_title_text="")
+    st.plotly_chart(fig_mar, use_container_width=True)
+
+if not scores.issues.empty:
+    with st.expander(f"⚠️ {scores.issues['match_id'].nunique()} score(s) could not be used"):
+        st.caption("Fix them on the Enter Results page; these matches are left out of the set and game figures.")
+        st.dataframe(scores.issues, use_container_width=True, hide_index=True)
+
+# ── Ratings (all seasons, updated as results are saved) ──────────────────────
+st.subheader("🏅 Ratings")
+teams, players = current_ratings(ctx, "team"), current_ratings(ctx, "player")
+if teams.empty:
+    st.caption("No rated match yet: ratings appear once a result is saved.")
+else:
+    r1, r2 = st.columns(2)
+    fmt = {"rating": st.column_config.NumberColumn("Rating", format="%.0f"),
+           "matches": st.column_config.NumberColumn("Matches", help="Rated matches of the seasons not archived yet"),
+           "last_change": st.column_config.NumberColumn("Last change", format="%+.1f")}
+    r1.dataframe(teams, use_container_width=True, hide_index=True, column_config=fmt)
+    r2.dataframe(players, use_container_width=True, hide_index=True, column_config=fmt)
+
 # ── Player participation ──────────────────────────────────────────────────────
 if not df_s.empty:
     st.subheader("👥 Player participation (selections)")
@@ -4,6 +4,7 @@
 
 import streamlit as st
 from modules.auth import try_login_with_password, try_login_as_admin
+from modules.tenants import registry
 from modules.ui import require_gsheets_secrets
 
 
@@ -73,7 +74,17 @@ def show_login() -> None:
         if not secrets_ok:
             st.stop()
 
+        # Several clubs on this server: pick one (?club=<key> preselects it)
+        clubs = {t.key: t.name for t in registry().values()}
+        club  = None
+
         with st.form("user_login_form"):
+            if len(clubs) > 1:
+                keys = list(clubs)
+                club = st.selectbox(
+                    "Club", keys, format_func=clubs.get,
+                    index=keys.index(st.query_params["club"]) if st.query_params.get("club") in clubs else 0,
+                )
             pseudo   = st.text_input("Username", placeholder="Your pseudo")
             password = st.text_input("Password", type="password")
             submitted = st.form_submit_button("🎾 Sign in", use_container_width=True)
@@ -83,7 +94,7 @@ def show_login() -> None:
                 st.error("Please enter your username and password.")
             else:
                 with st.spinner("Signing in…"):
-                    ok, err = try_login_with_password(pseudo.strip(), password.strip())
+                    ok, err = try_login_with_password(pseudo.strip(), password.strip(), club)
                 if ok:
                     st.success(f"Welcome, {pseudo}!")
                     st.rerun()
@@ -4,19 +4,20 @@
 
 import streamlit as st
 import pandas as pd
-from modules.auth import require_role
+from modules.auth import require_role, session_context
 from modules.gsheets import upsert_availability
 from modules.ui import page_header
+from modules.views import upcoming_matches
 from config.settings import AVAIL_OPTIONS
 
 require_role("player", "captain", "admin")
 page_header("🗳️ My Availability", "Let your captain know if you can make each upcoming match.")
 
+ctx    = session_context()
 pseudo = st.session_state.pseudo
-df_m   = st.session_state.dfs["matches"]
-df_a   = st.session_state.dfs["availability"]
+df_a   = ctx.dfs["availability"]
 
-upcoming = df_m[df_m["status"] == "Upcoming"].sort_values("date")
+upcoming = upcoming_matches(ctx)
 
 if upcoming.empty:
     st.info("No upcoming matches to respond to yet.")
@@ -54,6 +55,6 @@ for _, row in upcoming.iterrows():
             )
         with col_btn:
             if st.button("Save", key=f"save_{mid}", use_container_width=True):
-                upsert_availability(mid, pseudo, avail_choice, comment)
+                upsert_availability(ctx, mid, pseudo, avail_choice, comment)
                 st.success("Saved!")
                 st.rerun()
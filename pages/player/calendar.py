@@ -4,18 +4,34 @@
 
 import streamlit as st
 import pandas as pd
-from modules.auth import require_role
+from modules.auth import require_role, session_context
+from modules.ical import feed_url
 from modules.ui import page_header
+from modules.views import upcoming_matches, upcoming_teams
 
 require_role("player", "captain", "admin")
 page_header("📅 Match Calendar", "Upcoming matches and your availability status.")
 
+ctx    = session_context()
 pseudo = st.session_state.pseudo
-df_m   = st.session_state.dfs["matches"]
-df_a   = st.session_state.dfs["availability"]
-df_s   = st.session_state.dfs["selections"]
+df_a   = ctx.dfs["availability"]
+df_s   = ctx.dfs["selections"]
 
-upcoming = df_m[df_m["status"] == "Upcoming"].sort_values("date")
+upcoming = upcoming_matches(ctx)
+
+# ── Calendar subscription (sidecar feeds) ────────────────────────────────────
+if (my_feed := feed_url(ctx, "player", pseudo)) is not None:
+    with st.expander("📆 Add these matches to my phone calendar"):
+        st.caption(
+            "Subscribe to this address in your calendar app (Google Calendar: *Other calendars → "
+            "From URL*; iPhone: *Settings → Calendar → Accounts → Add subscribed calendar*). "
+            "It follows your answers and selections. Keep it private."
+        )
+        st.code(my_feed, language=None)
+        teams = upcoming_teams(ctx)
+        if teams:
+            team = st.selectbox("Or a whole team's fixtures", teams)
+            st.code(feed_url(ctx, "team", team), language=None)
 
 if upcoming.empty:
     st.info("No upcoming matches scheduled yet.")
@@ -4,19 +4,24 @@
 
 import streamlit as st
 import pandas as pd
-from modules.auth import require_role
-from modules.ui import page_header, result_badge
+from modules.auth import require_role, session_context
+from modules.standings import standings
+from modules.ui import page_header, render_standings, result_badge
+from modules.views import played_matches
 
 require_role("player", "captain", "admin")
 page_header("🏆 Results", "Latest match results.")
 
-df_m   = st.session_state.dfs["matches"]
-played = df_m[df_m["status"] == "Played"].sort_values("date", ascending=False)
+ctx    = session_context()
+played = played_matches(ctx)
 
 if played.empty:
     st.info("No results yet.")
     st.stop()
 
+with st.expander("📋 Standings", expanded=True):
+    render_standings(standings(ctx))
+
 for _, row in played.iterrows():
     date_str = row["date"].strftime("%d %b %Y") if pd.notna(row.get("date")) else "—"
     with st.container(border=True):
@@ -4,17 +4,18 @@
 
 import streamlit as st
 import pandas as pd
-from modules.auth import require_role
+from modules.auth import require_role, session_context
 from modules.ui import page_header
+from modules.views import upcoming_matches
 
 require_role("player", "captain", "admin")
 page_header("👥 Selections", "See who has been selected for each upcoming match.")
 
+ctx    = session_context()
 pseudo = st.session_state.pseudo
-df_m   = st.session_state.dfs["matches"]
-df_s   = st.session_state.dfs["selections"]
+df_s   = ctx.dfs["selections"]
 
-upcoming = df_m[df_m["status"] == "Upcoming"].sort_values("date")
+upcoming = upcoming_matches(ctx)
 
 if upcoming.empty:
     st.info("No upcoming matches.")